@@ -0,0 +1,57 @@
+"""add id_destinatario to Notificaciones
+
+Revision ID: 0718293041a2
+Revises: f60718293041
+Create Date: 2026-10-19 00:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0718293041a2"
+down_revision: Union[str, None] = "f60718293041"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "Notificaciones",
+        sa.Column(
+            "id_destinatario",
+            sa.Integer(),
+            sa.ForeignKey("Usuarios.id_usuario"),
+            nullable=True,
+        ),
+    )
+    # Un solo recorrido: destinatario y leida (NULL = no leída) a la vez
+    op.execute("""
+        UPDATE "Notificaciones"
+        SET id_destinatario = COALESCE(id_estudiante, id_profesor),
+            leida = COALESCE(leida, false)
+        """)
+    # Notificaciones sin destinatario no las podía ver nadie
+    op.execute('DELETE FROM "Notificaciones" WHERE id_destinatario IS NULL')
+    op.alter_column("Notificaciones", "id_destinatario", nullable=False)
+    op.alter_column(
+        "Notificaciones",
+        "leida",
+        nullable=False,
+        server_default=sa.text("false"),
+    )
+    op.create_index(
+        "ix_notificaciones_destinatario_leida_fecha",
+        "Notificaciones",
+        ["id_destinatario", "leida", sa.text("fecha_creacion DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_notificaciones_destinatario_leida_fecha", table_name="Notificaciones"
+    )
+    op.alter_column("Notificaciones", "leida", nullable=True, server_default=None)
+    op.drop_column("Notificaciones", "id_destinatario")
@@ -0,0 +1,28 @@
+"""index Notificaciones by recipient and id for websocket replay
+
+Revision ID: 18293041a2b3
+Revises: 0718293041a2
+Create Date: 2026-10-19 00:35:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "18293041a2b3"
+down_revision: Union[str, None] = "0718293041a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_notificaciones_destinatario_id",
+        "Notificaciones",
+        ["id_destinatario", "id_notificacion"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notificaciones_destinatario_id", table_name="Notificaciones")
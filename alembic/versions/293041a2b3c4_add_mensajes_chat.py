@@ -0,0 +1,46 @@
+"""add MensajesChat table
+
+Revision ID: 293041a2b3c4
+Revises: 18293041a2b3
+Create Date: 2026-10-19 00:40:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "293041a2b3c4"
+down_revision: Union[str, None] = "18293041a2b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "MensajesChat",
+        sa.Column("id_mensaje", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("id_tutoria", sa.Integer(), nullable=False),
+        sa.Column("id_remitente", sa.Integer(), nullable=False),
+        sa.Column("contenido", sa.String(length=2000), nullable=False),
+        sa.Column(
+            "fecha_envio",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["id_tutoria"], ["Tutorias.id_tutoria"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["id_remitente"], ["Usuarios.id_usuario"]),
+        sa.PrimaryKeyConstraint("id_mensaje"),
+    )
+    op.create_index(
+        "ix_mensajes_chat_tutoria_id", "MensajesChat", ["id_tutoria", "id_mensaje"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_mensajes_chat_tutoria_id", table_name="MensajesChat")
+    op.drop_table("MensajesChat")
@@ -0,0 +1,51 @@
+"""add InteraccionesChatbot table
+
+Revision ID: 3041a2b3c4d5
+Revises: 293041a2b3c4
+Create Date: 2026-10-19 00:45:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3041a2b3c4d5"
+down_revision: Union[str, None] = "293041a2b3c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "InteraccionesChatbot",
+        sa.Column(
+            "id_interaccion", sa.BigInteger(), autoincrement=True, nullable=False
+        ),
+        sa.Column("id_usuario", sa.Integer(), nullable=True),
+        sa.Column("pregunta", sa.String(length=1000), nullable=False),
+        sa.Column("respuesta", sa.String(length=4000), nullable=False),
+        sa.Column("intencion", sa.String(length=50), nullable=True),
+        sa.Column("latencia_ms", sa.Float(), nullable=True),
+        sa.Column(
+            "fecha",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["id_usuario"], ["Usuarios.id_usuario"]),
+        sa.PrimaryKeyConstraint("id_interaccion"),
+    )
+    op.create_index(
+        op.f("ix_InteraccionesChatbot_id_usuario"),
+        "InteraccionesChatbot",
+        ["id_usuario"],
+    )
+    op.create_index(
+        op.f("ix_InteraccionesChatbot_fecha"), "InteraccionesChatbot", ["fecha"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("InteraccionesChatbot")
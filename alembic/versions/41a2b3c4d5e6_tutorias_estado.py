@@ -0,0 +1,85 @@
+"""Tutorias.estado with partial indexes on active rows
+
+Revision ID: 41a2b3c4d5e6
+Revises: 3041a2b3c4d5
+Create Date: 2026-10-19 00:50:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "41a2b3c4d5e6"
+down_revision: Union[str, None] = "3041a2b3c4d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVA = "estado IN ('SOLICITADA', 'CONFIRMADA')"
+VIGENTE = "estado <> 'CANCELADA'"
+
+
+def upgrade() -> None:
+    op.add_column(
+        "Tutorias",
+        sa.Column(
+            "estado",
+            sa.String(length=20),
+            server_default=sa.text("'CONFIRMADA'"),
+            nullable=False,
+        ),
+    )
+    op.execute("""UPDATE "Tutorias" SET estado = 'CANCELADA'
+        WHERE fecha_cancelacion IS NOT NULL""")
+    op.execute("""UPDATE "Tutorias" SET estado = 'COMPLETADA'
+        WHERE estado = 'CONFIRMADA' AND fecha_hora_fin < now()""")
+    op.create_check_constraint(
+        "ck_tutorias_estado",
+        "Tutorias",
+        "estado IN ('SOLICITADA', 'CONFIRMADA', 'CANCELADA', 'COMPLETADA')",
+    )
+
+    op.drop_index("ix_tutorias_profesor_inicio", table_name="Tutorias")
+    op.drop_index("ix_tutorias_estudiante_inicio", table_name="Tutorias")
+    op.create_index(
+        "ix_tutorias_profesor_inicio",
+        "Tutorias",
+        ["id_profesor", "fecha_hora_inicio"],
+        postgresql_where=sa.text(VIGENTE),
+    )
+    op.create_index(
+        "ix_tutorias_estudiante_inicio",
+        "Tutorias",
+        ["id_estudiante", "fecha_hora_inicio"],
+        postgresql_where=sa.text(VIGENTE),
+    )
+    op.create_index(
+        "ix_tutorias_profesor_inicio_activas",
+        "Tutorias",
+        ["id_profesor", "fecha_hora_inicio"],
+        postgresql_where=sa.text(ACTIVA),
+    )
+    op.create_index(
+        "ix_tutorias_estudiante_inicio_activas",
+        "Tutorias",
+        ["id_estudiante", "fecha_hora_inicio"],
+        postgresql_where=sa.text(ACTIVA),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tutorias_estudiante_inicio_activas", table_name="Tutorias")
+    op.drop_index("ix_tutorias_profesor_inicio_activas", table_name="Tutorias")
+    op.drop_index("ix_tutorias_estudiante_inicio", table_name="Tutorias")
+    op.drop_index("ix_tutorias_profesor_inicio", table_name="Tutorias")
+    op.create_index(
+        "ix_tutorias_profesor_inicio", "Tutorias", ["id_profesor", "fecha_hora_inicio"]
+    )
+    op.create_index(
+        "ix_tutorias_estudiante_inicio",
+        "Tutorias",
+        ["id_estudiante", "fecha_hora_inicio"],
+    )
+    op.drop_constraint("ck_tutorias_estado", "Tutorias", type_="check")
+    op.drop_column("Tutorias", "estado")
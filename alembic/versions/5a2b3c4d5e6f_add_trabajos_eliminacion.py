@@ -0,0 +1,66 @@
+"""add TrabajosEliminacion table
+
+Revision ID: 5a2b3c4d5e6f
+Revises: 41a2b3c4d5e6
+Create Date: 2026-10-19 00:55:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5a2b3c4d5e6f"
+down_revision: Union[str, None] = "41a2b3c4d5e6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "TrabajosEliminacion",
+        sa.Column("id_trabajo", sa.Integer(), nullable=False),
+        sa.Column("entidad", sa.String(length=20), nullable=False),
+        sa.Column("id_entidad", sa.Integer(), nullable=False),
+        sa.Column(
+            "estado",
+            sa.String(length=20),
+            server_default=sa.text("'PENDIENTE'"),
+            nullable=False,
+        ),
+        sa.Column("paso", sa.String(length=50), nullable=True),
+        sa.Column("total", sa.Integer(), nullable=True),
+        sa.Column(
+            "procesados", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.Column(
+            "notificados", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.Column("error", sa.String(length=500), nullable=True),
+        sa.Column(
+            "fecha_creacion",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "fecha_actualizacion",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("fecha_fin", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id_trabajo"),
+    )
+    op.create_index(
+        "ux_trabajos_eliminacion_activo",
+        "TrabajosEliminacion",
+        ["entidad", "id_entidad"],
+        unique=True,
+        postgresql_where=sa.text("estado IN ('PENDIENTE', 'EN_CURSO')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("TrabajosEliminacion")
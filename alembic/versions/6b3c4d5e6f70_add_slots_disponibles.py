@@ -0,0 +1,59 @@
+"""add SlotsDisponibles table
+
+Revision ID: 6b3c4d5e6f70
+Revises: 5a2b3c4d5e6f
+Create Date: 2026-10-19 01:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "6b3c4d5e6f70"
+down_revision: Union[str, None] = "5a2b3c4d5e6f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # El inventario se rellena al arrancar la aplicación (SlotService.refresh)
+    op.create_table(
+        "SlotsDisponibles",
+        sa.Column("id_slot", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("id_disponibilidad", sa.Integer(), nullable=False),
+        sa.Column("id_profesor", sa.Integer(), nullable=False),
+        sa.Column("id_asignatura", sa.Integer(), nullable=False),
+        sa.Column("inicio", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("fin", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("id_tutoria", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["id_disponibilidad"],
+            ["DisponibilidadDocente.id_disponibilidad"],
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(["id_profesor"], ["Usuarios.id_usuario"]),
+        sa.ForeignKeyConstraint(["id_asignatura"], ["Asignaturas.id_asignatura"]),
+        sa.ForeignKeyConstraint(
+            ["id_tutoria"], ["Tutorias.id_tutoria"], ondelete="SET NULL"
+        ),
+        sa.PrimaryKeyConstraint("id_slot"),
+        sa.UniqueConstraint(
+            "id_disponibilidad", "inicio", name="uq_slots_disponibilidad_inicio"
+        ),
+    )
+    op.create_index(
+        "ix_slots_libres_asignatura_inicio",
+        "SlotsDisponibles",
+        ["id_asignatura", "inicio"],
+        postgresql_where=sa.text("id_tutoria IS NULL"),
+    )
+    op.create_index(
+        "ix_slots_profesor_inicio", "SlotsDisponibles", ["id_profesor", "inicio"]
+    )
+    op.create_index("ix_slots_tutoria", "SlotsDisponibles", ["id_tutoria"])
+
+
+def downgrade() -> None:
+    op.drop_table("SlotsDisponibles")
@@ -0,0 +1,65 @@
+"""add ListaEspera table
+
+Revision ID: 7c4d5e6f7081
+Revises: 6b3c4d5e6f70
+Create Date: 2026-10-19 01:05:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7c4d5e6f7081"
+down_revision: Union[str, None] = "6b3c4d5e6f70"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ListaEspera",
+        sa.Column("id_espera", sa.Integer(), nullable=False),
+        sa.Column("id_estudiante", sa.Integer(), nullable=False),
+        sa.Column("id_profesor", sa.Integer(), nullable=False),
+        sa.Column("id_asignatura", sa.Integer(), nullable=False),
+        sa.Column("fecha_desde", sa.Date(), nullable=False),
+        sa.Column("fecha_hasta", sa.Date(), nullable=False),
+        sa.Column("modalidad", sa.String(length=20), nullable=False),
+        sa.Column(
+            "estado",
+            sa.String(length=20),
+            server_default=sa.text("'ESPERANDO'"),
+            nullable=False,
+        ),
+        sa.Column("id_tutoria", sa.Integer(), nullable=True),
+        sa.Column(
+            "fecha_creacion",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("fecha_promocion", sa.DateTime(timezone=True), nullable=True),
+        sa.CheckConstraint(
+            "fecha_desde <= fecha_hasta", name="ck_lista_espera_ventana"
+        ),
+        sa.ForeignKeyConstraint(["id_estudiante"], ["Usuarios.id_usuario"]),
+        sa.ForeignKeyConstraint(["id_profesor"], ["Usuarios.id_usuario"]),
+        sa.ForeignKeyConstraint(["id_asignatura"], ["Asignaturas.id_asignatura"]),
+        sa.ForeignKeyConstraint(
+            ["id_tutoria"], ["Tutorias.id_tutoria"], ondelete="SET NULL"
+        ),
+        sa.PrimaryKeyConstraint("id_espera"),
+    )
+    op.create_index(
+        "ix_lista_espera_turno",
+        "ListaEspera",
+        ["id_profesor", "id_asignatura", "fecha_creacion"],
+        postgresql_where=sa.text("estado = 'ESPERANDO'"),
+    )
+    op.create_index("ix_lista_espera_estudiante", "ListaEspera", ["id_estudiante"])
+
+
+def downgrade() -> None:
+    op.drop_table("ListaEspera")
@@ -0,0 +1,47 @@
+"""IdempotencyKeys: caller scope and in-flight lease
+
+Revision ID: 8d5e6f708192
+Revises: 7c4d5e6f7081
+Create Date: 2026-10-19 01:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "8d5e6f708192"
+down_revision: Union[str, None] = "7c4d5e6f7081"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Las filas existentes no tienen ámbito conocido; son respuestas de a lo sumo
+    # IDEMPOTENCY_TTL_HOURS y se descartan
+    op.execute('DELETE FROM "IdempotencyKeys"')
+    op.add_column(
+        "IdempotencyKeys",
+        sa.Column("ambito", sa.String(length=255), nullable=False),
+    )
+    op.add_column(
+        "IdempotencyKeys",
+        sa.Column("bloqueado_hasta", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.drop_constraint("IdempotencyKeys_pkey", "IdempotencyKeys", type_="primary")
+    op.create_primary_key(
+        "IdempotencyKeys_pkey",
+        "IdempotencyKeys",
+        ["ambito", "clave", "metodo", "ruta"],
+    )
+
+
+def downgrade() -> None:
+    op.execute('DELETE FROM "IdempotencyKeys"')
+    op.drop_constraint("IdempotencyKeys_pkey", "IdempotencyKeys", type_="primary")
+    op.create_primary_key(
+        "IdempotencyKeys_pkey", "IdempotencyKeys", ["clave", "metodo", "ruta"]
+    )
+    op.drop_column("IdempotencyKeys", "bloqueado_hasta")
+    op.drop_column("IdempotencyKeys", "ambito")
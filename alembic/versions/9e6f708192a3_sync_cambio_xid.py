@@ -0,0 +1,48 @@
+"""cambio_xid sync marker on Tutorias and TutoriasEliminadas
+
+Revision ID: 9e6f708192a3
+Revises: 8d5e6f708192
+Create Date: 2026-10-19 01:15:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9e6f708192a3"
+down_revision: Union[str, None] = "8d5e6f708192"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# pg_current_xact_id() requiere PostgreSQL 13+
+XID_ACTUAL = sa.text("pg_current_xact_id()::text::bigint")
+
+
+def upgrade() -> None:
+    # Las filas existentes toman el xid de esta migración; los tokens anteriores
+    # (sin firma) dejan de ser válidos y los clientes hacen una carga completa
+    for tabla in ("Tutorias", "TutoriasEliminadas"):
+        op.add_column(
+            tabla,
+            sa.Column(
+                "cambio_xid",
+                sa.BigInteger(),
+                server_default=XID_ACTUAL,
+                nullable=False,
+            ),
+        )
+    op.create_index("ix_tutorias_cambio_xid", "Tutorias", ["cambio_xid"])
+    op.create_index(
+        op.f("ix_TutoriasEliminadas_cambio_xid"), "TutoriasEliminadas", ["cambio_xid"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_TutoriasEliminadas_cambio_xid"), table_name="TutoriasEliminadas"
+    )
+    op.drop_index("ix_tutorias_cambio_xid", table_name="Tutorias")
+    op.drop_column("TutoriasEliminadas", "cambio_xid")
+    op.drop_column("Tutorias", "cambio_xid")
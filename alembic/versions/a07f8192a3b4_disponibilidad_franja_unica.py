@@ -0,0 +1,52 @@
+"""unique franja in DisponibilidadDocente
+
+Revision ID: a07f8192a3b4
+Revises: 9e6f708192a3
+Create Date: 2026-10-19 01:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a07f8192a3b4"
+down_revision: Union[str, None] = "9e6f708192a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Se conserva la franja más antigua de cada grupo repetido; los slots de las
+    # borradas se van en cascada y la reserva pasa al slot equivalente conservado
+    op.execute("""
+        DELETE FROM "DisponibilidadDocente" d
+        USING "DisponibilidadDocente" o
+        WHERE o.id_profesor = d.id_profesor
+          AND o.id_asignatura = d.id_asignatura
+          AND o.dia_semana = d.dia_semana
+          AND o.hora_inicio = d.hora_inicio
+          AND o.hora_fin = d.hora_fin
+          AND o.id_disponibilidad < d.id_disponibilidad
+        """)
+    op.execute("""
+        UPDATE "SlotsDisponibles" s
+        SET id_tutoria = t.id_tutoria
+        FROM "Tutorias" t
+        WHERE s.id_tutoria IS NULL
+          AND t.id_profesor = s.id_profesor
+          AND t.estado IN ('SOLICITADA', 'CONFIRMADA')
+          AND t.fecha_hora_inicio < s.fin
+          AND t.fecha_hora_fin > s.inicio
+        """)
+    op.create_unique_constraint(
+        "uq_disponibilidad_franja",
+        "DisponibilidadDocente",
+        ["id_profesor", "id_asignatura", "dia_semana", "hora_inicio", "hora_fin"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_disponibilidad_franja", "DisponibilidadDocente", type_="unique"
+    )
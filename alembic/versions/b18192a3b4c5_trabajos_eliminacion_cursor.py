@@ -0,0 +1,29 @@
+"""notification cursor in TrabajosEliminacion
+
+Revision ID: b18192a3b4c5
+Revises: a07f8192a3b4
+Create Date: 2026-10-19 18:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b18192a3b4c5"
+down_revision: Union[str, None] = "a07f8192a3b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "TrabajosEliminacion",
+        sa.Column("ultimo_notificado", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("TrabajosEliminacion", "ultimo_notificado")
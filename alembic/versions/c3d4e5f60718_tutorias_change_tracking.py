@@ -0,0 +1,77 @@
+"""tutorias change tracking and calendar range indexes
+
+Revision ID: c3d4e5f60718
+Revises: b2c3d4e5f607
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d4e5f60718"
+down_revision: Union[str, None] = "b2c3d4e5f607"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "Tutorias",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_tutorias_profesor_inicio",
+        "Tutorias",
+        ["id_profesor", "fecha_hora_inicio"],
+    )
+    op.create_index(
+        "ix_tutorias_estudiante_inicio",
+        "Tutorias",
+        ["id_estudiante", "fecha_hora_inicio"],
+    )
+    op.create_index("ix_tutorias_updated_at", "Tutorias", ["updated_at"])
+
+    op.create_table(
+        "TutoriasEliminadas",
+        sa.Column("id_tutoria", sa.Integer(), nullable=False),
+        sa.Column("id_estudiante", sa.Integer(), nullable=False),
+        sa.Column("id_profesor", sa.Integer(), nullable=False),
+        sa.Column(
+            "fecha_eliminacion",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id_tutoria"),
+    )
+    op.create_index(
+        op.f("ix_TutoriasEliminadas_id_estudiante"),
+        "TutoriasEliminadas",
+        ["id_estudiante"],
+    )
+    op.create_index(
+        op.f("ix_TutoriasEliminadas_id_profesor"),
+        "TutoriasEliminadas",
+        ["id_profesor"],
+    )
+    op.create_index(
+        op.f("ix_TutoriasEliminadas_fecha_eliminacion"),
+        "TutoriasEliminadas",
+        ["fecha_eliminacion"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("TutoriasEliminadas")
+    op.drop_index("ix_tutorias_updated_at", table_name="Tutorias")
+    op.drop_index("ix_tutorias_estudiante_inicio", table_name="Tutorias")
+    op.drop_index("ix_tutorias_profesor_inicio", table_name="Tutorias")
+    op.drop_column("Tutorias", "updated_at")
@@ -0,0 +1,51 @@
+"""tutorias version column and idempotency keys table
+
+Revision ID: d4e5f6071829
+Revises: c3d4e5f60718
+Create Date: 2026-10-19 00:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d4e5f6071829"
+down_revision: Union[str, None] = "c3d4e5f60718"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "Tutorias",
+        sa.Column("version", sa.Integer(), server_default=sa.text("1"), nullable=False),
+    )
+    op.create_table(
+        "IdempotencyKeys",
+        sa.Column("clave", sa.String(length=255), nullable=False),
+        sa.Column("metodo", sa.String(length=10), nullable=False),
+        sa.Column("ruta", sa.String(length=255), nullable=False),
+        sa.Column("huella", sa.String(length=64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("content_type", sa.String(length=100), nullable=True),
+        sa.Column("cuerpo", sa.LargeBinary(), nullable=True),
+        sa.Column(
+            "fecha_creacion",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("clave", "metodo", "ruta"),
+    )
+    op.create_index(
+        op.f("ix_IdempotencyKeys_fecha_creacion"),
+        "IdempotencyKeys",
+        ["fecha_creacion"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("IdempotencyKeys")
+    op.drop_column("Tutorias", "version")
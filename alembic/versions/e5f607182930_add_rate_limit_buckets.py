@@ -0,0 +1,40 @@
+"""add rate limit buckets table
+
+Revision ID: e5f607182930
+Revises: d4e5f6071829
+Create Date: 2026-10-19 00:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e5f607182930"
+down_revision: Union[str, None] = "d4e5f6071829"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "RateLimitBuckets",
+        sa.Column("clave", sa.String(length=255), nullable=False),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("permitido", sa.Boolean(), nullable=False),
+        sa.Column(
+            "actualizado",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("clave"),
+    )
+    op.create_index(
+        op.f("ix_RateLimitBuckets_actualizado"), "RateLimitBuckets", ["actualizado"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("RateLimitBuckets")
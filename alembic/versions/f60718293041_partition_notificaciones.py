@@ -0,0 +1,129 @@
+"""partition Notificaciones by month of fecha_creacion
+
+Revision ID: f60718293041
+Revises: e5f607182930
+Create Date: 2026-10-19 00:25:00.000000
+
+"""
+
+from datetime import date
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f60718293041"
+down_revision: Union[str, None] = "e5f607182930"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Meses por delante que se crean en la migración; luego los mantiene el job
+FUTURE_MONTHS = 3
+COLUMNS = (
+    "id_notificacion, id_estudiante, id_profesor, titulo, descripcion, tipo, leida"
+)
+
+
+def _next_month(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    seq = conn.execute(
+        sa.text(
+            """SELECT pg_get_serial_sequence('"Notificaciones"', 'id_notificacion')"""
+        )
+    ).scalar_one()
+    # La secuencia debe sobrevivir al DROP de la tabla antigua
+    op.execute(f"ALTER SEQUENCE {seq} OWNED BY NONE")
+    op.execute('ALTER TABLE "Notificaciones" RENAME TO "Notificaciones_old"')
+    op.execute('ALTER INDEX "Notificaciones_pkey" RENAME TO "Notificaciones_old_pkey"')
+    op.execute(
+        'ALTER INDEX "ix_Notificaciones_id_notificacion" '
+        'RENAME TO "ix_Notificaciones_old_id_notificacion"'
+    )
+
+    # La clave de partición tiene que formar parte de la PK
+    op.execute(f"""
+        CREATE TABLE "Notificaciones" (
+            id_notificacion INTEGER NOT NULL DEFAULT nextval('{seq}'),
+            id_estudiante INTEGER REFERENCES "Usuarios" (id_usuario),
+            id_profesor INTEGER REFERENCES "Usuarios" (id_usuario),
+            titulo VARCHAR(255) NOT NULL,
+            descripcion VARCHAR(500),
+            tipo VARCHAR(30),
+            leida BOOLEAN,
+            fecha_creacion TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id_notificacion, fecha_creacion)
+        ) PARTITION BY RANGE (fecha_creacion)
+        """)
+    op.execute(f'ALTER SEQUENCE {seq} OWNED BY "Notificaciones".id_notificacion')
+
+    first = conn.execute(
+        sa.text(
+            """SELECT date_trunc('month', min(fecha_creacion))::date FROM "Notificaciones_old\""""
+        )
+    ).scalar()
+    month = date.today().replace(day=1)
+    last = month
+    for _ in range(FUTURE_MONTHS):
+        last = _next_month(last)
+    month = min(first, month) if first else month
+    while month <= last:
+        op.execute(
+            f'CREATE TABLE "Notificaciones_p{month:%Y%m}" PARTITION OF "Notificaciones" '
+            f"FOR VALUES FROM ('{month.isoformat()}') "
+            f"TO ('{_next_month(month).isoformat()}')"
+        )
+        month = _next_month(month)
+    # Red de seguridad si el job de mantenimiento no llegó a crear el mes
+    op.execute(
+        'CREATE TABLE "Notificaciones_default" PARTITION OF "Notificaciones" DEFAULT'
+    )
+
+    op.execute(f"""
+        INSERT INTO "Notificaciones" ({COLUMNS}, fecha_creacion)
+        SELECT {COLUMNS}, COALESCE(fecha_creacion, now()) FROM "Notificaciones_old"
+        """)
+    op.execute('DROP TABLE "Notificaciones_old"')
+    op.create_index(
+        op.f("ix_Notificaciones_id_notificacion"), "Notificaciones", ["id_notificacion"]
+    )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    seq = conn.execute(
+        sa.text(
+            """SELECT pg_get_serial_sequence('"Notificaciones"', 'id_notificacion')"""
+        )
+    ).scalar_one()
+    op.execute(f"ALTER SEQUENCE {seq} OWNED BY NONE")
+    op.execute('ALTER TABLE "Notificaciones" RENAME TO "Notificaciones_part"')
+    op.execute('ALTER INDEX "Notificaciones_pkey" RENAME TO "Notificaciones_part_pkey"')
+    op.execute(
+        'ALTER INDEX "ix_Notificaciones_id_notificacion" '
+        'RENAME TO "ix_Notificaciones_part_id_notificacion"'
+    )
+    op.execute(f"""
+        CREATE TABLE "Notificaciones" (
+            id_notificacion INTEGER NOT NULL DEFAULT nextval('{seq}') PRIMARY KEY,
+            id_estudiante INTEGER REFERENCES "Usuarios" (id_usuario),
+            id_profesor INTEGER REFERENCES "Usuarios" (id_usuario),
+            titulo VARCHAR(255) NOT NULL,
+            descripcion VARCHAR(500),
+            tipo VARCHAR(30),
+            leida BOOLEAN,
+            fecha_creacion TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+        """)
+    op.execute(f'ALTER SEQUENCE {seq} OWNED BY "Notificaciones".id_notificacion')
+    op.execute(f"""
+        INSERT INTO "Notificaciones" ({COLUMNS}, fecha_creacion)
+        SELECT {COLUMNS}, fecha_creacion FROM "Notificaciones_part"
+        """)
+    op.execute('DROP TABLE "Notificaciones_part"')
+    op.create_index(
+        op.f("ix_Notificaciones_id_notificacion"), "Notificaciones", ["id_notificacion"]
+    )
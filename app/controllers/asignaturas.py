@@ -1,21 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, delete
+from sqlalchemy import and_
 from sqlalchemy.exc import IntegrityError
 
-from app.core.deps import get_db
+from app.core.deps import get_db, get_read_db
 from app.models.asignaturas import Asignatura
 from app.models.profesor_asignatura import ProfesorAsignatura
-from app.models.disponibilidad import DisponibilidadDocente
 from app.models.users import User
 from app.models.roles import Role
+from app.repositories.asignaturas import AsignaturaRepository
 from app.schemas.asignaturas import (
     AsignaturaCreate,
     AsignaturaRead,
     ProfesorAsignado,
     AsignarProfesorRequest,
 )
+from app.schemas.trabajos import TrabajoEliminacionRead
+from app.services.eliminacion import EliminacionService
 
 router = APIRouter()
 
@@ -32,17 +36,13 @@ async def create_asignatura(
 
 
 @router.get("/", response_model=list[AsignaturaRead])
-async def list_asignaturas(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Asignatura))
-    return result.scalars().all()
+async def list_asignaturas(db: AsyncSession = Depends(get_read_db)):
+    return await AsignaturaRepository.get_all(db)
 
 
 @router.get("/{asignatura_id}", response_model=AsignaturaRead)
 async def get_asignatura(asignatura_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Asignatura).where(Asignatura.id_asignatura == asignatura_id)
-    )
-    asignatura = result.scalar_one_or_none()
+    asignatura = await AsignaturaRepository.get_by_id(db, asignatura_id)
     if not asignatura:
         raise HTTPException(status_code=404, detail="Asignatura not found")
     return asignatura
@@ -50,56 +50,28 @@ async def get_asignatura(asignatura_id: int, db: AsyncSession = Depends(get_db))
 
 @router.get("/profesor/{id_profesor}", response_model=list[AsignaturaRead])
 async def get_asignaturas_by_profesor(
-    id_profesor: int, db: AsyncSession = Depends(get_db)
+    id_profesor: int, db: AsyncSession = Depends(get_read_db)
 ):
-    result = await db.execute(
-        select(Asignatura)
-        .join(
-            ProfesorAsignatura,
-            Asignatura.id_asignatura == ProfesorAsignatura.id_asignatura,
-        )
-        .where(ProfesorAsignatura.id_profesor == id_profesor)
-    )
-    return result.scalars().all()
+    return await AsignaturaRepository.get_by_profesor(db, id_profesor)
 
 
-@router.delete("/{asignatura_id}", status_code=204)
+@router.delete(
+    "/{asignatura_id}",
+    status_code=204,
+    responses={202: {"model": TrabajoEliminacionRead}},
+)
 async def delete_asignatura(asignatura_id: int, db: AsyncSession = Depends(get_db)):
-    # Ensure the asignatura exists
-    result = await db.execute(
-        select(Asignatura).where(Asignatura.id_asignatura == asignatura_id)
-    )
-    asignatura = result.scalar_one_or_none()
-    if not asignatura:
+    if not await EliminacionService.exists(db, "asignatura", asignatura_id):
         raise HTTPException(status_code=404, detail="Asignatura not found")
-
-    # First, remove relationships that reference this asignatura to avoid FK violations
-    await db.execute(
-        delete(DisponibilidadDocente).where(
-            DisponibilidadDocente.id_asignatura == asignatura_id
-        )
+    # Sin dependientes se borra en el acto; si no, se encola un trabajo
+    trabajo = await EliminacionService.solicitar(db, "asignatura", asignatura_id)
+    if trabajo is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(TrabajoEliminacionRead(**trabajo)),
+        headers={"Location": f"/trabajos/{trabajo['id_trabajo']}"},
     )
-    await db.execute(
-        delete(ProfesorAsignatura).where(
-            ProfesorAsignatura.id_asignatura == asignatura_id
-        )
-    )
-
-    # Then delete the asignatura itself
-    await db.delete(asignatura)
-    try:
-        await db.commit()
-    except IntegrityError:
-        # Rollback the transaction and return a conflict if other entities still reference this asignatura
-        await db.rollback()
-        # Most likely there are Tutorias referencing this asignatura
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=(
-                "No se puede eliminar la asignatura porque existen registros relacionados (por ejemplo, tutorías). "
-                "Elimine o reasigne esos registros antes de intentar nuevamente."
-            ),
-        )
 
 
 @router.get("/{asignatura_id}/profesores", response_model=list[ProfesorAsignado])
@@ -109,41 +81,14 @@ async def list_profesores_asignatura(
         False,
         description="Return only profesores that currently have at least one availability slot configured for this asignatura.",
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Ensure asignatura exists
-    result = await db.execute(
-        select(Asignatura).where(Asignatura.id_asignatura == asignatura_id)
-    )
-    if not result.scalar_one_or_none():
+    if not await AsignaturaRepository.get_by_id(db, asignatura_id):
         raise HTTPException(status_code=404, detail="Asignatura not found")
-
-    base_query = (
-        select(User)
-        .join(ProfesorAsignatura, User.id_usuario == ProfesorAsignatura.id_profesor)
-        .where(ProfesorAsignatura.id_asignatura == asignatura_id)
+    return await AsignaturaRepository.get_profesores(
+        db, asignatura_id, only_with_availability
     )
-    if only_with_availability:
-        # Import locally to avoid circular import
-        from app.models.disponibilidad import DisponibilidadDocente
-        from sqlalchemy import exists, select as sel
-
-        base_query = base_query.where(
-            exists(
-                sel(1)
-                .select_from(DisponibilidadDocente)
-                .where(
-                    and_(
-                        DisponibilidadDocente.id_profesor
-                        == ProfesorAsignatura.id_profesor,
-                        DisponibilidadDocente.id_asignatura == asignatura_id,
-                    )
-                )
-            )
-        )
-
-    result = await db.execute(base_query)
-    return result.scalars().all()
 
 
 @router.post(
@@ -6,6 +6,7 @@ from sqlalchemy.future import select
 from app.core.deps import get_db
 from app.models.users import User
 from app.schemas.users import LoginRequest
+from app.services.roles import RoleService
 from app.utils.auth import create_access_token, verify_password
 
 router = APIRouter()
@@ -27,10 +28,7 @@ async def login(form_data: LoginRequest, db: AsyncSession = Depends(get_db)):
         rol_nombre = user.rol.nombre_rol
     elif hasattr(user, "id_rol"):
         # Realiza una consulta para obtener el nombre del rol si es necesario
-        from app.models.roles import Role
-
-        result = await db.execute(select(Role).where(Role.id_rol == user.id_rol))
-        rol = result.scalar_one_or_none()
+        rol = await RoleService.get_by_id(db, user.id_rol)
         rol_nombre = rol.nombre_rol if rol else None
 
     access_token = create_access_token(data={"sub": str(user.id_usuario)})
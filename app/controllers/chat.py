@@ -0,0 +1,68 @@
+import asyncio
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.deps import get_db, get_uow
+from app.core.security import get_current_user
+from app.core.uow import UnitOfWork
+from app.schemas.chat import MensajeChatCreate, MensajeChatRead, MensajesChatPage
+from app.services.chat import ChatService
+
+router = APIRouter()
+
+
+async def _participantes(db: AsyncSession, id_tutoria: int, user_id: int):
+    participantes = await ChatService.participantes(db, id_tutoria)
+    if not participantes:
+        raise HTTPException(status_code=404, detail="Tutoria no encontrada")
+    if user_id not in participantes:
+        raise HTTPException(
+            status_code=403, detail="No participas en el chat de esta tutoría"
+        )
+    return participantes
+
+
+@router.get("/tutoria/{id_tutoria}/mensajes", response_model=MensajesChatPage)
+async def list_mensajes(
+    id_tutoria: int,
+    before: int | None = Query(
+        None, description="Devuelve mensajes anteriores a este id"
+    ),
+    limit: int = Query(50, ge=1, le=200),
+    user_id: str = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    await _participantes(db, id_tutoria, int(user_id))
+    return await ChatService.historial(db, id_tutoria, before, limit)
+
+
+@router.post(
+    "/tutoria/{id_tutoria}/mensajes",
+    response_model=MensajeChatRead,
+    status_code=status.HTTP_201_CREATED,
+)
+async def send_mensaje(
+    id_tutoria: int,
+    mensaje_in: MensajeChatCreate,
+    user_id: str = Depends(get_current_user),
+    uow: UnitOfWork = Depends(get_uow),
+):
+    participantes = await _participantes(uow.session, id_tutoria, int(user_id))
+    # Se libera la conexión antes de esperar al escritor en lote
+    await uow.release()
+    try:
+        row = await ChatService.enviar(
+            id_tutoria, int(user_id), mensaje_in.contenido, participantes
+        )
+    except asyncio.QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Chat saturado, intente nuevamente",
+            headers={
+                "Retry-After": str(max(1, math.ceil(settings.admission_retry_after)))
+            },
+        )
+    return row._asdict()
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+
+from app.core.security import get_current_user
+from app.schemas.chatbot import PreguntaChatbot, RespuestaChatbot
+from app.services.chatbot import ChatbotService
+
+router = APIRouter()
+
+
+@router.post("/preguntar", response_model=RespuestaChatbot)
+async def preguntar(
+    pregunta_in: PreguntaChatbot, user_id: str = Depends(get_current_user)
+):
+    respuesta = await ChatbotService.responder(pregunta_in.pregunta, int(user_id))
+    return {
+        "respuesta": respuesta.texto,
+        "intencion": respuesta.intencion,
+        "franjas": [vars(f) for f in respuesta.franjas],
+    }
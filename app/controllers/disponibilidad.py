@@ -1,22 +1,33 @@
-import unicodedata
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import Date, cast, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.deps import get_db
+from app.core.config import settings
+from app.core.deps import get_db, get_read_db
 from app.models.disponibilidad import DisponibilidadDocente
-from app.models.tutorias import Tutoria
+from app.models.tutorias import VIGENTE, Tutoria
+from app.repositories.disponibilidad import DisponibilidadRepository
 from app.schemas.disponibilidad import (
     DisponibilidadCreate,
     DisponibilidadRead,
+    HorarioDisponible,
     HorarioLibre,
 )
+from app.schemas.slots import SlotRead
+from app.services.chatbot import availability_cache
+from app.services.disponibilidad import DisponibilidadService
+from app.services.slots import SlotService
+from app.utils.date_utils import DIAS_SEMANA, a_hora_local, zona_local
 
 router = APIRouter()
 
+MAX_DIAS_BUSQUEDA = 62
+FRANJA_DUPLICADA = "Ya existe esa franja para el profesor y la asignatura"
+
 
 # Crear disponibilidad
 @router.post(
@@ -34,7 +45,14 @@ async def create_disponibilidad(
         hora_fin=disponibilidad_in.hora_fin,
     )
     db.add(disponibilidad)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=FRANJA_DUPLICADA)
+    await SlotService.sync(db, disponibilidad.id_disponibilidad)
     await db.commit()
+    availability_cache.invalidate()
     await db.refresh(disponibilidad)
     return DisponibilidadRead(
         id_disponibilidad=disponibilidad.id_disponibilidad,
@@ -54,15 +72,11 @@ async def create_disponibilidad(
 async def list_disponibilidad_docente_asignatura(
     id_asignatura: int,
     id_profesor: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(
-        select(DisponibilidadDocente).where(
-            DisponibilidadDocente.id_profesor == id_profesor,
-            DisponibilidadDocente.id_asignatura == id_asignatura,
-        )
+    return await DisponibilidadRepository.get_by_profesor(
+        db, id_profesor, id_asignatura
     )
-    return result.scalars().all()
 
 
 @router.get(
@@ -73,35 +87,31 @@ async def list_horarios_libres(
     id_asignatura: int,
     id_profesor: int,
     fecha: date = Query(..., description="Fecha en formato YYYY-MM-DD"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    dias = ["lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo"]
-    dia_semana = dias[fecha.weekday()]
+    dia_semana = DIAS_SEMANA[fecha.weekday()]
     print(
         f"Buscando franjas para: {dia_semana}, fecha={fecha}, profesor={id_profesor}, asignatura={id_asignatura}"
     )
 
-    q_disp = await db.execute(
-        select(DisponibilidadDocente).where(
-            DisponibilidadDocente.id_profesor == id_profesor,
-            DisponibilidadDocente.id_asignatura == id_asignatura,
-            DisponibilidadDocente.dia_semana == dia_semana,
-        )
+    franjas = await DisponibilidadRepository.get_by_profesor(
+        db, id_profesor, id_asignatura, dia_semana
     )
-    franjas = q_disp.scalars().all()
     print(f"Franjas encontradas: {franjas}")
     # 2) Trae las tutorías ocupadas ese día
     q_tuts = await db.execute(
-        select(Tutoria).where(
+        select(Tutoria.fecha_hora_inicio, Tutoria.fecha_hora_fin).where(
             Tutoria.id_profesor == id_profesor,
             Tutoria.id_asignatura == id_asignatura,
-            cast(Tutoria.fecha_hora_inicio, Date) == fecha,
+            cast(func.timezone(settings.zona_horaria, Tutoria.fecha_hora_inicio), Date)
+            == fecha,
+            VIGENTE,
         )
     )
-    tuts = q_tuts.scalars().all()
-
+    # Horas locales de la institución, las mismas en que están definidas las franjas
     ocupado_times = [
-        (tut.fecha_hora_inicio.time(), tut.fecha_hora_fin.time()) for tut in tuts
+        (a_hora_local(inicio).time(), a_hora_local(fin).time())
+        for inicio, fin in q_tuts.all()
     ]
 
     libres: list[dict] = []
@@ -132,23 +142,13 @@ async def list_horarios_libres(
     return libres
 
 
-def normaliza_dia(d: str) -> str:
-    return (
-        unicodedata.normalize("NFKD", d)
-        .encode("ascii", "ignore")
-        .decode("ascii")
-        .lower()
-        .strip()
-    )
-
-
 @router.get(
     "/asignatura/{id_asignatura}/profesor/{id_profesor}/dias", response_model=list[str]
 )
 async def dias_disponibles_docente_asignatura(
     id_asignatura: int,
     id_profesor: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     q = await db.execute(
         select(DisponibilidadDocente.dia_semana).where(
@@ -171,7 +171,7 @@ async def list_dias_libres(
     id_profesor: int,
     start: date = Query(..., description="Fecha de inicio YYYY-MM-DD"),
     end: date = Query(..., description="Fecha de fin YYYY-MM-DD"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):  # Fetch configured availability days for the profesor
     q_disp = await db.execute(
         select(DisponibilidadDocente.dia_semana).where(
@@ -205,7 +205,12 @@ async def list_dias_libres(
                 .where(
                     Tutoria.id_profesor == id_profesor,
                     Tutoria.id_asignatura == id_asignatura,
-                    cast(Tutoria.fecha_hora_inicio, Date) == current,
+                    cast(
+                        func.timezone(settings.zona_horaria, Tutoria.fecha_hora_inicio),
+                        Date,
+                    )
+                    == current,
+                    VIGENTE,
                 )
             )
             total = q_tut.scalar_one()
@@ -217,17 +222,64 @@ async def list_dias_libres(
     return libres
 
 
+@router.get(
+    "/asignatura/{id_asignatura}/buscar",
+    response_model=list[HorarioDisponible],
+)
+async def buscar_horarios_disponibles(
+    id_asignatura: int,
+    start: date = Query(..., description="Fecha de inicio YYYY-MM-DD"),
+    end: date = Query(..., description="Fecha de fin YYYY-MM-DD"),
+    duracion_minutos: int = Query(60, ge=15, le=240),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Horarios libres de todos los profesores de la asignatura en el rango, ordenados.
+
+    Reemplaza la secuencia profesores -> dias_libres -> libres (una llamada por
+    profesor y fecha) por una carga masiva de franjas y tutorías de la ventana.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end debe ser >= start")
+    if (end - start).days > MAX_DIAS_BUSQUEDA:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El rango no puede superar {MAX_DIAS_BUSQUEDA} días",
+        )
+    return await DisponibilidadService.buscar_horarios(
+        db, id_asignatura, start, end, timedelta(minutes=duracion_minutos), limit
+    )
+
+
+@router.get("/asignatura/{id_asignatura}/slots", response_model=list[SlotRead])
+async def list_slots_libres(
+    id_asignatura: int,
+    start: date = Query(..., description="Fecha de inicio YYYY-MM-DD"),
+    end: date = Query(..., description="Fecha de fin YYYY-MM-DD (inclusive)"),
+    id_profesor: int | None = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Slots libres del inventario, listos para reservar con POST /tutorias/slots."""
+    if end < start:
+        raise HTTPException(status_code=400, detail="end debe ser >= start")
+    tz = zona_local()
+    return await SlotService.libres(
+        db,
+        id_asignatura,
+        datetime.combine(start, time.min, tz),
+        datetime.combine(end + timedelta(days=1), time.min, tz),
+        id_profesor,
+        limit,
+    )
+
+
 @router.get("/{id_profesor}", response_model=list[DisponibilidadRead])
 async def get_disponibilidad_by_docente(
     id_profesor: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(
-        select(DisponibilidadDocente).where(
-            DisponibilidadDocente.id_profesor == id_profesor
-        )
-    )
-    return result.scalars().all()
+    return await DisponibilidadRepository.get_by_profesor(db, id_profesor)
 
 
 @router.delete("/{id_disponibilidad}", status_code=204)
@@ -240,6 +292,7 @@ async def delete_disponibilidad(
         raise HTTPException(status_code=404, detail="Disponibilidad no encontrada")
     await db.delete(disponibilidad)
     await db.commit()
+    availability_cache.invalidate()
     return None
 
 
@@ -261,7 +314,14 @@ async def update_disponibilidad(
     disponibilidad.dia_semana = disponibilidad_in.dia_semana
     disponibilidad.hora_inicio = disponibilidad_in.hora_inicio
     disponibilidad.hora_fin = disponibilidad_in.hora_fin
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=FRANJA_DUPLICADA)
+    await SlotService.sync(db, id_disponibilidad)
     await db.commit()
+    availability_cache.invalidate()
     await db.refresh(disponibilidad)
     return DisponibilidadRead(
         id_disponibilidad=disponibilidad.id_disponibilidad,
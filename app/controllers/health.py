@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.health import HealthService
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def liveness():
+    # Sólo indica que el proceso responde; no toca dependencias externas
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness():
+    ok, detail = await HealthService.readiness()
+    return JSONResponse(status_code=200 if ok else 503, content=detail)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_db, require_admin
+from app.schemas.imports import ImportReport
+from app.services.imports import ImportService, iter_records
+
+# La carga masiva crea cuentas con cualquier id_rol, administradores incluidos
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+# El cuerpo se lee en streaming: CSV con cabecera (Content-Type: text/csv)
+# o un objeto JSON por línea (Content-Type: application/x-ndjson)
+
+
+def _records(request: Request):
+    return iter_records(request.stream(), request.headers.get("content-type", ""))
+
+
+@router.post("/usuarios", response_model=ImportReport)
+async def importar_usuarios(request: Request, db: AsyncSession = Depends(get_db)):
+    """Columnas: nombre, apellido, email, contrasena, id_rol."""
+    return await ImportService.import_usuarios(db, _records(request))
+
+
+@router.post("/asignaturas", response_model=ImportReport)
+async def importar_asignaturas(request: Request, db: AsyncSession = Depends(get_db)):
+    """Columnas: nombre_asignatura."""
+    return await ImportService.import_asignaturas(db, _records(request))
+
+
+@router.post("/asignaciones", response_model=ImportReport)
+async def importar_asignaciones(request: Request, db: AsyncSession = Depends(get_db)):
+    """Columnas: id_profesor o email_profesor, id_asignatura o nombre_asignatura."""
+    return await ImportService.import_asignaciones(db, _records(request))
+
+
+@router.post("/disponibilidad", response_model=ImportReport)
+async def importar_disponibilidad(request: Request, db: AsyncSession = Depends(get_db)):
+    """Columnas de asignaciones más dia_semana, hora_inicio y hora_fin."""
+    return await ImportService.import_disponibilidad(db, _records(request))
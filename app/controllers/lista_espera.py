@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_db
+from app.schemas.lista_espera import ListaEsperaCreate, ListaEsperaRead
+from app.services.lista_espera import ListaEsperaService
+
+router = APIRouter()
+
+
+@router.post("/", response_model=ListaEsperaRead, status_code=status.HTTP_201_CREATED)
+async def create_espera(
+    espera_in: ListaEsperaCreate, db: AsyncSession = Depends(get_db)
+):
+    try:
+        return await ListaEsperaService.create(db, espera_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/estudiante/{id_estudiante}", response_model=list[ListaEsperaRead])
+async def list_esperas_estudiante(
+    id_estudiante: int, db: AsyncSession = Depends(get_db)
+):
+    # Primario: tras una promoción el estudiante debe ver su entrada actualizada
+    return await ListaEsperaService.get_by_estudiante(db, id_estudiante)
+
+
+@router.delete("/{id_espera}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_espera(id_espera: int, db: AsyncSession = Depends(get_db)):
+    if not await ListaEsperaService.delete(db, id_espera):
+        raise HTTPException(
+            status_code=404, detail="Entrada no encontrada o ya promovida"
+        )
+    return None
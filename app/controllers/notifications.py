@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import false, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.deps import get_db
+from app.core.config import settings
+from app.core.deps import get_db, get_read_db
+from app.core.tokens import verifier
+from app.core.ws_manager import SseClient, manager
 from app.models.notificacion import Notificacion
+from app.repositories.notificaciones import NotificacionRepository
 from app.schemas.notificacion import NotificacionCreate, NotificacionRead
+from app.services.notifications import NotificationService
 
 router = APIRouter()
 
@@ -13,30 +20,81 @@ router = APIRouter()
 async def create_notification(
     notification_in: NotificacionCreate, db: AsyncSession = Depends(get_db)
 ):
-    noti = Notificacion(**notification_in.dict())
+    data = notification_in.dict()
+    data["id_destinatario"] = (
+        data["id_destinatario"] or data["id_estudiante"] or data["id_profesor"]
+    )
+    if not data["id_destinatario"]:
+        raise HTTPException(
+            status_code=400, detail="La notificación no tiene destinatario"
+        )
+    noti = Notificacion(**data)
     db.add(noti)
     await db.commit()
     await db.refresh(noti)
     return noti
 
 
+@router.get("/stream")
+async def stream_notifications(
+    token: str = Query(..., description="JWT access token"),
+    since: int | None = Query(
+        None, description="Última notificación recibida; se reenvían las posteriores"
+    ),
+    last_event_id: int | None = Header(None, alias="Last-Event-ID"),
+):
+    """Notificaciones en vivo por Server-Sent Events, para redes que cortan WebSockets.
+
+    Comparte el ``ConnectionManager`` del WebSocket. Al reconectar, el navegador
+    envía ``Last-Event-ID`` y se reenvía lo pendiente desde la base de datos.
+    """
+    user_id = verifier.subject(token)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Token inválido")
+    if last_event_id is not None:
+        since = last_event_id
+
+    client = SseClient(int(user_id))
+    # Se registra antes de consultar para no perder lo que llegue entre medias
+    await manager.register(client, replay=since is not None)
+    try:
+        if since is not None:
+            await NotificationService.replay(client, since)
+    except Exception:
+        await manager.disconnect(client)
+        raise
+
+    async def eventos():
+        try:
+            async for chunk in client.stream(settings.sse_keepalive_interval):
+                yield chunk
+        finally:
+            await manager.disconnect(client)
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        # Sin caché ni buffering en proxies (nginx) para que cada evento salga ya
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/user/{user_id}", response_model=list[NotificacionRead])
 async def list_notifications(
     user_id: int,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
-    db: AsyncSession = Depends(get_db),
+    solo_no_leidas: bool = Query(False),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    base_query = (
-        select(Notificacion)
-        .where(
-            (Notificacion.id_estudiante == user_id)
-            | (Notificacion.id_profesor == user_id)
-        )
-        .order_by(Notificacion.fecha_creacion.desc())
+    return await NotificacionRepository.inbox(
+        db, user_id, limit, offset, solo_no_leidas
     )
-    result = await db.execute(base_query.limit(limit).offset(offset))
-    return result.scalars().all()
+
+
+@router.get("/user/{user_id}/unread_count", response_model=int)
+async def unread_count(user_id: int, db: AsyncSession = Depends(get_read_db)):
+    return await NotificacionRepository.unread_count(db, user_id)
 
 
 @router.patch("/{notification_id}/read", response_model=NotificacionRead)
@@ -55,20 +113,16 @@ async def mark_as_read(notification_id: int, db: AsyncSession = Depends(get_db))
 
 @router.patch("/user/{user_id}/read_all", response_model=int)
 async def mark_all_as_read(user_id: int, db: AsyncSession = Depends(get_db)):
+    # Un solo UPDATE sobre el rango (id_destinatario, leida = false) del índice
     result = await db.execute(
-        select(Notificacion).where(
-            (
-                (Notificacion.id_estudiante == user_id)
-                | (Notificacion.id_profesor == user_id)
-            )
-            & (Notificacion.leida.is_(False))
+        update(Notificacion)
+        .where(
+            Notificacion.id_destinatario == user_id,
+            Notificacion.leida == false(),
         )
+        .values(leida=True)
+        .execution_options(synchronize_session=False)
     )
-    notis = result.scalars().all()
-    count = 0
-    for n in notis:
-        n.leida = True
-        count += 1
-    if count:
+    if result.rowcount:
         await db.commit()
-    return count
+    return result.rowcount
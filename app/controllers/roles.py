@@ -5,6 +5,7 @@ from sqlalchemy.future import select
 from app.core.deps import get_db
 from app.models.roles import Role
 from app.schemas.roles import RoleCreate, RoleRead
+from app.services.roles import RoleService
 
 router = APIRouter()
 
@@ -26,8 +27,7 @@ async def list_roles(db: AsyncSession = Depends(get_db)):
 
 @router.get("/{role_id}", response_model=RoleRead)
 async def get_role(role_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Role).where(Role.id_rol == role_id))
-    role = result.scalar_one_or_none()
+    role = await RoleService.get_by_id(db, role_id)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     return role
@@ -35,8 +35,7 @@ async def get_role(role_id: int, db: AsyncSession = Depends(get_db)):
 
 @router.delete("/{role_id}", status_code=204)
 async def delete_role(role_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Role).where(Role.id_rol == role_id))
-    role = result.scalar_one_or_none()
+    role = await RoleService.get_by_id(db, role_id)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
     await db.delete(role)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_db
+from app.schemas.trabajos import TrabajoEliminacionRead
+from app.services.eliminacion import EliminacionService
+
+router = APIRouter()
+
+
+@router.get("/{id_trabajo}", response_model=TrabajoEliminacionRead)
+async def get_trabajo(id_trabajo: int, db: AsyncSession = Depends(get_db)):
+    # Primario: el progreso se consulta mientras el trabajo escribe
+    trabajo = await EliminacionService.get(db, id_trabajo)
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return trabajo
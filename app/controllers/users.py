@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.core.deps import get_db
 from app.models.users import User
+from app.schemas.trabajos import TrabajoEliminacionRead
 from app.schemas.users import UserCreate, UserRead, UserUpdate
 from app.models.roles import Role
+from app.repositories.users import UserRepository
+from app.services.eliminacion import EliminacionService
 from app.services.users import UserService
 
 router = APIRouter()
@@ -28,25 +33,17 @@ async def create_user(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
 
 @router.get("/", response_model=list[UserRead])
 async def list_users(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(User))
-    return result.scalars().all()
+    return await UserRepository.get_all(db)
 
 
 @router.get("/profesores", response_model=list[UserRead])
 async def list_profesores(db: AsyncSession = Depends(get_db)):
-    # Find role id for PROFESOR then filter users
-    role_result = await db.execute(select(Role).where(Role.nombre_rol == "PROFESOR"))
-    role = role_result.scalar_one_or_none()
-    if not role:
-        return []
-    result = await db.execute(select(User).where(User.id_rol == role.id_rol))
-    return result.scalars().all()
+    return await UserRepository.get_by_rol(db, "PROFESOR")
 
 
 @router.get("/{user_id}", response_model=UserRead)
 async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(User).where(User.id_usuario == user_id))
-    user = result.scalar_one_or_none()
+    user = await UserRepository.get_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -92,14 +89,21 @@ async def update_user(
     return user
 
 
-@router.delete("/{user_id}", status_code=204)
+@router.delete(
+    "/{user_id}", status_code=204, responses={202: {"model": TrabajoEliminacionRead}}
+)
 async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(User).where(User.id_usuario == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
+    if not await EliminacionService.exists(db, "usuario", user_id):
         raise HTTPException(status_code=404, detail="User not found")
-    await db.delete(user)
-    await db.commit()
+    # Sin dependientes se borra en el acto; si no, se encola un trabajo
+    trabajo = await EliminacionService.solicitar(db, "usuario", user_id)
+    if trabajo is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(TrabajoEliminacionRead(**trabajo)),
+        headers={"Location": f"/trabajos/{trabajo['id_trabajo']}"},
+    )
 
 
 @router.post("/init-users", tags=["Init"])
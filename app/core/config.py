@@ -4,9 +4,95 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: PostgresDsn = Field(..., env="DATABASE_URL")
+    # Réplica de sólo lectura opcional para las rutas de consulta
+    database_replica_url: PostgresDsn | None = Field(None, env="DATABASE_REPLICA_URL")
+    # Tras escribir, las lecturas del mismo cliente van al primario durante este tiempo
+    read_your_writes_seconds: float = Field(5.0, env="READ_YOUR_WRITES_SECONDS")
+    # Log de cada sentencia SQL (sólo para desarrollo)
+    db_echo: bool = Field(False, env="DB_ECHO")
+    # Sentencias preparadas que asyncpg cachea por conexión
+    db_statement_cache_size: int = Field(100, env="DB_STATEMENT_CACHE_SIZE")
+    # Sentencias preparadas que el dialecto de SQLAlchemy cachea por conexión
+    db_prepared_statement_cache_size: int = Field(
+        100, env="DB_PREPARED_STATEMENT_CACHE_SIZE"
+    )
+    # Detrás de PgBouncer en modo transacción: sin caché de sentencias preparadas
+    db_pgbouncer: bool = Field(False, env="DB_PGBOUNCER")
     secret_key: str = Field(..., env="SECRET_KEY")
     algorithm: str = Field(..., env="ALGORITHM")
     access_token_expire_minutes: int = Field(60, env="ACCESS_TOKEN_EXPIRE_MINUTES")
+    # Algoritmos aceptados al verificar (separados por comas; por defecto ALGORITHM)
+    jwt_algorithms: str | None = Field(None, env="JWT_ALGORITHMS")
+    # Claves PEM para algoritmos asimétricos (RS*/ES*); se leen una vez al arrancar
+    jwt_private_key_file: str | None = Field(None, env="JWT_PRIVATE_KEY_FILE")
+    jwt_public_key_file: str | None = Field(None, env="JWT_PUBLIC_KEY_FILE")
+    jwt_cache_size: int = Field(10000, env="JWT_CACHE_SIZE")
+    # Directorio compartido entre workers para agregar métricas (vacío = sólo este proceso)
+    metrics_dir: str | None = Field(None, env="METRICS_DIR")
+    metrics_flush_interval: float = Field(5.0, env="METRICS_FLUSH_INTERVAL")
+    # Readiness: timeout del chequeo de BD y tiempo que se cachea el resultado
+    readiness_db_timeout: float = Field(1.0, env="READINESS_DB_TIMEOUT")
+    readiness_cache_ttl: float = Field(0.3, env="READINESS_CACHE_TTL")
+    ws_max_connections: int = Field(5000, env="WS_MAX_CONNECTIONS")
+    # Máximo de notificaciones pendientes reenviadas al reconectar con ?since=
+    ws_replay_limit: int = Field(200, env="WS_REPLAY_LIMIT")
+    # Mensajes encolados por socket antes de desconectar a un cliente lento
+    ws_client_queue_size: int = Field(500, env="WS_CLIENT_QUEUE_SIZE")
+    # Cada cuánto se envía un comentario keep-alive por las conexiones SSE
+    sse_keepalive_interval: float = Field(15, env="SSE_KEEPALIVE_INTERVAL")
+    # Respuestas guardadas para reintentos con Idempotency-Key
+    idempotency_ttl_hours: int = Field(24, env="IDEMPOTENCY_TTL_HOURS")
+    idempotency_cache_size: int = Field(10000, env="IDEMPOTENCY_CACHE_SIZE")
+    # Plazo que una petición en proceso retiene su clave; pasado ese tiempo se da por
+    # caída (worker reiniciado) y un reintento puede tomarla
+    idempotency_lease_seconds: float = Field(30, env="IDEMPOTENCY_LEASE_SECONDS")
+    idempotency_cleanup_interval: float = Field(
+        3600, env="IDEMPOTENCY_CLEANUP_INTERVAL"
+    )
+    # Rate limiting: "memory" (por worker) o "postgres" (compartido)
+    rate_limit_backend: str = Field("memory", env="RATE_LIMIT_BACKEND")
+    rate_limit_login_burst: int = Field(5, env="RATE_LIMIT_LOGIN_BURST")
+    rate_limit_login_per_minute: float = Field(10, env="RATE_LIMIT_LOGIN_PER_MINUTE")
+    rate_limit_booking_burst: int = Field(10, env="RATE_LIMIT_BOOKING_BURST")
+    rate_limit_booking_per_minute: float = Field(
+        20, env="RATE_LIMIT_BOOKING_PER_MINUTE"
+    )
+    # Tomar la IP de X-Forwarded-For (sólo detrás de un proxy de confianza)
+    trust_forwarded_for: bool = Field(False, env="TRUST_FORWARDED_FOR")
+    # Control de admisión: peticiones simultáneas y espera máxima por un permiso
+    admission_max_concurrency: int = Field(30, env="ADMISSION_MAX_CONCURRENCY")
+    admission_max_wait: float = Field(0.5, env="ADMISSION_MAX_WAIT")
+    admission_retry_after: float = Field(2, env="ADMISSION_RETRY_AFTER")
+    # Retención de notificaciones (particiones mensuales de Notificaciones)
+    notificaciones_retencion_dias: int = Field(180, env="NOTIFICACIONES_RETENCION_DIAS")
+    # Directorio donde archivar las particiones caducadas (vacío = sólo se borran)
+    notificaciones_archivo_dir: str | None = Field(
+        None, env="NOTIFICACIONES_ARCHIVO_DIR"
+    )
+    notificaciones_particiones_futuras: int = Field(
+        3, env="NOTIFICACIONES_PARTICIONES_FUTURAS"
+    )
+    notificaciones_mantenimiento_intervalo: float = Field(
+        3600, env="NOTIFICACIONES_MANTENIMIENTO_INTERVALO"
+    )
+    # Cada cuánto se marcan como completadas las tutorías confirmadas ya terminadas
+    tutorias_completar_intervalo: float = Field(300, env="TUTORIAS_COMPLETAR_INTERVALO")
+    # Borrado en segundo plano: filas por transacción y cada cuánto se buscan trabajos
+    eliminacion_lote: int = Field(1000, env="ELIMINACION_LOTE")
+    eliminacion_intervalo: float = Field(5, env="ELIMINACION_INTERVALO")
+    # Inventario de slots: las franjas semanales se expanden en horarios concretos
+    # (en la zona horaria de la institución) para las próximas semanas
+    zona_horaria: str = Field("America/Bogota", env="ZONA_HORARIA")
+    slots_horizonte_semanas: int = Field(4, env="SLOTS_HORIZONTE_SEMANAS")
+    slot_duracion_minutos: int = Field(60, env="SLOT_DURACION_MINUTOS")
+    slots_refresco_intervalo: float = Field(3600, env="SLOTS_REFRESCO_INTERVALO")
+    # Chatbot: caché de disponibilidad y registro de interacciones en lote
+    chatbot_cache_ttl: float = Field(60, env="CHATBOT_CACHE_TTL")
+    chatbot_log_batch_size: int = Field(100, env="CHATBOT_LOG_BATCH_SIZE")
+    chatbot_log_flush_interval: float = Field(1.0, env="CHATBOT_LOG_FLUSH_INTERVAL")
+    chatbot_log_queue_size: int = Field(10000, env="CHATBOT_LOG_QUEUE_SIZE")
+    # Mensajes de chat pendientes de escribir antes de responder 503
+    chat_queue_size: int = Field(5000, env="CHAT_QUEUE_SIZE")
 
     class Config:
         env_file = ".env"
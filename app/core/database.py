@@ -1,16 +1,85 @@
+import time
+from uuid import uuid4
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.core import metrics
 from app.core.config import settings
 
-engine = create_async_engine(
-    str(settings.database_url),  # <-- así
-    echo=True,
+DB_HOLD = metrics.REGISTRY.register(
+    metrics.Histogram(
+        "db_connection_hold_seconds",
+        "Tiempo que una transacción de sesión retiene una conexión del pool",
+        ("route",),
+    )
 )
 
+
+class TrackedSession(Session):
+    """Session que mide cuánto retiene cada transacción su conexión.
+
+    La AsyncSession toma la conexión en la primera sentencia y la devuelve al
+    terminar la transacción (commit/rollback), así que ambos eventos delimitan
+    el tiempo de retención. ``session.info["route"]`` etiqueta la medición.
+    """
+
+
+@event.listens_for(TrackedSession, "after_begin")
+def _connection_acquired(session, transaction, connection):
+    session.info.setdefault("_checkout", time.perf_counter())
+
+
+@event.listens_for(TrackedSession, "after_transaction_end")
+def _connection_released(session, transaction):
+    if transaction.parent is not None:
+        return
+    start = session.info.pop("_checkout", None)
+    if start is not None:
+        DB_HOLD.observe(
+            time.perf_counter() - start, session.info.get("route", "__background__")
+        )
+
+
+def _engine_kwargs() -> dict:
+    """Opciones comunes del primario y la réplica.
+
+    asyncpg prepara cada sentencia y la cachea por conexión; con PgBouncer en modo
+    transacción la conexión física cambia entre transacciones, así que se
+    desactivan ambas cachés y se dan nombres únicos a las sentencias preparadas.
+    """
+    connect_args = {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+    }
+    if settings.db_pgbouncer:
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return {"echo": settings.db_echo, "connect_args": connect_args}
+
+
+engine = create_async_engine(str(settings.database_url), **_engine_kwargs())
+
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=TrackedSession,
+    expire_on_commit=False,
+)
+
+# Sin réplica configurada las lecturas usan también el primario
+replica_engine = (
+    create_async_engine(str(settings.database_replica_url), **_engine_kwargs())
+    if settings.database_replica_url
+    else None
+)
+
+ReplicaSessionLocal = sessionmaker(
+    bind=replica_engine or engine,
+    class_=AsyncSession,
+    sync_session_class=TrackedSession,
     expire_on_commit=False,
 )
 
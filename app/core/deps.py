@@ -1,8 +1,115 @@
+import hashlib
+import time
 from typing import AsyncGenerator
 
-from app.core.database import AsyncSessionLocal
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, ReplicaSessionLocal, replica_engine
+from app.core.security import get_current_user
+from app.core.uow import UnitOfWork
+from app.models.roles import Role
+from app.models.users import User
 
-async def get_db() -> AsyncGenerator:
+# Cookie con el instante (epoch) hasta el que el cliente debe leer del primario;
+# cubre el caso de que la siguiente lectura la atienda otro worker
+READ_YOUR_WRITES_COOKIE = "ryw_until"
+# cliente -> instante hasta el que lee del primario (sólo este worker)
+_recent_writes: dict[str, float] = {}
+
+
+def _client_key(request: Request) -> str:
+    # El token identifica al usuario sin tener que decodificarlo
+    auth = request.headers.get("authorization")
+    if auth:
+        return hashlib.sha256(auth.encode()).hexdigest()
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def _mark_write(key: str, response: Response):
+    until = time.time() + settings.read_your_writes_seconds
+    if len(_recent_writes) > 100_000:
+        now = time.time()
+        for k in [k for k, v in _recent_writes.items() if v < now]:
+            del _recent_writes[k]
+    _recent_writes[key] = until
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE,
+        f"{until:.3f}",
+        max_age=int(settings.read_your_writes_seconds) + 1,
+        httponly=True,
+    )
+
+
+def _recently_wrote(request: Request) -> bool:
+    now = time.time()
+    if _recent_writes.get(_client_key(request), 0) > now:
+        return True
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > now
+    except ValueError:
+        return False
+
+
+def _route(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "__unmatched__"
+
+
+def _track_writes(session, request: Request, response: Response):
+    if replica_engine is None:
+        return
+    key = _client_key(request)
+
+    @event.listens_for(session.sync_session, "after_commit")
+    def _on_commit(_session):
+        _mark_write(key, response)
+
+
+async def get_db(request: Request, response: Response) -> AsyncGenerator:
+    """Sesión del primario; cada commit abre la ventana de read-your-writes."""
     async with AsyncSessionLocal() as session:
+        session.info["route"] = _route(request)
+        _track_writes(session, request, response)
+        yield session
+
+
+async def get_read_db(request: Request) -> AsyncGenerator:
+    """Sesión para rutas de sólo lectura: réplica salvo escritura reciente."""
+    factory = AsyncSessionLocal if _recently_wrote(request) else ReplicaSessionLocal
+    async with factory() as session:
+        session.info["route"] = _route(request)
         yield session
+
+
+async def get_uow(request: Request, response: Response) -> AsyncGenerator:
+    """Unidad de trabajo del primario con checkout perezoso (ver app.core.uow)."""
+    uow = UnitOfWork(AsyncSessionLocal, _route(request))
+    uow.on_session(lambda session: _track_writes(session, request, response))
+    try:
+        yield uow
+    finally:
+        await uow.close()
+
+
+async def require_admin(
+    user_id: str = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+) -> str:
+    """Sólo deja pasar a usuarios con rol ADMINISTRADOR.
+
+    El rol se lee de la base y no del token para que un cambio de rol surta
+    efecto sin esperar a que caduque; get_db se comparte con la ruta.
+    """
+    rol = await db.scalar(
+        select(Role.nombre_rol)
+        .join(User, User.id_rol == Role.id_rol)
+        .where(User.id_usuario == int(user_id))
+    )
+    if rol != "ADMINISTRADOR":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Se requiere rol de administrador",
+        )
+    return user_id
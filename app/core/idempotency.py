@@ -0,0 +1,241 @@
+"""Soporte para la cabecera ``Idempotency-Key`` en las mutaciones de tutorías.
+
+Un reintento (p. ej. de la app móvil tras perder la respuesta) del mismo usuario
+(o de la misma IP si es anónimo) con la misma clave, método y ruta recibe la
+respuesta original en lugar de ejecutar la mutación otra vez. Las respuestas se
+guardan en la tabla ``IdempotencyKeys`` (compartida entre workers) con una caché
+LRU en memoria delante para los reintentos inmediatos.
+
+Mientras la petición original está en proceso la fila queda reservada hasta
+``bloqueado_hasta``; si el worker cae sin responder, un reintento posterior a ese
+plazo la toma. ``purgar_caducadas`` (tarea del scheduler) borra las filas vencidas.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.middleware import caller_identity
+from app.models.idempotency import IdempotencyKey
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+IDEMPOTENT_PREFIXES = ("/tutorias",)
+IDEMPOTENCY_TTL = timedelta(hours=settings.idempotency_ttl_hours)
+IDEMPOTENCY_LEASE = timedelta(seconds=settings.idempotency_lease_seconds)
+
+
+class _ResponseCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if time.monotonic() - item[0] > self.ttl:
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return item[1]
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+_cache = _ResponseCache(
+    settings.idempotency_cache_size, IDEMPOTENCY_TTL.total_seconds()
+)
+
+
+async def _send_stored(send, status_code: int, content_type: str | None, body: bytes):
+    headers = [(b"idempotent-replayed", b"true")]
+    if content_type:
+        headers.append((b"content-type", content_type.encode()))
+    headers.append((b"content-length", str(len(body)).encode()))
+    await send(
+        {"type": "http.response.start", "status": status_code, "headers": headers}
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_error(send, status_code: int, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await _send_stored(send, status_code, "application/json", body)
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        clave = None
+        for name, value in scope["headers"]:
+            if name == b"idempotency-key":
+                clave = value.decode("latin-1").strip()
+                break
+        if not clave or not path.startswith(IDEMPOTENT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        if len(clave) > 255:
+            await _send_error(send, 400, "Idempotency-Key demasiado larga")
+            return
+
+        # Se lee el cuerpo completo para calcular su huella y luego se re-entrega
+        chunks = []
+        more = True
+        while more:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+        body = b"".join(chunks)
+        huella = hashlib.sha256(body).hexdigest()
+        ambito = caller_identity(scope)
+        key = (ambito, clave, scope["method"], path)
+
+        cached = _cache.get(key)
+        if cached is not None:
+            if cached[0] != huella:
+                await _send_error(
+                    send, 422, "Idempotency-Key reutilizada con otro cuerpo"
+                )
+                return
+            await _send_stored(send, *cached[1:])
+            return
+
+        pk = and_(
+            IdempotencyKey.ambito == ambito,
+            IdempotencyKey.clave == clave,
+            IdempotencyKey.metodo == scope["method"],
+            IdempotencyKey.ruta == path,
+        )
+        async with engine.begin() as conn:
+            # Reclama la clave; en la misma sentencia se reutiliza una fila caducada
+            # o una en proceso con el mismo cuerpo cuyo plazo venció (worker caído)
+            stmt = pg_insert(IdempotencyKey).values(
+                ambito=ambito,
+                clave=clave,
+                metodo=scope["method"],
+                ruta=path,
+                huella=huella,
+                bloqueado_hasta=func.now() + IDEMPOTENCY_LEASE,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["ambito", "clave", "metodo", "ruta"],
+                set_={
+                    "huella": huella,
+                    "status_code": None,
+                    "cuerpo": None,
+                    "content_type": None,
+                    "bloqueado_hasta": func.now() + IDEMPOTENCY_LEASE,
+                    "fecha_creacion": func.now(),
+                },
+                where=or_(
+                    IdempotencyKey.fecha_creacion < func.now() - IDEMPOTENCY_TTL,
+                    and_(
+                        IdempotencyKey.status_code.is_(None),
+                        IdempotencyKey.bloqueado_hasta < func.now(),
+                        IdempotencyKey.huella == huella,
+                    ),
+                ),
+            ).returning(IdempotencyKey.bloqueado_hasta)
+            plazo = (await conn.execute(stmt)).scalar_one_or_none()
+            claimed = plazo is not None
+            if not claimed:
+                row = (
+                    await conn.execute(
+                        select(
+                            IdempotencyKey.huella,
+                            IdempotencyKey.status_code,
+                            IdempotencyKey.content_type,
+                            IdempotencyKey.cuerpo,
+                        ).where(pk)
+                    )
+                ).first()
+
+        if not claimed:
+            if row is None or row.huella != huella:
+                await _send_error(
+                    send, 422, "Idempotency-Key reutilizada con otro cuerpo"
+                )
+            elif row.status_code is None:
+                await _send_error(send, 409, "La petición original sigue en proceso")
+            else:
+                stored = (row.huella, row.status_code, row.content_type, row.cuerpo)
+                _cache.set(key, stored)
+                await _send_stored(send, *stored[1:])
+            return
+
+        delivered = False
+
+        async def replay_receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = 500
+        content_type = None
+        response_chunks = []
+
+        async def capture_send(message):
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        content_type = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        # Sólo se escribe sobre la reserva propia: si el plazo venció y otro
+        # reintento tomó la fila, el resultado de éste ya no se guarda
+        propia = and_(pk, IdempotencyKey.bloqueado_hasta == plazo)
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        finally:
+            async with engine.begin() as conn:
+                if status_code >= 500:
+                    # Fallo del servidor: se libera la clave para permitir el reintento
+                    await conn.execute(delete(IdempotencyKey).where(propia))
+                else:
+                    cuerpo = b"".join(response_chunks)
+                    result = await conn.execute(
+                        update(IdempotencyKey)
+                        .where(propia)
+                        .values(
+                            status_code=status_code,
+                            content_type=content_type,
+                            cuerpo=cuerpo,
+                            bloqueado_hasta=None,
+                        )
+                    )
+                    if result.rowcount:
+                        _cache.set(key, (huella, status_code, content_type, cuerpo))
+
+
+async def purgar_caducadas():
+    """Borra las respuestas guardadas que ya superaron ``IDEMPOTENCY_TTL``."""
+    async with engine.begin() as conn:
+        await conn.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.fecha_creacion < func.now() - IDEMPOTENCY_TTL
+            )
+        )
@@ -0,0 +1,324 @@
+"""Métricas en formato de exposición de texto de Prometheus, sin dependencias externas.
+
+Cada worker de uvicorn mantiene sus propias series en memoria. Si se configura
+``METRICS_DIR`` (un directorio compartido por todos los workers del mismo host),
+cada worker vuelca periódicamente una instantánea en ``metrics_<pid>.json`` y
+``/metrics`` fusiona todas las instantáneas vivas, de modo que el scrape refleja
+la suma de todo el proceso maestro y no sólo la del worker que lo atendió.
+"""
+
+import json
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.series: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self.series[labels] = self.series.get(labels, 0.0) + amount
+
+    def dump(self) -> list:
+        return [[list(k), v] for k, v in self.series.items()]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, *labels: str, value: float):
+        self.series[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count por bucket..., suma, total]
+        self.series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        data = self.series.get(labels)
+        if data is None:
+            data = [0.0] * (len(self.buckets) + 2)
+            self.series[labels] = data
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                data[i] += 1
+        data[-2] += value
+        data[-1] += 1
+
+    def dump(self) -> list:
+        return [[list(k), list(v)] for k, v in self.series.items()]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, object] = {}
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, fn: Callable[[], None]):
+        """Registra una función que actualiza gauges justo antes de cada instantánea."""
+        self.collectors.append(fn)
+
+    def snapshot(self) -> dict:
+        for collect in self.collectors:
+            try:
+                collect()
+            except Exception:
+                # Un colector roto no debe tumbar el scrape
+                pass
+        snap = {}
+        for m in self.metrics.values():
+            entry = {
+                "type": m.type,
+                "help": m.help,
+                "labelnames": list(m.labelnames),
+                "series": m.dump(),
+            }
+            if m.type == "histogram":
+                entry["buckets"] = list(m.buckets)
+            snap[m.name] = entry
+        return snap
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Latencia de las peticiones HTTP por plantilla de ruta",
+        ("method", "route"),
+    )
+)
+HTTP_REQUESTS_TOTAL = REGISTRY.register(
+    Counter(
+        "http_requests_total",
+        "Peticiones HTTP atendidas por plantilla de ruta y código",
+        ("method", "route", "status"),
+    )
+)
+HTTP_IN_FLIGHT = REGISTRY.register(
+    Gauge(
+        "http_requests_in_flight",
+        "Peticiones HTTP en curso",
+        ("method",),
+    )
+)
+DB_POOL = REGISTRY.register(
+    Gauge(
+        "db_pool_connections",
+        "Conexiones del pool de SQLAlchemy por estado",
+        ("engine", "state"),
+    )
+)
+WS_CONNECTIONS = REGISTRY.register(
+    Gauge("ws_connections", "Sockets de notificaciones conectados")
+)
+WS_USERS = REGISTRY.register(
+    Gauge("ws_connected_users", "Usuarios con al menos un socket conectado")
+)
+WS_QUEUED = REGISTRY.register(
+    Gauge("ws_queued_messages", "Mensajes pendientes de envío por WebSocket")
+)
+
+
+def _collect_db_pool():
+    # Import local para evitar acoplar el registro a la configuración de la BD
+    from app.core.database import engine, replica_engine
+
+    engines = [("primary", engine)]
+    if replica_engine is not None:
+        engines.append(("replica", replica_engine))
+    for name, eng in engines:
+        pool = eng.pool
+        DB_POOL.set(name, "size", value=pool.size())
+        DB_POOL.set(name, "checked_out", value=pool.checkedout())
+        DB_POOL.set(name, "checked_in", value=pool.checkedin())
+        # overflow() arranca en -pool_size hasta que se abre la primera conexión
+        DB_POOL.set(name, "overflow", value=max(pool.overflow(), 0))
+
+
+def _collect_ws():
+    from app.core.ws_manager import manager
+
+    WS_CONNECTIONS.set(value=manager.connection_count())
+    WS_USERS.set(value=len(manager.active))
+    WS_QUEUED.set(value=manager.pending)
+
+
+REGISTRY.add_collector(_collect_db_pool)
+REGISTRY.add_collector(_collect_ws)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mide latencia y concurrencia de las peticiones HTTP."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec(method)
+            route = scope.get("route")
+            # Se usa la plantilla (/tutorias/{id_tutoria}) para no explotar la cardinalidad
+            template = getattr(route, "path", None) or "__unmatched__"
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method, template)
+            HTTP_REQUESTS_TOTAL.inc(method, template, str(status_code))
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(settings.metrics_dir, f"metrics_{pid}.json")
+
+
+def flush() -> None:
+    """Vuelca la instantánea de este worker al directorio compartido (si existe)."""
+    if not settings.metrics_dir:
+        return
+    os.makedirs(settings.metrics_dir, exist_ok=True)
+    path = _snapshot_path(os.getpid())
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(REGISTRY.snapshot(), fh)
+    os.replace(tmp, path)
+
+
+def remove_snapshot() -> None:
+    if not settings.metrics_dir:
+        return
+    try:
+        os.remove(_snapshot_path(os.getpid()))
+    except FileNotFoundError:
+        pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _load_snapshots() -> List[dict]:
+    if not settings.metrics_dir:
+        return [REGISTRY.snapshot()]
+    flush()
+    snaps = []
+    for name in os.listdir(settings.metrics_dir):
+        if not (name.startswith("metrics_") and name.endswith(".json")):
+            continue
+        path = os.path.join(settings.metrics_dir, name)
+        pid = int(name[len("metrics_") : -len(".json")])
+        if not _pid_alive(pid):
+            # Worker muerto: sus gauges ya no representan nada real
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        try:
+            with open(path) as fh:
+                snaps.append(json.load(fh))
+        except (OSError, ValueError):
+            continue
+    return snaps
+
+
+def _merge(snaps: List[dict]) -> dict:
+    merged: dict = {}
+    for snap in snaps:
+        for name, entry in snap.items():
+            target = merged.setdefault(name, {**entry, "series": {}})
+            for labels, value in entry["series"]:
+                key = tuple(labels)
+                if entry["type"] == "histogram":
+                    current = target["series"].get(key)
+                    if current is None:
+                        target["series"][key] = list(value)
+                    else:
+                        target["series"][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target["series"][key] = target["series"].get(key, 0.0) + value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render() -> str:
+    lines: List[str] = []
+    for name, entry in sorted(_merge(_load_snapshots()).items()):
+        lines.append(f"# HELP {name} {entry['help']}")
+        lines.append(f"# TYPE {name} {entry['type']}")
+        names = entry["labelnames"]
+        for labels, value in sorted(entry["series"].items()):
+            if entry["type"] == "histogram":
+                for bound, count in zip(entry["buckets"], value):
+                    le = _labels(names, labels, ("le", _fmt(bound)))
+                    lines.append(f"{name}_bucket{le} {_fmt(count)}")
+                inf = _labels(names, labels, ("le", "+Inf"))
+                lines.append(f"{name}_bucket{inf} {_fmt(value[-1])}")
+                lines.append(f"{name}_sum{_labels(names, labels)} {repr(value[-2])}")
+                lines.append(f"{name}_count{_labels(names, labels)} {_fmt(value[-1])}")
+            else:
+                lines.append(f"{name}{_labels(names, labels)} {_fmt(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,288 @@
+"""Rate limiting (token bucket) y control de admisión por concurrencia.
+
+- ``RateLimitMiddleware`` aplica cubetas de tokens por regla (ruta + método) y por
+  clave (IP o usuario del token). El backend en memoria sirve para un solo worker;
+  el de Postgres comparte las cubetas entre todos los workers/instancias.
+- ``AdmissionControlMiddleware`` limita cuántas peticiones trabajan a la vez contra
+  la base de datos. Si una petición espera un permiso más de ``admission_max_wait``
+  segundos, responde 503 con ``Retry-After`` en lugar de encolarse sin límite.
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import text
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.tokens import verifier
+
+RATE_LIMITED = metrics.REGISTRY.register(
+    metrics.Counter(
+        "rate_limit_rejections_total",
+        "Peticiones rechazadas por rate limiting",
+        ("rule",),
+    )
+)
+ADMISSION_REJECTED = metrics.REGISTRY.register(
+    metrics.Counter(
+        "admission_rejections_total",
+        "Peticiones rechazadas por el control de admisión",
+    )
+)
+ADMISSION_WAITING = metrics.REGISTRY.register(
+    metrics.Gauge(
+        "admission_waiting_requests",
+        "Peticiones esperando un permiso del control de admisión",
+    )
+)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    name: str
+    method: str
+    path: str
+    capacity: int  # ráfaga máxima
+    per_minute: float  # ritmo sostenido
+    key: str  # "ip" | "user"
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60.0
+
+
+RULES = [
+    RateLimitRule(
+        "login",
+        "POST",
+        "/auth/login",
+        settings.rate_limit_login_burst,
+        settings.rate_limit_login_per_minute,
+        "ip",
+    ),
+    RateLimitRule(
+        "booking",
+        "POST",
+        "/tutorias/",
+        settings.rate_limit_booking_burst,
+        settings.rate_limit_booking_per_minute,
+        "user",
+    ),
+    RateLimitRule(
+        "booking",
+        "POST",
+        "/tutorias/recurrentes",
+        settings.rate_limit_booking_burst,
+        settings.rate_limit_booking_per_minute,
+        "user",
+    ),
+    RateLimitRule(
+        "booking",
+        "POST",
+        "/tutorias/slots/{id_slot}",
+        settings.rate_limit_booking_burst,
+        settings.rate_limit_booking_per_minute,
+        "user",
+    ),
+]
+_RULES_BY_ROUTE = {(r.method, r.path): r for r in RULES if "{" not in r.path}
+
+
+def _template_regex(path: str) -> re.Pattern:
+    # Cada {param} de la plantilla casa con un segmento de la ruta
+    partes = re.split(r"\{[^/]+?\}", path)
+    return re.compile("[^/]+".join(re.escape(p) for p in partes) + "$")
+
+
+_TEMPLATE_RULES = [
+    (r.method, _template_regex(r.path), r) for r in RULES if "{" in r.path
+]
+
+
+def _match_rule(method: str, path: str) -> RateLimitRule | None:
+    rule = _RULES_BY_ROUTE.get((method, path))
+    if rule is None:
+        for rule_method, pattern, candidate in _TEMPLATE_RULES:
+            if rule_method == method and pattern.match(path):
+                return candidate
+    return rule
+
+
+class InMemoryBackend:
+    def __init__(self) -> None:
+        # clave -> (tokens, instante de la última recarga)
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    async def take(self, key: str, capacity: int, rate: float) -> float:
+        """Consume un token; devuelve 0 si se permitió o los segundos a esperar."""
+        now = time.monotonic()
+        if len(self._buckets) > 100_000:
+            # Cota burda de memoria: las cubetas descartadas vuelven llenas
+            self._buckets.clear()
+        tokens, last = self._buckets.get(key, (float(capacity), now))
+        tokens = min(capacity, tokens + (now - last) * rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / rate
+
+
+class PostgresBackend:
+    # Recarga y consumo en una sola sentencia atómica: el ON CONFLICT DO UPDATE
+    # bloquea la fila, así varios workers comparten la misma cubeta sin carreras.
+    # En el SET las referencias a b.* ven la fila anterior.
+    _REFILL = (
+        "LEAST(:capacidad, b.tokens"
+        " + EXTRACT(EPOCH FROM clock_timestamp() - b.actualizado) * :ritmo)"
+    )
+    _TAKE = text(f"""
+        INSERT INTO "RateLimitBuckets" AS b (clave, tokens, permitido, actualizado)
+        VALUES (:clave, :capacidad - 1, true, clock_timestamp())
+        ON CONFLICT (clave) DO UPDATE SET
+            tokens = CASE WHEN {_REFILL} >= 1 THEN {_REFILL} - 1 ELSE {_REFILL} END,
+            permitido = {_REFILL} >= 1,
+            actualizado = clock_timestamp()
+        RETURNING tokens, permitido
+        """)
+    _CLEANUP = text(
+        """DELETE FROM "RateLimitBuckets" WHERE actualizado < now() - interval '1 hour'"""
+    )
+
+    async def take(self, key: str, capacity: int, rate: float) -> float:
+        from app.core.database import engine
+
+        async with engine.begin() as conn:
+            row = (
+                await conn.execute(
+                    self._TAKE, {"clave": key, "capacidad": capacity, "ritmo": rate}
+                )
+            ).first()
+            # Limpieza ocasional de cubetas inactivas (ya estarían llenas)
+            if random.random() < 0.001:
+                await conn.execute(self._CLEANUP)
+        if row.permitido:
+            return 0.0
+        return (1 - row.tokens) / rate
+
+
+def _client_ip(scope) -> str:
+    if settings.trust_forwarded_for:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _user_key(scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            token = value.decode("latin-1").removeprefix("Bearer ").strip()
+            sub = verifier.subject(token)
+            return f"user:{sub}" if sub else None
+    return None
+
+
+def caller_identity(scope) -> str:
+    """Usuario autenticado de la petición o, si es anónima, su IP."""
+    return _user_key(scope) or f"ip:{_client_ip(scope)}"
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, backend=None):
+        self.app = app
+        if backend is None:
+            backend = (
+                PostgresBackend()
+                if settings.rate_limit_backend == "postgres"
+                else InMemoryBackend()
+            )
+        self.backend = backend
+
+    async def __call__(self, scope, receive, send):
+        rule = None
+        if scope["type"] == "http":
+            rule = _match_rule(scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        identity = (_user_key(scope) if rule.key == "user" else None) or (
+            f"ip:{_client_ip(scope)}"
+        )
+        try:
+            wait = await self.backend.take(
+                f"{rule.name}:{identity}", rule.capacity, rule.rate
+            )
+        except Exception:
+            # Si el backend compartido falla se deja pasar: mejor sin límite que caído
+            wait = 0.0
+        if wait > 0:
+            RATE_LIMITED.inc(rule.name)
+            await _reject(send, 429, "Demasiadas solicitudes, intente más tarde", wait)
+            return
+        await self.app(scope, receive, send)
+
+
+class AdmissionControlMiddleware:
+    # Rutas que no tocan la base de datos o que deben responder siempre; el stream
+    # SSE es de larga duración y retendría un permiso mientras siga abierto
+    EXEMPT_PREFIXES = (
+        "/health",
+        "/metrics",
+        "/docs",
+        "/openapi.json",
+        "/notifications/stream",
+    )
+
+    def __init__(self, app):
+        self.app = app
+        self.max_wait = settings.admission_max_wait
+        self._permits = asyncio.Semaphore(settings.admission_max_concurrency)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        ADMISSION_WAITING.inc()
+        try:
+            await asyncio.wait_for(self._permits.acquire(), self.max_wait)
+        except asyncio.TimeoutError:
+            ADMISSION_REJECTED.inc()
+            await _reject(
+                send,
+                503,
+                "Servicio saturado, intente nuevamente",
+                settings.admission_retry_after,
+            )
+            return
+        finally:
+            ADMISSION_WAITING.dec()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._permits.release()
@@ -1,17 +1,16 @@
-import os
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from passlib.context import CryptContext
 
-load_dotenv()
+from app.core.config import settings
+from app.core.tokens import TokenError, verifier
 
-SECRET_KEY = os.environ.get("SECRET_KEY")
-ALGORITHM = os.environ.get("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+# Se mantienen por compatibilidad; la fuente de verdad es Settings
+SECRET_KEY = settings.secret_key
+ALGORITHM = settings.algorithm
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -26,11 +25,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    return verifier.issue(data, expires_delta)
 
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
@@ -40,11 +35,11 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        # Puedes retornar solo el user_id, o consultar el user en la DB aquí.
-        return user_id
-    except JWTError:
+        payload = verifier.verify(token)
+    except TokenError:
         raise credentials_exception
+    user_id: int = payload.get("sub")
+    if user_id is None:
+        raise credentials_exception
+    # Puedes retornar solo el user_id, o consultar el user en la DB aquí.
+    return user_id
@@ -0,0 +1,108 @@
+"""Verificación de JWT compartida por HTTP, WebSocket y middlewares.
+
+Los tokens ya verificados se guardan en una caché LRU acotada indexada por el
+SHA-256 del token (nunca el token en claro) hasta su ``exp``, así un cliente que
+consulta a menudo no paga la verificación de firma en cada petición. Las claves
+se cargan una sola vez al importar el módulo: ``secret_key`` para HS*, o los
+ficheros PEM de ``jwt_private_key_file`` / ``jwt_public_key_file`` para RS*/ES*.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+
+class TokenError(Exception):
+    """Token inválido, caducado o firmado con una clave/algoritmo no aceptado."""
+
+
+def _read(path: Optional[str]) -> Optional[str]:
+    if not path:
+        return None
+    with open(path) as fh:
+        return fh.read()
+
+
+class TokenVerifier:
+    def __init__(
+        self,
+        algorithms: list[str],
+        verify_key,
+        signing_key=None,
+        signing_algorithm: Optional[str] = None,
+        cache_size: int = 10000,
+    ) -> None:
+        self.algorithms = algorithms
+        self.signing_algorithm = signing_algorithm or algorithms[0]
+        self._verify_key = verify_key
+        self._signing_key = signing_key
+        self.cache_size = cache_size
+        # sha256(token) -> (payload, exp)
+        self._cache: OrderedDict = OrderedDict()
+
+    @classmethod
+    def from_settings(cls) -> "TokenVerifier":
+        algorithms = [
+            a.strip()
+            for a in (settings.jwt_algorithms or settings.algorithm).split(",")
+            if a.strip()
+        ]
+        if settings.algorithm.startswith("HS"):
+            verify_key = signing_key = settings.secret_key
+        else:
+            signing_key = _read(settings.jwt_private_key_file)
+            verify_key = _read(settings.jwt_public_key_file) or signing_key
+        return cls(
+            algorithms,
+            verify_key,
+            signing_key,
+            settings.algorithm,
+            settings.jwt_cache_size,
+        )
+
+    def verify(self, token: str) -> dict:
+        digest = hashlib.sha256(token.encode()).digest()
+        cached = self._cache.get(digest)
+        if cached is not None:
+            payload, exp = cached
+            if exp is None or exp > time.time():
+                self._cache.move_to_end(digest)
+                return dict(payload)
+            self._cache.pop(digest, None)
+            raise TokenError("Token expirado")
+
+        try:
+            payload = jwt.decode(token, self._verify_key, algorithms=self.algorithms)
+        except JWTError as e:
+            raise TokenError(str(e)) from e
+        exp = payload.get("exp")
+        self._cache[digest] = (payload, float(exp) if exp is not None else None)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return dict(payload)
+
+    def subject(self, token: str) -> Optional[str]:
+        """``sub`` del token o None si no es válido."""
+        try:
+            return self.verify(token).get("sub")
+        except TokenError:
+            return None
+
+    def issue(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
+        if self._signing_key is None:
+            raise RuntimeError("No hay clave privada configurada para firmar tokens")
+        to_encode = data.copy()
+        expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=15))
+        to_encode.update({"exp": expire})
+        return jwt.encode(
+            to_encode, self._signing_key, algorithm=self.signing_algorithm
+        )
+
+
+verifier = TokenVerifier.from_settings()
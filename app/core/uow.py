@@ -0,0 +1,47 @@
+"""Unidad de trabajo por petición con transacciones cortas.
+
+La sesión se crea al primer uso y no toma conexión del pool hasta la primera
+sentencia; ``commit()`` y ``release()`` terminan la transacción y devuelven la
+conexión de inmediato. Los handlers deben hacerlo antes de cualquier espera que
+no sea de base de datos (WebSocket, colas, servicios externos) para no retener
+una conexión del pool durante E/S de red.
+"""
+
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class UnitOfWork:
+    def __init__(self, factory, route: Optional[str] = None) -> None:
+        self._factory = factory
+        self._route = route
+        self._session: Optional[AsyncSession] = None
+        self._on_session = []
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._factory()
+            self._session.info["route"] = self._route
+            for hook in self._on_session:
+                hook(self._session)
+        return self._session
+
+    def on_session(self, hook):
+        """Registra una función a aplicar a la sesión cuando se cree."""
+        self._on_session.append(hook)
+
+    async def commit(self):
+        if self._session is not None:
+            await self._session.commit()
+
+    async def release(self):
+        """Cierra la transacción en curso (rollback si no se confirmó) y suelta la conexión."""
+        if self._session is not None and self._session.in_transaction():
+            await self._session.rollback()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -1,40 +1,316 @@
-from typing import Dict, Set
-from fastapi import WebSocket
+"""Conexiones WebSocket y Server-Sent Events de notificaciones.
+
+Cada socket es un ``WsClient`` con su propia cola y una tarea escritora, así un
+cliente lento no frena el fan-out a los demás. Los clientes SSE (``SseClient``)
+comparten la misma cola y el mismo ``ConnectionManager``; la respuesta HTTP
+consume la cola directamente. El cliente WebSocket puede negociar al
+conectar la codificación de los mensajes y una ventana de agrupación:
+
+- ``json``: el formato original con claves completas (por defecto).
+- ``compact``: JSON con claves cortas (ver ``COMPACT_KEYS``).
+- ``msgpack``: las mismas claves cortas en MessagePack (frames binarios). Requiere
+  el paquete ``msgpack``; si no está instalado no se ofrece (``ENCODINGS``) y el
+  endpoint rechaza la conexión con 4400.
+
+Con ``batch_ms > 0`` los mensajes que llegan dentro de la ventana se envían en un
+único frame (``{"type": "batch", "items": [...]}``, ``{"t": "b", "i": [...]}`` o
+un array MessagePack).
+"""
+
 import asyncio
+import json
+import struct
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+
+try:
+    import msgpack
+except ImportError:  # dependencia opcional
+    msgpack = None
+
+# Codificaciones que se aceptan al conectar
+ENCODINGS = ("json", "compact") + (("msgpack",) if msgpack is not None else ())
+COMPACT_KEYS = {
+    "type": "t",
+    "id": "i",
+    "titulo": "ti",
+    "descripcion": "d",
+    "leida": "l",
+    "fecha_creacion": "f",
+    "tipo": "k",
+    "count": "c",
+    "truncated": "tr",
+    "last_id": "li",
+    "id_mensaje": "im",
+    "id_tutoria": "tu",
+    "id_remitente": "r",
+    "contenido": "co",
+    "fecha_envio": "fe",
+}
+COMPACT_TYPES = {"notification": "n", "replay": "r", "chat": "c"}
+MAX_BATCH = 100
+
+
+def _compact(message: dict) -> dict:
+    out = {COMPACT_KEYS.get(k, k): v for k, v in message.items()}
+    if "t" in out:
+        out["t"] = COMPACT_TYPES.get(out["t"], out["t"])
+    return out
+
+
+def _msgpack_array_header(n: int) -> bytes:
+    if n < 16:
+        return bytes((0x90 | n,))
+    if n < 0x10000:
+        return b"\xdc" + struct.pack(">H", n)
+    return b"\xdd" + struct.pack(">I", n)
+
+
+def encode(message: dict, encoding: str):
+    if encoding == "json":
+        return json.dumps(
+            message, separators=(",", ":"), ensure_ascii=False, default=str
+        )
+    if encoding == "compact":
+        return json.dumps(
+            _compact(message), separators=(",", ":"), ensure_ascii=False, default=str
+        )
+    return msgpack.packb(_compact(message), default=str)
+
+
+def frame(items: list, encoding: str):
+    """Une varios mensajes ya codificados en un frame sin volver a serializarlos."""
+    if len(items) == 1:
+        return items[0]
+    if encoding == "json":
+        return '{"type":"batch","items":[' + ",".join(items) + "]}"
+    if encoding == "compact":
+        return '{"t":"b","i":[' + ",".join(items) + "]}"
+    return _msgpack_array_header(len(items)) + b"".join(items)
+
+
+class QueuedClient(ABC):
+    """Cola de mensajes por conexión, común a WebSocket y SSE."""
+
+    encoding = "json"
+
+    def __init__(self, user_id: int) -> None:
+        self.user_id = user_id
+        # (id del mensaje o None, mensaje codificado)
+        self.queue: asyncio.Queue = asyncio.Queue(settings.ws_client_queue_size)
+        # Mientras se hace el reenvío inicial lo que llega en vivo se retiene aquí
+        self.held: Optional[list] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def put(self, item: tuple) -> bool:
+        if self.held is not None:
+            self.held.append(item)
+            return True
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    @abstractmethod
+    async def close(self, code: int = 1000):
+        """Cierra la conexión; ``code`` es el código de cierre WebSocket."""
+
+
+class WsClient(QueuedClient):
+    def __init__(
+        self,
+        user_id: int,
+        websocket: WebSocket,
+        encoding: str = "json",
+        batch_window: float = 0.0,
+    ) -> None:
+        super().__init__(user_id)
+        if encoding == "msgpack" and msgpack is None:
+            encoding = "compact"
+        self.websocket = websocket
+        self.encoding = encoding
+        self.batch_window = batch_window
+
+    async def close(self, code: int = 1000):
+        await self.websocket.close(code=code)
+
+    async def _send_frame(self, data):
+        if isinstance(data, bytes):
+            await self.websocket.send_bytes(data)
+        else:
+            await self.websocket.send_text(data)
+
+    async def run(self):
+        while True:
+            items = [(await self.queue.get())[1]]
+            # Sin ventana negociada se conserva un mensaje por frame
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+                while len(items) < MAX_BATCH and not self.queue.empty():
+                    items.append(self.queue.get_nowait()[1])
+            await self._send_frame(frame(items, self.encoding))
+
+
+def _sse_event(message_id, data: str) -> str:
+    if message_id is None:
+        return f"data: {data}\n\n"
+    return f"id: {message_id}\ndata: {data}\n\n"
+
+
+class SseClient(QueuedClient):
+    """Cliente Server-Sent Events: siempre JSON y sin tarea escritora propia."""
+
+    # Milisegundos que el navegador espera antes de reconectar
+    RETRY_MS = 3000
+
+    async def close(self, code: int = 1000):
+        # Se vacía la cola para que quepa la marca de fin que corta ``stream``
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.held = None
+        self.queue.put_nowait((None, None))
+
+    async def stream(self, keepalive: float):
+        """Eventos SSE; un comentario cada ``keepalive`` segundos mantiene viva la
+        conexión a través de proxies que cortan conexiones inactivas."""
+        yield f"retry: {self.RETRY_MS}\n\n"
+        while True:
+            try:
+                item = await asyncio.wait_for(self.queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            items = [item]
+            while len(items) < MAX_BATCH and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            chunk = []
+            for message_id, data in items:
+                if data is None:
+                    if chunk:
+                        yield "".join(chunk)
+                    return
+                chunk.append(_sse_event(message_id, data))
+            yield "".join(chunk)
 
 
 class ConnectionManager:
     def __init__(self) -> None:
-        # user_id -> set of websockets
-        self.active: Dict[int, Set[WebSocket]] = {}
+        # user_id -> clientes conectados
+        self.active: Dict[int, Set[QueuedClient]] = {}
         self._lock = asyncio.Lock()
 
-    async def connect(self, user_id: int, websocket: WebSocket):
+    @property
+    def pending(self) -> int:
+        """Mensajes encolados que aún no se enviaron."""
+        return sum(c.queue.qsize() for cs in self.active.values() for c in cs)
+
+    async def connect(
+        self,
+        user_id: int,
+        websocket: WebSocket,
+        encoding: str = "json",
+        batch_window: float = 0.0,
+        replay: bool = False,
+    ) -> WsClient:
         await websocket.accept()
+        client = WsClient(user_id, websocket, encoding, batch_window)
+        client.task = asyncio.create_task(self._writer(client))
+        await self.register(client, replay)
+        return client
+
+    async def register(self, client: QueuedClient, replay: bool = False):
+        """Da de alta un cliente; con ``replay`` retiene lo que llegue en vivo hasta
+        ``finish_replay``."""
+        if replay:
+            client.held = []
         async with self._lock:
-            self.active.setdefault(user_id, set()).add(websocket)
+            self.active.setdefault(client.user_id, set()).add(client)
 
-    async def disconnect(self, user_id: int, websocket: WebSocket):
+    async def finish_replay(self, client: QueuedClient, messages: list, summary: dict):
+        """Encola el reenvío y pasa el cliente a entrega en vivo.
+
+        Lo retenido mientras tanto se entrega después, descartando lo que ya venía
+        en el reenvío. Si no cabe en la cola se desconecta como en ``send_batch``.
+        """
+        last_id = summary["last_id"]
+        held, client.held = client.held or [], None
+        items = [
+            (message.get("id"), encode(message, client.encoding))
+            for message in messages
+        ]
+        items.append((None, encode(summary, client.encoding)))
+        items.extend(item for item in held if item[0] is None or item[0] > last_id)
+        for item in items:
+            if not client.put(item):
+                await self._drop_slow(client)
+                return
+
+    async def disconnect(self, client: QueuedClient):
         async with self._lock:
-            conns = self.active.get(user_id)
-            if conns and websocket in conns:
-                conns.remove(websocket)
-            if conns and len(conns) == 0:
-                self.active.pop(user_id, None)
+            clients = self.active.get(client.user_id)
+            if clients is not None:
+                clients.discard(client)
+                if not clients:
+                    self.active.pop(client.user_id, None)
+        if client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await client.task
+
+    async def _writer(self, client: WsClient):
+        try:
+            await client.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # best effort cleanup
+            await self.disconnect(client)
+            with suppress(Exception):
+                await client.websocket.close()
 
     async def send_personal(self, user_id: int, message: dict):
+        await self.send_batch([(user_id, message)])
+
+    async def send_batch(self, messages: Iterable[Tuple[int, dict]]):
+        """Encola varios mensajes (user_id, mensaje) tomando el lock una sola vez.
+
+        Cada mensaje se serializa una vez por codificación, no una vez por socket.
+        """
         async with self._lock:
-            conns = list(self.active.get(user_id, []))
-        for ws in conns:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                # best effort cleanup
-                await self.disconnect(user_id, ws)
+            targets = [
+                (message, client)
+                for user_id, message in messages
+                for client in self.active.get(user_id, ())
+            ]
+        slow = set()
+        encoded: Dict[Tuple[int, str], object] = {}
+        for message, client in targets:
+            key = (id(message), client.encoding)
+            if key not in encoded:
+                encoded[key] = encode(message, client.encoding)
+            if not client.put((message.get("id"), encoded[key])):
+                slow.add(client)
+        for client in slow:
+            await self._drop_slow(client)
+
+    async def _drop_slow(self, client: QueuedClient):
+        # Cola llena: el cliente no da abasto; que reconecte con ?since=
+        # (WebSocket) o Last-Event-ID (SSE)
+        await self.disconnect(client)
+        with suppress(Exception):
+            await client.close(code=1013)
+
+    def connection_count(self) -> int:
+        return sum(len(clients) for clients in self.active.values())
 
     async def broadcast_multi(self, user_ids: Set[int], message: dict):
-        for uid in user_ids:
-            await self.send_personal(uid, message)
+        await self.send_batch([(uid, message) for uid in user_ids])
 
 
 manager = ConnectionManager()
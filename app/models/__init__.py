@@ -1,12 +1,18 @@
 from .asignaturas import Asignatura
+from .chat import MensajeChat
 from .base import Base
 from .disponibilidad import DisponibilidadDocente
-
-# from .interacciones_chatbot import InteraccionChatbot
+from .idempotency import IdempotencyKey
+from .interacciones_chatbot import InteraccionChatbot
+from .lista_espera import ListaEspera
 from .roles import Role
+from .slots import SlotDisponible
+from .trabajos_eliminacion import TrabajoEliminacion
 from .tutorias import Tutoria
+from .tutorias_eliminadas import TutoriaEliminada
 from .users import User
 from .profesor_asignatura import ProfesorAsignatura
+from .rate_limit import RateLimitBucket
 from .notificacion import Notificacion
 
 # from .reportes import Reporte
@@ -0,0 +1,25 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+
+from .base import Base
+
+
+class MensajeChat(Base):
+    """Mensaje del chat estudiante-profesor de una tutoría (sólo se inserta)."""
+
+    __tablename__ = "MensajesChat"
+    __table_args__ = (
+        # Historial por conversación con paginación keyset sobre id_mensaje
+        Index("ix_mensajes_chat_tutoria_id", "id_tutoria", "id_mensaje"),
+    )
+    id_mensaje = Column(BigInteger, primary_key=True, autoincrement=True)
+    id_tutoria = Column(
+        Integer,
+        ForeignKey("Tutorias.id_tutoria", ondelete="CASCADE"),
+        nullable=False,
+    )
+    id_remitente = Column(Integer, ForeignKey("Usuarios.id_usuario"), nullable=False)
+    contenido = Column(String(2000), nullable=False)
+    fecha_envio = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
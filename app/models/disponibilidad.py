@@ -1,10 +1,29 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Time
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    Time,
+    UniqueConstraint,
+)
 
 from .base import Base
 
 
 class DisponibilidadDocente(Base):
     __tablename__ = "DisponibilidadDocente"
+    __table_args__ = (
+        # Una franja no se repite: re-importar el mismo archivo no la duplica
+        UniqueConstraint(
+            "id_profesor",
+            "id_asignatura",
+            "dia_semana",
+            "hora_inicio",
+            "hora_fin",
+            name="uq_disponibilidad_franja",
+        ),
+    )
 
     id_disponibilidad = Column(Integer, primary_key=True, index=True)
     id_profesor = Column(Integer, ForeignKey("Usuarios.id_usuario"), nullable=False)
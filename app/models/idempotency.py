@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, func
+
+from .base import Base
+
+
+class IdempotencyKey(Base):
+    """Respuesta almacenada de una mutación identificada por la cabecera Idempotency-Key."""
+
+    __tablename__ = "IdempotencyKeys"
+    # Quién hizo la petición ("user:<sub>" o "ip:<dirección>"): la misma clave de dos
+    # usuarios distintos no se cruza
+    ambito = Column(String(255), primary_key=True)
+    clave = Column(String(255), primary_key=True)
+    metodo = Column(String(10), primary_key=True)
+    ruta = Column(String(255), primary_key=True)
+    huella = Column(String(64), nullable=False)  # sha256 del cuerpo de la petición
+    status_code = Column(Integer, nullable=True)  # NULL mientras está en proceso
+    content_type = Column(String(100), nullable=True)
+    cuerpo = Column(LargeBinary, nullable=True)
+    # Fin del plazo de la petición en proceso; NULL una vez guardada la respuesta
+    bloqueado_hasta = Column(DateTime(timezone=True), nullable=True)
+    fecha_creacion = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
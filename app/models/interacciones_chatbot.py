@@ -0,0 +1,19 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+
+from .base import Base
+
+
+class InteraccionChatbot(Base):
+    __tablename__ = "InteraccionesChatbot"
+    id_interaccion = Column(BigInteger, primary_key=True, autoincrement=True)
+    id_usuario = Column(
+        Integer, ForeignKey("Usuarios.id_usuario"), nullable=True, index=True
+    )
+    pregunta = Column(String(1000), nullable=False)
+    respuesta = Column(String(4000), nullable=False)
+    intencion = Column(String(50), nullable=True)
+    latencia_ms = Column(Float, nullable=True)
+    fecha = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
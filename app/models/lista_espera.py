@@ -0,0 +1,61 @@
+from enum import Enum
+
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
+from sqlalchemy.sql import func
+
+from .base import Base
+
+
+class EstadoEspera(str, Enum):
+    ESPERANDO = "ESPERANDO"
+    PROMOVIDA = "PROMOVIDA"
+
+
+class ListaEspera(Base):
+    """Estudiante esperando un horario de un profesor y asignatura entre dos fechas.
+
+    Al liberarse un horario que cae en la ventana, el primero en la cola se agenda
+    automáticamente (``estado`` pasa a PROMOVIDA y ``id_tutoria`` apunta a la tutoría).
+    """
+
+    __tablename__ = "ListaEspera"
+    __table_args__ = (
+        CheckConstraint("fecha_desde <= fecha_hasta", name="ck_lista_espera_ventana"),
+        # Turno de la cola: sólo las entradas que siguen esperando, por antigüedad
+        Index(
+            "ix_lista_espera_turno",
+            "id_profesor",
+            "id_asignatura",
+            "fecha_creacion",
+            postgresql_where=text("estado = 'ESPERANDO'"),
+        ),
+        Index("ix_lista_espera_estudiante", "id_estudiante"),
+    )
+    id_espera = Column(Integer, primary_key=True)
+    id_estudiante = Column(Integer, ForeignKey("Usuarios.id_usuario"), nullable=False)
+    id_profesor = Column(Integer, ForeignKey("Usuarios.id_usuario"), nullable=False)
+    id_asignatura = Column(
+        Integer, ForeignKey("Asignaturas.id_asignatura"), nullable=False
+    )
+    # Fechas locales (zona horaria de la institución), ambas inclusive
+    fecha_desde = Column(Date, nullable=False)
+    fecha_hasta = Column(Date, nullable=False)
+    modalidad = Column(String(20), nullable=False)
+    estado = Column(String(20), nullable=False, server_default=text("'ESPERANDO'"))
+    id_tutoria = Column(
+        Integer, ForeignKey("Tutorias.id_tutoria", ondelete="SET NULL"), nullable=True
+    )
+    fecha_creacion = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    fecha_promocion = Column(DateTime(timezone=True), nullable=True)
@@ -1,14 +1,63 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, func
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Boolean,
+    ForeignKey,
+    Index,
+    false,
+    func,
+)
 from .base import Base
 
 
+def _destinatario_por_defecto(context):
+    # Compatibilidad con quien sólo rellena id_estudiante / id_profesor
+    params = context.get_current_parameters()
+    return params.get("id_estudiante") or params.get("id_profesor")
+
+
 class Notificacion(Base):
     __tablename__ = "Notificaciones"
-    id_notificacion = Column(Integer, primary_key=True, index=True)
+    # Particionada por mes de fecha_creacion (ver NotificationRetentionService),
+    # por eso la fecha forma parte de la clave primaria
+    __table_args__ = {"postgresql_partition_by": "RANGE (fecha_creacion)"}
+    id_notificacion = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    id_destinatario = Column(
+        Integer,
+        ForeignKey("Usuarios.id_usuario"),
+        nullable=False,
+        default=_destinatario_por_defecto,
+    )
+    # Se conservan por compatibilidad; el destinatario real es id_destinatario
     id_estudiante = Column(Integer, ForeignKey("Usuarios.id_usuario"), nullable=True)
     id_profesor = Column(Integer, ForeignKey("Usuarios.id_usuario"), nullable=True)
     titulo = Column(String(255), nullable=False)
     descripcion = Column(String(500), nullable=True)
-    tipo = Column(String(30), nullable=True)  # CREATED | RESCHEDULED | CANCELED
-    leida = Column(Boolean, default=False)
-    fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
+    tipo = Column(
+        String(30), nullable=True
+    )  # CREATED | RESCHEDULED | CANCELED | PROMOTED
+    leida = Column(Boolean, default=False, server_default=false(), nullable=False)
+    fecha_creacion = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+# Bandeja, contador de no leídas y "marcar todas" en un solo rango del índice
+Index(
+    "ix_notificaciones_destinatario_leida_fecha",
+    Notificacion.id_destinatario,
+    Notificacion.leida,
+    Notificacion.fecha_creacion.desc(),
+)
+
+# Reenvío al reconectar el WebSocket: id_notificacion > cursor del cliente
+Index(
+    "ix_notificaciones_destinatario_id",
+    Notificacion.id_destinatario,
+    Notificacion.id_notificacion,
+)
@@ -0,0 +1,15 @@
+from sqlalchemy import Boolean, Column, DateTime, Float, String, func
+
+from .base import Base
+
+
+class RateLimitBucket(Base):
+    """Cubeta de tokens compartida entre workers (backend Postgres del rate limiter)."""
+
+    __tablename__ = "RateLimitBuckets"
+    clave = Column(String(255), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    permitido = Column(Boolean, nullable=False, default=True)
+    actualizado = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
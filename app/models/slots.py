@@ -0,0 +1,50 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    UniqueConstraint,
+    text,
+)
+
+from .base import Base
+
+
+class SlotDisponible(Base):
+    """Horario concreto reservable, expandido de una franja de DisponibilidadDocente.
+
+    ``id_tutoria`` es NULL mientras el slot está libre.
+    """
+
+    __tablename__ = "SlotsDisponibles"
+    __table_args__ = (
+        UniqueConstraint(
+            "id_disponibilidad", "inicio", name="uq_slots_disponibilidad_inicio"
+        ),
+        # Listado de libres: escaneo de rango sólo sobre los slots sin reservar
+        Index(
+            "ix_slots_libres_asignatura_inicio",
+            "id_asignatura",
+            "inicio",
+            postgresql_where=text("id_tutoria IS NULL"),
+        ),
+        Index("ix_slots_profesor_inicio", "id_profesor", "inicio"),
+        Index("ix_slots_tutoria", "id_tutoria"),
+    )
+    id_slot = Column(BigInteger, primary_key=True, autoincrement=True)
+    id_disponibilidad = Column(
+        Integer,
+        ForeignKey("DisponibilidadDocente.id_disponibilidad", ondelete="CASCADE"),
+        nullable=False,
+    )
+    id_profesor = Column(Integer, ForeignKey("Usuarios.id_usuario"), nullable=False)
+    id_asignatura = Column(
+        Integer, ForeignKey("Asignaturas.id_asignatura"), nullable=False
+    )
+    inicio = Column(DateTime(timezone=True), nullable=False)
+    fin = Column(DateTime(timezone=True), nullable=False)
+    id_tutoria = Column(
+        Integer, ForeignKey("Tutorias.id_tutoria", ondelete="SET NULL"), nullable=True
+    )
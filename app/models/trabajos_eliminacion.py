@@ -0,0 +1,48 @@
+from enum import Enum
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, text
+from sqlalchemy.sql import func
+
+from .base import Base
+
+
+class EstadoTrabajo(str, Enum):
+    PENDIENTE = "PENDIENTE"
+    EN_CURSO = "EN_CURSO"
+    COMPLETADO = "COMPLETADO"
+    FALLIDO = "FALLIDO"
+
+
+class TrabajoEliminacion(Base):
+    """Borrado en segundo plano de una entidad con muchos registros dependientes."""
+
+    __tablename__ = "TrabajosEliminacion"
+    __table_args__ = (
+        # Un solo trabajo vivo por entidad: las peticiones repetidas lo reutilizan
+        Index(
+            "ux_trabajos_eliminacion_activo",
+            "entidad",
+            "id_entidad",
+            unique=True,
+            postgresql_where=text("estado IN ('PENDIENTE', 'EN_CURSO')"),
+        ),
+    )
+    id_trabajo = Column(Integer, primary_key=True)
+    entidad = Column(String(20), nullable=False)  # 'asignatura' | 'usuario'
+    id_entidad = Column(Integer, nullable=False)
+    estado = Column(String(20), nullable=False, server_default=text("'PENDIENTE'"))
+    # Paso en curso; un trabajo interrumpido se retoma desde aquí
+    paso = Column(String(50), nullable=True)
+    total = Column(Integer, nullable=True)
+    procesados = Column(Integer, nullable=False, server_default=text("0"))
+    notificados = Column(Integer, nullable=False, server_default=text("0"))
+    # Última tutoría avisada en el paso "notificar"; se retoma a partir de ella
+    ultimo_notificado = Column(Integer, nullable=True)
+    error = Column(String(500), nullable=True)
+    fecha_creacion = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    fecha_actualizacion = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    fecha_fin = Column(DateTime(timezone=True), nullable=True)
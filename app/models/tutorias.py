@@ -1,9 +1,41 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, text
+from enum import Enum
+
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    literal_column,
+    text,
+)
 from sqlalchemy.sql import func
 
 from .base import Base
 
 
+class EstadoTutoria(str, Enum):
+    SOLICITADA = "SOLICITADA"
+    CONFIRMADA = "CONFIRMADA"
+    CANCELADA = "CANCELADA"
+    COMPLETADA = "COMPLETADA"
+
+
+# Predicados de los índices parciales. Van como literales (no parámetros) para que
+# el planner los empareje con el índice también en planes genéricos.
+_ACTIVA_SQL = "estado IN ('SOLICITADA', 'CONFIRMADA')"
+_VIGENTE_SQL = "estado <> 'CANCELADA'"
+
+# Id (xid8) de la transacción en curso. La sincronización del calendario compara
+# contra el xmin del snapshot del cliente, que a diferencia de now() o de una
+# secuencia respeta el orden de commit: una transacción larga que confirma tarde
+# sigue por encima de la marca entregada mientras estaba en curso.
+XID_ACTUAL = text("pg_current_xact_id()::text::bigint")
+
+
 class Tutoria(Base):
     __tablename__ = "Tutorias"
     id_tutoria = Column(Integer, primary_key=True, index=True)
@@ -18,3 +50,59 @@ class Tutoria(Base):
     fecha_solicitud = Column(DateTime(timezone=True), server_default=text("now()"))
     fecha_confirmacion = Column(DateTime(timezone=True), nullable=True)
     fecha_cancelacion = Column(DateTime(timezone=True), nullable=True)
+    # Fecha del último cambio, informativa para el cliente
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+    # Transacción del último cambio, para la sincronización incremental
+    cambio_xid = Column(
+        BigInteger, nullable=False, server_default=XID_ACTUAL, onupdate=XID_ACTUAL
+    )
+    # Se incrementa en cada modificación; los clientes lo envían para compare-and-swap
+    version = Column(Integer, nullable=False, server_default=text("1"))
+    estado = Column(String(20), nullable=False, server_default=text("'CONFIRMADA'"))
+
+    __table_args__ = (
+        CheckConstraint(
+            "estado IN ('SOLICITADA', 'CONFIRMADA', 'CANCELADA', 'COMPLETADA')",
+            name="ck_tutorias_estado",
+        ),
+        # Calendario e historial: todo menos las canceladas
+        Index(
+            "ix_tutorias_profesor_inicio",
+            "id_profesor",
+            "fecha_hora_inicio",
+            postgresql_where=text(_VIGENTE_SQL),
+        ),
+        Index(
+            "ix_tutorias_estudiante_inicio",
+            "id_estudiante",
+            "fecha_hora_inicio",
+            postgresql_where=text(_VIGENTE_SQL),
+        ),
+        # Validación de solapes y disponibilidad: sólo las que siguen en curso
+        Index(
+            "ix_tutorias_profesor_inicio_activas",
+            "id_profesor",
+            "fecha_hora_inicio",
+            postgresql_where=text(_ACTIVA_SQL),
+        ),
+        Index(
+            "ix_tutorias_estudiante_inicio_activas",
+            "id_estudiante",
+            "fecha_hora_inicio",
+            postgresql_where=text(_ACTIVA_SQL),
+        ),
+        Index("ix_tutorias_updated_at", "updated_at"),
+        Index("ix_tutorias_cambio_xid", "cambio_xid"),
+    )
+
+
+# Filtros equivalentes a los predicados de los índices parciales
+ACTIVA = Tutoria.estado.in_(
+    [literal_column("'SOLICITADA'"), literal_column("'CONFIRMADA'")]
+)
+VIGENTE = Tutoria.estado != literal_column("'CANCELADA'")
@@ -0,0 +1,20 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer
+from sqlalchemy.sql import func
+
+from .base import Base
+from .tutorias import XID_ACTUAL
+
+
+class TutoriaEliminada(Base):
+    """Tombstone de una tutoría borrada, usado por la sincronización del calendario."""
+
+    __tablename__ = "TutoriasEliminadas"
+    id_tutoria = Column(Integer, primary_key=True)
+    id_estudiante = Column(Integer, nullable=False, index=True)
+    id_profesor = Column(Integer, nullable=False, index=True)
+    fecha_eliminacion = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+    cambio_xid = Column(
+        BigInteger, nullable=False, server_default=XID_ACTUAL, index=True
+    )
@@ -0,0 +1,80 @@
+"""Lecturas de asignaturas y de sus profesores como proyecciones de columnas."""
+
+from dataclasses import dataclass
+
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.asignaturas import Asignatura
+from app.models.disponibilidad import DisponibilidadDocente
+from app.models.profesor_asignatura import ProfesorAsignatura
+from app.models.users import User
+
+
+@dataclass(slots=True, frozen=True)
+class AsignaturaDTO:
+    id_asignatura: int
+    nombre_asignatura: str
+
+
+@dataclass(slots=True, frozen=True)
+class ProfesorDTO:
+    id_usuario: int
+    nombre: str
+    apellido: str
+    email: str
+
+
+_ASIGNATURA = (Asignatura.id_asignatura, Asignatura.nombre_asignatura)
+_PROFESOR = (User.id_usuario, User.nombre, User.apellido, User.email)
+
+
+class AsignaturaRepository:
+    @staticmethod
+    async def get_all(db: AsyncSession) -> list[AsignaturaDTO]:
+        result = await db.execute(
+            select(*_ASIGNATURA).order_by(Asignatura.nombre_asignatura)
+        )
+        return [AsignaturaDTO(*row) for row in result.all()]
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, asignatura_id: int) -> AsignaturaDTO | None:
+        result = await db.execute(
+            select(*_ASIGNATURA).where(Asignatura.id_asignatura == asignatura_id)
+        )
+        row = result.first()
+        return AsignaturaDTO(*row) if row else None
+
+    @staticmethod
+    async def get_by_profesor(
+        db: AsyncSession, id_profesor: int
+    ) -> list[AsignaturaDTO]:
+        result = await db.execute(
+            select(*_ASIGNATURA)
+            .join(
+                ProfesorAsignatura,
+                Asignatura.id_asignatura == ProfesorAsignatura.id_asignatura,
+            )
+            .where(ProfesorAsignatura.id_profesor == id_profesor)
+            .order_by(Asignatura.nombre_asignatura)
+        )
+        return [AsignaturaDTO(*row) for row in result.all()]
+
+    @staticmethod
+    async def get_profesores(
+        db: AsyncSession, asignatura_id: int, only_with_availability: bool = False
+    ) -> list[ProfesorDTO]:
+        stmt = (
+            select(*_PROFESOR)
+            .join(ProfesorAsignatura, User.id_usuario == ProfesorAsignatura.id_profesor)
+            .where(ProfesorAsignatura.id_asignatura == asignatura_id)
+        )
+        if only_with_availability:
+            stmt = stmt.where(
+                exists().where(
+                    DisponibilidadDocente.id_profesor == ProfesorAsignatura.id_profesor,
+                    DisponibilidadDocente.id_asignatura == asignatura_id,
+                )
+            )
+        result = await db.execute(stmt.order_by(User.apellido, User.nombre))
+        return [ProfesorDTO(*row) for row in result.all()]
@@ -0,0 +1,50 @@
+"""Lecturas de franjas de disponibilidad docente como proyecciones de columnas."""
+
+from dataclasses import dataclass
+from datetime import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.disponibilidad import DisponibilidadDocente
+
+
+@dataclass(slots=True, frozen=True)
+class DisponibilidadDTO:
+    id_disponibilidad: int
+    id_profesor: int
+    id_asignatura: int
+    dia_semana: str
+    hora_inicio: time
+    hora_fin: time
+
+
+_COLUMNAS = (
+    DisponibilidadDocente.id_disponibilidad,
+    DisponibilidadDocente.id_profesor,
+    DisponibilidadDocente.id_asignatura,
+    DisponibilidadDocente.dia_semana,
+    DisponibilidadDocente.hora_inicio,
+    DisponibilidadDocente.hora_fin,
+)
+
+
+class DisponibilidadRepository:
+    @staticmethod
+    async def get_by_profesor(
+        db: AsyncSession,
+        id_profesor: int,
+        id_asignatura: int | None = None,
+        dia_semana: str | None = None,
+    ) -> list[DisponibilidadDTO]:
+        stmt = select(*_COLUMNAS).where(
+            DisponibilidadDocente.id_profesor == id_profesor
+        )
+        if id_asignatura is not None:
+            stmt = stmt.where(DisponibilidadDocente.id_asignatura == id_asignatura)
+        if dia_semana is not None:
+            stmt = stmt.where(DisponibilidadDocente.dia_semana == dia_semana)
+        result = await db.execute(
+            stmt.order_by(DisponibilidadDocente.id_disponibilidad)
+        )
+        return [DisponibilidadDTO(*row) for row in result.all()]
@@ -0,0 +1,76 @@
+"""Bandeja de notificaciones como proyección de columnas."""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import false, func, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.notificacion import Notificacion
+
+
+@dataclass(slots=True, frozen=True)
+class NotificacionDTO:
+    id_notificacion: int
+    id_destinatario: int
+    id_estudiante: int | None
+    id_profesor: int | None
+    titulo: str
+    descripcion: str | None
+    tipo: str | None
+    leida: bool
+    fecha_creacion: datetime
+
+
+class NotificacionRepository:
+    @staticmethod
+    def inbox_stmt(
+        user_id: int, limit: int, offset: int = 0, solo_no_leidas: bool = False
+    ):
+        # lambda_stmt: cada variante (con/sin filtro de no leídas) se construye y se
+        # compila una sola vez; user_id, limit y offset van como parámetros
+        stmt = lambda_stmt(
+            lambda: select(
+                Notificacion.id_notificacion,
+                Notificacion.id_destinatario,
+                Notificacion.id_estudiante,
+                Notificacion.id_profesor,
+                Notificacion.titulo,
+                Notificacion.descripcion,
+                Notificacion.tipo,
+                Notificacion.leida,
+                Notificacion.fecha_creacion,
+            ).where(Notificacion.id_destinatario == user_id)
+        )
+        if solo_no_leidas:
+            stmt += lambda s: s.where(Notificacion.leida == false())
+        stmt += lambda s: s.order_by(Notificacion.fecha_creacion.desc())
+        stmt += lambda s: s.limit(limit).offset(offset)
+        return stmt
+
+    @staticmethod
+    def unread_count_stmt(user_id: int):
+        return lambda_stmt(
+            lambda: select(func.count()).where(
+                Notificacion.id_destinatario == user_id,
+                Notificacion.leida == false(),
+            )
+        )
+
+    @staticmethod
+    async def inbox(
+        db: AsyncSession,
+        user_id: int,
+        limit: int,
+        offset: int = 0,
+        solo_no_leidas: bool = False,
+    ) -> list[NotificacionDTO]:
+        result = await db.execute(
+            NotificacionRepository.inbox_stmt(user_id, limit, offset, solo_no_leidas)
+        )
+        return [NotificacionDTO(*row) for row in result.all()]
+
+    @staticmethod
+    async def unread_count(db: AsyncSession, user_id: int) -> int:
+        result = await db.execute(NotificacionRepository.unread_count_stmt(user_id))
+        return result.scalar_one()
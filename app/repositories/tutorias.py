@@ -0,0 +1,80 @@
+"""Lecturas de tutorías enriquecidas como proyecciones de columnas.
+
+Los nombres de profesor, estudiante y asignatura se concatenan en SQL, así cada
+fila llega lista para ``TutoriaRead`` sin cargar entidades ``Tutoria``/``User``.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.asignaturas import Asignatura
+from app.models.tutorias import Tutoria
+from app.models.users import User
+
+
+@dataclass(slots=True, frozen=True)
+class TutoriaDTO:
+    id_tutoria: int
+    id_estudiante: int
+    id_profesor: int
+    id_asignatura: int
+    fecha_hora_inicio: datetime
+    fecha_hora_fin: datetime
+    modalidad: str
+    updated_at: datetime
+    version: int
+    estado: str
+    titulo: str
+    profesor: str
+    estudiante: str
+
+
+class TutoriaRepository:
+    @staticmethod
+    def select():
+        P = aliased(User)  # Profesor
+        E = aliased(User)  # Estudiante
+        return (
+            select(
+                Tutoria.id_tutoria,
+                Tutoria.id_estudiante,
+                Tutoria.id_profesor,
+                Tutoria.id_asignatura,
+                Tutoria.fecha_hora_inicio,
+                Tutoria.fecha_hora_fin,
+                Tutoria.modalidad,
+                Tutoria.updated_at,
+                Tutoria.version,
+                Tutoria.estado,
+                Asignatura.nombre_asignatura.label("titulo"),
+                (P.nombre + " " + P.apellido).label("profesor"),
+                (E.nombre + " " + E.apellido).label("estudiante"),
+            )
+            .join(P, Tutoria.id_profesor == P.id_usuario)
+            .join(E, Tutoria.id_estudiante == E.id_usuario)
+            .join(Asignatura, Tutoria.id_asignatura == Asignatura.id_asignatura)
+        )
+
+    @staticmethod
+    async def find(
+        db: AsyncSession, *where, order_by=None, limit: int | None = None
+    ) -> list[TutoriaDTO]:
+        stmt = TutoriaRepository.select().where(*where)
+        if order_by is not None:
+            stmt = stmt.order_by(order_by)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await db.execute(stmt)
+        return [TutoriaDTO(*row) for row in result.all()]
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, tutoria_id: int) -> TutoriaDTO | None:
+        result = await db.execute(
+            TutoriaRepository.select().where(Tutoria.id_tutoria == tutoria_id)
+        )
+        row = result.first()
+        return TutoriaDTO(*row) if row else None
@@ -1,20 +1,49 @@
-from pydantic import BaseModel, EmailStr
+"""Lecturas de usuarios como proyecciones de columnas.
 
+Las consultas seleccionan sólo las columnas que exponen las respuestas (nunca
+``contrasena``) y devuelven DTOs con ``__slots__`` en lugar de entidades ORM, así
+que no pasan por el identity map ni guardan estado de la sesión.
+"""
 
-class UserCreate(BaseModel):
-    nombre: str
-    apellido: str
-    email: EmailStr
-    contrasena: str
-    id_rol: int
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.roles import Role
+from app.models.users import User
 
-class UserRead(BaseModel):
+
+@dataclass(slots=True, frozen=True)
+class UsuarioDTO:
     id_usuario: int
     nombre: str
     apellido: str
-    email: EmailStr
-    id_rol: int
+    email: str
+    id_rol: int | None
+
+
+_COLUMNAS = (User.id_usuario, User.nombre, User.apellido, User.email, User.id_rol)
+
+
+class UserRepository:
+    @staticmethod
+    async def get_all(db: AsyncSession) -> list[UsuarioDTO]:
+        result = await db.execute(select(*_COLUMNAS).order_by(User.id_usuario))
+        return [UsuarioDTO(*row) for row in result.all()]
+
+    @staticmethod
+    async def get_by_rol(db: AsyncSession, nombre_rol: str) -> list[UsuarioDTO]:
+        result = await db.execute(
+            select(*_COLUMNAS)
+            .join(Role, Role.id_rol == User.id_rol)
+            .where(Role.nombre_rol == nombre_rol)
+            .order_by(User.id_usuario)
+        )
+        return [UsuarioDTO(*row) for row in result.all()]
 
-    class Config:
-        orm_mode = True
+    @staticmethod
+    async def get_by_id(db: AsyncSession, user_id: int) -> UsuarioDTO | None:
+        result = await db.execute(select(*_COLUMNAS).where(User.id_usuario == user_id))
+        row = result.first()
+        return UsuarioDTO(*row) if row else None
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class MensajeChatCreate(BaseModel):
+    contenido: str = Field(..., min_length=1, max_length=2000)
+
+
+class MensajeChatRead(BaseModel):
+    id_mensaje: int
+    id_tutoria: int
+    id_remitente: int
+    contenido: str
+    fecha_envio: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class MensajesChatPage(BaseModel):
+    mensajes: list[MensajeChatRead]
+    # Pasar como ?before= para obtener los mensajes anteriores; None = no hay más
+    next_before: Optional[int] = None
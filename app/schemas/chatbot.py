@@ -0,0 +1,27 @@
+from datetime import date, time
+
+from pydantic import BaseModel, Field
+
+
+class PreguntaChatbot(BaseModel):
+    pregunta: str = Field(..., min_length=1, max_length=1000)
+
+
+class FranjaChatbot(BaseModel):
+    id_profesor: int
+    profesor: str
+    id_asignatura: int
+    asignatura: str
+    dia_semana: str
+    hora_inicio: time
+    hora_fin: time
+    fecha: date
+
+    class Config:
+        orm_mode = True
+
+
+class RespuestaChatbot(BaseModel):
+    respuesta: str
+    intencion: str
+    franjas: list[FranjaChatbot] = []
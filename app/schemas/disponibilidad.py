@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 
 from pydantic import BaseModel
 from datetime import time
@@ -31,3 +31,11 @@ class DisponibilidadRead(DisponibilidadCreate):
 class HorarioLibre(BaseModel):
     inicio: time
     fin: time
+
+
+class HorarioDisponible(BaseModel):
+    id_profesor: int
+    profesor: str
+    fecha: date
+    inicio: time
+    fin: time
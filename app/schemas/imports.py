@@ -0,0 +1,30 @@
+from datetime import time
+
+from pydantic import BaseModel
+
+
+class ImportRowError(BaseModel):
+    fila: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    procesadas: int = 0
+    insertadas: int = 0
+    omitidas: int = 0  # filas válidas que ya existían (ON CONFLICT DO NOTHING)
+    errores: list[ImportRowError] = []
+
+
+class AsignacionImport(BaseModel):
+    # Se acepta el id o la clave natural (email / nombre) para poder importar
+    # asignaciones en el mismo lote de onboarding que crea usuarios y asignaturas
+    id_profesor: int | None = None
+    email_profesor: str | None = None
+    id_asignatura: int | None = None
+    nombre_asignatura: str | None = None
+
+
+class DisponibilidadImport(AsignacionImport):
+    dia_semana: str
+    hora_inicio: time
+    hora_fin: time
@@ -0,0 +1,24 @@
+from datetime import date, datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ListaEsperaCreate(BaseModel):
+    id_estudiante: int
+    id_profesor: int
+    id_asignatura: int
+    fecha_desde: date
+    fecha_hasta: date
+    modalidad: str
+
+
+class ListaEsperaRead(ListaEsperaCreate):
+    id_espera: int
+    estado: str
+    id_tutoria: Optional[int] = None
+    fecha_creacion: datetime
+    fecha_promocion: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
@@ -4,6 +4,8 @@ from typing import Optional
 
 
 class NotificacionBase(BaseModel):
+    # Si se omite se toma id_estudiante o id_profesor
+    id_destinatario: Optional[int] = None
     id_estudiante: Optional[int] = None
     id_profesor: Optional[int] = None
     titulo: str
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class SlotRead(BaseModel):
+    id_slot: int
+    id_profesor: int
+    id_asignatura: int
+    inicio: datetime
+    fin: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class SlotReserva(BaseModel):
+    id_estudiante: int
+    modalidad: str
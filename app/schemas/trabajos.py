@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class TrabajoEliminacionRead(BaseModel):
+    id_trabajo: int
+    entidad: str
+    id_entidad: int
+    estado: str
+    paso: Optional[str] = None
+    # Filas a procesar (se calcula al empezar) y filas ya procesadas
+    total: Optional[int] = None
+    procesados: int
+    notificados: int
+    error: Optional[str] = None
+    fecha_creacion: datetime
+    fecha_fin: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
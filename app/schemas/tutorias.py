@@ -1,7 +1,9 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+
+from app.utils.date_utils import a_hora_local
 
 
 class TutoriaBase(BaseModel):
@@ -21,6 +23,15 @@ class TutoriaCreate(BaseModel):
     fecha_hora_fin: datetime
     modalidad: str
 
+    # Horas sin zona = hora local de la institución (la de las franjas y los slots)
+    _hora_local = field_validator("fecha_hora_inicio", "fecha_hora_fin")(a_hora_local)
+
+
+class TutoriaRecurrenteCreate(TutoriaCreate):
+    # fecha_hora_inicio/fin describen la primera ocurrencia
+    repeticiones: int = Field(..., ge=1, le=52)
+    intervalo_dias: int = Field(7, ge=1, le=28)
+
 
 class TutoriaRead(BaseModel):
     id_tutoria: int
@@ -30,9 +41,36 @@ class TutoriaRead(BaseModel):
     fecha_hora_inicio: datetime
     fecha_hora_fin: datetime
     modalidad: str
+    updated_at: Optional[datetime] = None
+    version: Optional[int] = None
+    estado: Optional[str] = None
 
     class Config:
         orm_mode = True
+
+
+class CalendarSync(BaseModel):
+    tutorias: list[TutoriaRead]
+    eliminadas: list[int]
+    sync_token: str
+    completo: bool
+
+
+class ConflictoOcurrencia(BaseModel):
+    fecha_hora_inicio: datetime
+    fecha_hora_fin: datetime
+    motivo: str
+
+
+class TutoriaRecurrenteResult(BaseModel):
+    creadas: list[TutoriaRead]
+    conflictos: list[ConflictoOcurrencia]
+
+
 class TutoriaReschedule(BaseModel):
     fecha_hora_inicio: datetime
     fecha_hora_fin: datetime
+    # Versión leída por el cliente; si no coincide la reprogramación responde 409
+    version: Optional[int] = None
+
+    _hora_local = field_validator("fecha_hora_inicio", "fecha_hora_fin")(a_hora_local)
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Iterable, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.ws_manager import manager
+from app.models.chat import MensajeChat
+from app.models.tutorias import Tutoria
+
+logger = logging.getLogger(__name__)
+
+CHAT_REJECTED = metrics.REGISTRY.register(
+    metrics.Counter(
+        "chat_rejected_total",
+        "Mensajes de chat rechazados por cola de escritura llena",
+    )
+)
+
+_COLUMNAS = (
+    MensajeChat.id_mensaje,
+    MensajeChat.id_tutoria,
+    MensajeChat.id_remitente,
+    MensajeChat.contenido,
+    MensajeChat.fecha_envio,
+)
+
+
+def _payload(row) -> dict:
+    return {
+        "type": "chat",
+        "id_mensaje": row.id_mensaje,
+        "id_tutoria": row.id_tutoria,
+        "id_remitente": row.id_remitente,
+        "contenido": row.contenido,
+        "fecha_envio": str(row.fecha_envio),
+    }
+
+
+class ChatWriter:
+    """Escritor de mensajes en segundo plano.
+
+    Cada petición encola su mensaje y espera el resultado; el escritor vacía la
+    cola en un único INSERT multi-fila, así bajo ráfagas el número de sentencias
+    crece con los lotes y no con los mensajes. Tras el commit reparte los mensajes
+    por WebSocket a los participantes de cada conversación.
+
+    La cola está acotada a ``maxsize``: si la base no da abasto ``submit`` lanza
+    ``asyncio.QueueFull`` (el controlador responde 503) en lugar de acumular
+    peticiones esperando. Si falla el INSERT de un lote se reintenta mensaje por
+    mensaje, así una fila inválida sólo hace fallar a su propio remitente.
+    """
+
+    def __init__(self, max_batch: int = 200, maxsize: int = 5000) -> None:
+        self.max_batch = max_batch
+        self.maxsize = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue(self.maxsize)
+            self._task = asyncio.create_task(self._run(), name="chat-writer")
+
+    async def submit(self, mensaje: dict, destinatarios: Iterable[int]):
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((mensaje, tuple(destinatarios), future))
+        except asyncio.QueueFull:
+            CHAT_REJECTED.inc()
+            raise
+        return await future
+
+    async def stop(self):
+        if self._task is None:
+            return
+        # Se terminan de escribir los mensajes ya aceptados
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._queue.join(), 5)
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._write(batch)
+            except Exception:
+                logger.exception(
+                    "No se pudo repartir un lote de %d mensajes", len(batch)
+                )
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    async def _insert(batch) -> list:
+        async with AsyncSessionLocal() as session:
+            # sort_by_parameter_order garantiza que RETURNING sigue el orden del lote
+            result = await session.execute(
+                insert(MensajeChat).returning(*_COLUMNAS, sort_by_parameter_order=True),
+                [mensaje for mensaje, _, _ in batch],
+            )
+            rows = result.all()
+            await session.commit()
+        return rows
+
+    async def _write(self, batch):
+        try:
+            guardados = list(zip(batch, await self._insert(batch)))
+        except Exception:
+            logger.warning(
+                "Falló el lote de %d mensajes; se reintenta uno por uno",
+                len(batch),
+                exc_info=True,
+            )
+            guardados = []
+            for item in batch:
+                try:
+                    (row,) = await self._insert([item])
+                except Exception as exc:
+                    if not item[2].done():
+                        item[2].set_exception(exc)
+                    continue
+                guardados.append((item, row))
+        envios = []
+        for (_, destinatarios, future), row in guardados:
+            if not future.done():
+                future.set_result(row)
+            payload = _payload(row)
+            envios.extend((uid, payload) for uid in destinatarios)
+        # Ya guardados: un fallo al repartir no se reintenta (duplicaría filas)
+        await manager.send_batch(envios)
+
+
+chat_writer = ChatWriter(maxsize=settings.chat_queue_size)
+
+
+class ChatService:
+    @staticmethod
+    async def participantes(db: AsyncSession, id_tutoria: int):
+        result = await db.execute(
+            select(Tutoria.id_estudiante, Tutoria.id_profesor).where(
+                Tutoria.id_tutoria == id_tutoria
+            )
+        )
+        return result.first()
+
+    @staticmethod
+    async def enviar(id_tutoria: int, id_remitente: int, contenido: str, participantes):
+        return await chat_writer.submit(
+            {
+                "id_tutoria": id_tutoria,
+                "id_remitente": id_remitente,
+                "contenido": contenido,
+            },
+            set(participantes),
+        )
+
+    @staticmethod
+    async def historial(
+        db: AsyncSession, id_tutoria: int, before: Optional[int], limit: int
+    ) -> dict:
+        """Página de mensajes del más reciente al más antiguo (keyset por id)."""
+        stmt = select(*_COLUMNAS).where(MensajeChat.id_tutoria == id_tutoria)
+        if before is not None:
+            stmt = stmt.where(MensajeChat.id_mensaje < before)
+        result = await db.execute(
+            stmt.order_by(MensajeChat.id_mensaje.desc()).limit(limit + 1)
+        )
+        rows = result.all()
+        mas = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "mensajes": [row._asdict() for row in rows],
+            "next_before": rows[-1].id_mensaje if mas else None,
+        }
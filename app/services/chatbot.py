@@ -0,0 +1,313 @@
+"""Chatbot de consultas de horarios.
+
+Las respuestas se calculan sobre una instantánea en memoria de los slots libres
+(``AvailabilityCache``) con un motor intercambiable (``AnswerEngine``); el
+motor local por reglas no depende de servicios externos y sirve para pruebas.
+Las interacciones se registran en ``InteraccionesChatbot`` a través de una cola
+que se vuelca en lotes, fuera del camino de la respuesta.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Protocol
+
+from sqlalchemy import and_, func, insert, select
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.asignaturas import Asignatura
+from app.models.interacciones_chatbot import InteraccionChatbot
+from app.models.profesor_asignatura import ProfesorAsignatura
+from app.models.slots import SlotDisponible
+from app.models.users import User
+from app.utils.date_utils import (
+    DIAS_SEMANA,
+    a_hora_local,
+    dia_semana_es,
+    normaliza_dia,
+)
+
+logger = logging.getLogger(__name__)
+
+LOG_DROPPED = metrics.REGISTRY.register(
+    metrics.Counter(
+        "chatbot_log_dropped_total",
+        "Interacciones del chatbot descartadas por cola de registro llena",
+    )
+)
+MAX_FRANJAS_RESPUESTA = 20
+
+
+@dataclass(frozen=True)
+class Franja:
+    id_profesor: int
+    profesor: str
+    id_asignatura: int
+    asignatura: str
+    dia_semana: str
+    hora_inicio: object
+    hora_fin: object
+    fecha: object
+
+
+@dataclass
+class Respuesta:
+    texto: str
+    intencion: str
+    franjas: list = field(default_factory=list)
+
+
+class AnswerEngine(Protocol):
+    async def answer(self, pregunta: str, franjas: list[Franja]) -> Respuesta: ...
+
+
+class AvailabilityCache:
+    """Horarios libres de todos los profesores, recargados cada ``ttl`` segundos.
+
+    Se leen del inventario de ``SlotsDisponibles``, así que las horas ya reservadas
+    no aparecen; los slots libres consecutivos se agrupan en un solo intervalo.
+
+    La caché vive en memoria de cada worker: ``invalidate`` sólo descarta la copia
+    del worker que atendió el cambio; los demás siguen respondiendo con la suya
+    hasta que vence ``ttl`` (CHATBOT_CACHE_TTL).
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._franjas: Optional[list[Franja]] = None
+        self._loaded = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._franjas = None
+
+    def _fresh(self) -> bool:
+        return self._franjas is not None and time.monotonic() - self._loaded < self.ttl
+
+    async def get(self) -> list[Franja]:
+        if self._fresh():
+            return self._franjas
+        # Una sola recarga aunque lleguen muchas preguntas a la vez
+        async with self._lock:
+            if not self._fresh():
+                self._franjas = await self._load()
+                self._loaded = time.monotonic()
+        return self._franjas
+
+    @staticmethod
+    async def _load() -> list[Franja]:
+        # Sólo los slots libres y futuros: lo reservado no se ofrece
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(
+                    SlotDisponible.id_disponibilidad,
+                    SlotDisponible.id_profesor,
+                    User.nombre,
+                    User.apellido,
+                    SlotDisponible.id_asignatura,
+                    Asignatura.nombre_asignatura,
+                    SlotDisponible.inicio,
+                    SlotDisponible.fin,
+                )
+                .join(
+                    ProfesorAsignatura,
+                    and_(
+                        ProfesorAsignatura.id_profesor == SlotDisponible.id_profesor,
+                        ProfesorAsignatura.id_asignatura
+                        == SlotDisponible.id_asignatura,
+                    ),
+                )
+                .join(User, User.id_usuario == SlotDisponible.id_profesor)
+                .join(
+                    Asignatura,
+                    Asignatura.id_asignatura == SlotDisponible.id_asignatura,
+                )
+                .where(
+                    SlotDisponible.id_tutoria.is_(None),
+                    SlotDisponible.inicio > func.now(),
+                )
+                .order_by(SlotDisponible.id_disponibilidad, SlotDisponible.inicio)
+            )
+            rows = result.all()
+        return AvailabilityCache._agrupar(rows)
+
+    @staticmethod
+    def _agrupar(rows) -> list[Franja]:
+        """Une los slots libres consecutivos de una misma franja en un intervalo.
+
+        ``rows`` debe venir ordenado por franja e inicio.
+        """
+        bloques = []
+        for id_disp, id_prof, nombre, apellido, id_asig, asig, inicio, fin in rows:
+            ultimo = bloques[-1] if bloques else None
+            if ultimo and ultimo[0] == id_disp and ultimo[-1] == inicio:
+                ultimo[-1] = fin
+                continue
+            bloques.append(
+                [id_disp, id_prof, f"{nombre} {apellido}", id_asig, asig, inicio, fin]
+            )
+        franjas = []
+        for _, id_prof, profesor, id_asig, asig, inicio, fin in bloques:
+            inicio, fin = a_hora_local(inicio), a_hora_local(fin)
+            franjas.append(
+                Franja(
+                    id_prof,
+                    profesor,
+                    id_asig,
+                    asig,
+                    dia_semana_es(inicio),
+                    inicio.time(),
+                    fin.time(),
+                    inicio.date(),
+                )
+            )
+        franjas.sort(key=lambda f: (f.fecha, f.hora_inicio, f.profesor))
+        return franjas
+
+
+class LocalAnswerEngine:
+    """Motor por reglas: reconoce asignatura, profesor y día en la pregunta."""
+
+    AYUDA = (
+        "Puedo ayudarte con los horarios de atención. Pregunta, por ejemplo: "
+        "¿cuándo está libre el profesor Pérez para Cálculo?"
+    )
+
+    async def answer(self, pregunta: str, franjas: list[Franja]) -> Respuesta:
+        texto = normaliza_dia(pregunta)
+        palabras = set(re.findall(r"\w+", texto))
+        asignaturas = {
+            f.id_asignatura for f in franjas if normaliza_dia(f.asignatura) in texto
+        }
+        profesores = {
+            f.id_profesor
+            for f in franjas
+            if any(
+                len(p) > 2 and p in palabras
+                for p in re.findall(r"\w+", normaliza_dia(f.profesor))
+            )
+        }
+        dias = {d for d in DIAS_SEMANA if d in palabras}
+        if not asignaturas and not profesores:
+            return Respuesta(self.AYUDA, "desconocida")
+
+        encontradas = [
+            f
+            for f in franjas
+            if (not asignaturas or f.id_asignatura in asignaturas)
+            and (not profesores or f.id_profesor in profesores)
+            and (not dias or f.dia_semana in dias)
+        ]
+        if not encontradas:
+            return Respuesta(
+                "No encontré horarios de atención que coincidan con tu pregunta.",
+                "disponibilidad",
+            )
+        encontradas = encontradas[:MAX_FRANJAS_RESPUESTA]
+        lineas = [
+            f"{f.profesor} atiende {f.asignatura} el {f.dia_semana} "
+            f"{f.fecha:%d/%m} de {f.hora_inicio:%H:%M} a {f.hora_fin:%H:%M}"
+            for f in encontradas
+        ]
+        return Respuesta("\n".join(lineas), "disponibilidad", encontradas)
+
+
+class InteractionLogger:
+    """Registra interacciones encolándolas; una tarea las inserta en lotes.
+
+    ``log`` nunca espera a la base de datos: si la cola está llena la interacción
+    se descarta (y se cuenta en ``chatbot_log_dropped_total``).
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, maxsize: int) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.maxsize = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def log(self, registro: dict):
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue(self.maxsize)
+            self._task = asyncio.create_task(self._run(), name="chatbot-log")
+        try:
+            self._queue.put_nowait(registro)
+        except asyncio.QueueFull:
+            LOG_DROPPED.inc()
+
+    async def stop(self):
+        if self._task is None or self._task.done():
+            return
+        # None indica a la tarea que vuelque lo pendiente y termine
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        terminar = False
+        while not terminar:
+            lote = []
+            fin = None
+            while len(lote) < self.batch_size:
+                if fin is None:
+                    registro = await self._queue.get()
+                    fin = time.monotonic() + self.flush_interval
+                else:
+                    restante = fin - time.monotonic()
+                    if restante <= 0:
+                        break
+                    try:
+                        registro = await asyncio.wait_for(self._queue.get(), restante)
+                    except asyncio.TimeoutError:
+                        break
+                if registro is None:
+                    terminar = True
+                    break
+                lote.append(registro)
+            if not lote:
+                continue
+            try:
+                await self._flush(lote)
+            except Exception:
+                logger.exception(
+                    "No se pudieron guardar %d interacciones del chatbot", len(lote)
+                )
+
+    @staticmethod
+    async def _flush(lote: list[dict]):
+        async with AsyncSessionLocal() as session:
+            await session.execute(insert(InteraccionChatbot), lote)
+            await session.commit()
+
+
+availability_cache = AvailabilityCache(settings.chatbot_cache_ttl)
+interaction_logger = InteractionLogger(
+    settings.chatbot_log_batch_size,
+    settings.chatbot_log_flush_interval,
+    settings.chatbot_log_queue_size,
+)
+
+
+class ChatbotService:
+    # Se puede sustituir (p. ej. en pruebas) por cualquier AnswerEngine
+    engine: AnswerEngine = LocalAnswerEngine()
+
+    @staticmethod
+    async def responder(pregunta: str, id_usuario: Optional[int]) -> Respuesta:
+        inicio = time.perf_counter()
+        franjas = await availability_cache.get()
+        respuesta = await ChatbotService.engine.answer(pregunta, franjas)
+        interaction_logger.log(
+            {
+                "id_usuario": id_usuario,
+                "pregunta": pregunta,
+                "respuesta": respuesta.texto[:4000],
+                "intencion": respuesta.intencion,
+                "latencia_ms": (time.perf_counter() - inicio) * 1000,
+            }
+        )
+        return respuesta
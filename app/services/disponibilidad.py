@@ -0,0 +1,111 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.disponibilidad import DisponibilidadDocente
+from app.models.profesor_asignatura import ProfesorAsignatura
+from app.models.tutorias import ACTIVA, Tutoria
+from app.models.users import User
+from app.utils.date_utils import weekday_de_dia, zona_local
+
+
+class DisponibilidadService:
+    @staticmethod
+    async def buscar_horarios(
+        db: AsyncSession,
+        id_asignatura: int,
+        start: date,
+        end: date,
+        duracion: timedelta,
+        limit: int,
+    ):
+        # 1) Franjas de todos los profesores asignados a la asignatura, con su nombre
+        result = await db.execute(
+            select(
+                DisponibilidadDocente.id_profesor,
+                DisponibilidadDocente.dia_semana,
+                DisponibilidadDocente.hora_inicio,
+                DisponibilidadDocente.hora_fin,
+                User.nombre,
+                User.apellido,
+            )
+            .join(
+                ProfesorAsignatura,
+                and_(
+                    ProfesorAsignatura.id_profesor == DisponibilidadDocente.id_profesor,
+                    ProfesorAsignatura.id_asignatura
+                    == DisponibilidadDocente.id_asignatura,
+                ),
+            )
+            .join(User, User.id_usuario == DisponibilidadDocente.id_profesor)
+            .where(DisponibilidadDocente.id_asignatura == id_asignatura)
+        )
+        franjas = defaultdict(list)  # weekday -> [(id_profesor, inicio, fin)]
+        nombres: dict[int, str] = {}
+        for id_profesor, dia, hora_inicio, hora_fin, nombre, apellido in result.all():
+            wd = weekday_de_dia(dia)
+            if wd is None:
+                continue
+            franjas[wd].append((id_profesor, hora_inicio, hora_fin))
+            nombres[id_profesor] = f"{nombre} {apellido}"
+        if not nombres:
+            return []
+
+        # 2) Tutorías de esos profesores en la ventana (de cualquier asignatura:
+        # un profesor no puede atender dos tutorías a la vez)
+        # Todo en la hora local de la institución, la de las franjas y los slots
+        tz = zona_local()
+        desde = datetime.combine(start, time.min, tz)
+        hasta = datetime.combine(end + timedelta(days=1), time.min, tz)
+        result = await db.execute(
+            select(
+                Tutoria.id_profesor, Tutoria.fecha_hora_inicio, Tutoria.fecha_hora_fin
+            ).where(
+                Tutoria.id_profesor.in_(list(nombres)),
+                Tutoria.fecha_hora_inicio < hasta,
+                Tutoria.fecha_hora_fin > desde,
+                ACTIVA,
+            )
+        )
+        ocupado = defaultdict(list)  # (id_profesor, fecha) -> [(inicio, fin)]
+        carga = defaultdict(int)
+        for id_profesor, inicio, fin in result.all():
+            inicio, fin = inicio.astimezone(tz), fin.astimezone(tz)
+            ocupado[(id_profesor, inicio.date())].append((inicio.time(), fin.time()))
+            carga[id_profesor] += 1
+
+        # 3) Expande franjas en horarios concretos y descarta los ocupados o pasados
+        ahora = datetime.now(tz)
+        horarios = []
+        fecha = start
+        while fecha <= end:
+            for id_profesor, hora_inicio, hora_fin in franjas.get(fecha.weekday(), []):
+                ocupados = ocupado.get((id_profesor, fecha), [])
+                actual = datetime.combine(fecha, hora_inicio, tz)
+                fin_franja = datetime.combine(fecha, hora_fin, tz)
+                while actual + duracion <= fin_franja:
+                    slot_fin = actual + duracion
+                    libre = actual > ahora and not any(
+                        actual.time() < t_fin and t_inicio < slot_fin.time()
+                        for t_inicio, t_fin in ocupados
+                    )
+                    if libre:
+                        horarios.append((actual, slot_fin, id_profesor))
+                    actual = slot_fin
+            fecha += timedelta(days=1)
+
+        # Primero lo más próximo; a igual hora, el profesor con menos carga en la ventana
+        horarios.sort(key=lambda h: (h[0], carga[h[2]], h[2]))
+        return [
+            {
+                "id_profesor": id_profesor,
+                "profesor": nombres[id_profesor],
+                "fecha": inicio.date(),
+                "inicio": inicio.time(),
+                "fin": fin.time(),
+            }
+            for inicio, fin, id_profesor in horarios[:limit]
+        ]
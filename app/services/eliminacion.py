@@ -0,0 +1,405 @@
+"""Borrado en segundo plano de asignaturas y usuarios con muchos dependientes.
+
+- ``solicitar`` comprueba con un único SELECT de EXISTS si la entidad tiene
+  registros dependientes. Si no los tiene se borra en el acto; si los tiene se
+  registra un ``TrabajoEliminacion`` y la petición responde enseguida.
+- ``run_pending`` (tarea periódica del scheduler) reclama trabajos con
+  ``FOR UPDATE SKIP LOCKED`` y ejecuta sus pasos en lotes de ``eliminacion_lote``
+  filas. Cada lote va en su propia transacción junto con la actualización del
+  progreso, así que un trabajo interrumpido se retoma desde el paso guardado.
+- Las tutorías futuras se cancelan primero y, antes de borrarlas, se notifica a
+  los participantes en inserciones agrupadas. Las tutorías borradas dejan
+  tombstone para la sincronización del calendario.
+"""
+
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import and_, delete, exists, func, insert, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.asignaturas import Asignatura
+from app.models.chat import MensajeChat
+from app.models.disponibilidad import DisponibilidadDocente
+from app.models.interacciones_chatbot import InteraccionChatbot
+from app.models.lista_espera import ListaEspera
+from app.models.notificacion import Notificacion
+from app.models.profesor_asignatura import ProfesorAsignatura
+from app.models.trabajos_eliminacion import EstadoTrabajo, TrabajoEliminacion
+from app.models.tutorias import ACTIVA, EstadoTutoria, Tutoria
+from app.models.tutorias_eliminadas import TutoriaEliminada
+from app.models.users import User
+from app.repositories.tutorias import TutoriaRepository
+from app.services.notifications import NotificationEvent, NotificationService
+
+logger = logging.getLogger(__name__)
+
+# Un trabajo EN_CURSO sin progreso durante este tiempo se considera abandonado
+TRABAJO_ABANDONADO = timedelta(minutes=5)
+
+# Pasos cuyas filas impiden borrar la entidad directamente ("cancelar" es un
+# subconjunto de "tutorias")
+_DEPENDIENTES = {
+    "lista_espera",
+    "tutorias",
+    "disponibilidad",
+    "profesor_asignatura",
+    "mensajes_chat",
+    "notificaciones",
+    "interacciones_chatbot",
+}
+
+_ENTIDADES = {
+    "asignatura": (Asignatura, Asignatura.id_asignatura),
+    "usuario": (User, User.id_usuario),
+}
+
+
+@dataclass(frozen=True)
+class _Paso:
+    nombre: str
+    pk: object  # columna con la que se eligen las filas de cada lote
+    condicion: object
+    # Si hay valores el paso actualiza las filas en lugar de borrarlas
+    valores: dict = field(default_factory=dict)
+    tombstone: bool = False
+
+
+def _tutorias_de(entidad: str, id_entidad: int):
+    if entidad == "asignatura":
+        return Tutoria.id_asignatura == id_entidad
+    return or_(Tutoria.id_estudiante == id_entidad, Tutoria.id_profesor == id_entidad)
+
+
+def _pasos(entidad: str, id_entidad: int) -> list:
+    tutorias = _tutorias_de(entidad, id_entidad)
+    pasos = [
+        _Paso(
+            "cancelar",
+            Tutoria.id_tutoria,
+            and_(tutorias, ACTIVA, Tutoria.fecha_hora_inicio > func.now()),
+            valores={
+                "estado": EstadoTutoria.CANCELADA.value,
+                "fecha_cancelacion": func.now(),
+                "version": Tutoria.version + 1,
+                "updated_at": func.now(),
+            },
+        ),
+        # Sin condición: lo resuelve _notificar
+        _Paso("notificar", None, None),
+        _Paso(
+            "lista_espera",
+            ListaEspera.id_espera,
+            (
+                ListaEspera.id_asignatura == id_entidad
+                if entidad == "asignatura"
+                else or_(
+                    ListaEspera.id_estudiante == id_entidad,
+                    ListaEspera.id_profesor == id_entidad,
+                )
+            ),
+        ),
+        _Paso("tutorias", Tutoria.id_tutoria, tutorias, tombstone=True),
+    ]
+    if entidad == "asignatura":
+        pasos += [
+            _Paso(
+                "disponibilidad",
+                DisponibilidadDocente.id_disponibilidad,
+                DisponibilidadDocente.id_asignatura == id_entidad,
+            ),
+            _Paso(
+                "profesor_asignatura",
+                ProfesorAsignatura.id,
+                ProfesorAsignatura.id_asignatura == id_entidad,
+            ),
+        ]
+    else:
+        pasos += [
+            _Paso(
+                "disponibilidad",
+                DisponibilidadDocente.id_disponibilidad,
+                DisponibilidadDocente.id_profesor == id_entidad,
+            ),
+            _Paso(
+                "profesor_asignatura",
+                ProfesorAsignatura.id,
+                ProfesorAsignatura.id_profesor == id_entidad,
+            ),
+            _Paso(
+                "mensajes_chat",
+                MensajeChat.id_mensaje,
+                MensajeChat.id_remitente == id_entidad,
+            ),
+            _Paso(
+                "notificaciones",
+                Notificacion.id_notificacion,
+                or_(
+                    Notificacion.id_destinatario == id_entidad,
+                    Notificacion.id_estudiante == id_entidad,
+                    Notificacion.id_profesor == id_entidad,
+                ),
+            ),
+            # El historial del chatbot se conserva anonimizado
+            _Paso(
+                "interacciones_chatbot",
+                InteraccionChatbot.id_interaccion,
+                InteraccionChatbot.id_usuario == id_entidad,
+                valores={"id_usuario": None},
+            ),
+        ]
+    _, pk = _ENTIDADES[entidad]
+    return pasos + [_Paso("entidad", pk, pk == id_entidad)]
+
+
+class EliminacionService:
+    @staticmethod
+    async def exists(db: AsyncSession, entidad: str, id_entidad: int) -> bool:
+        _, pk = _ENTIDADES[entidad]
+        return (await db.execute(select(exists().where(pk == id_entidad)))).scalar()
+
+    @staticmethod
+    async def solicitar(db: AsyncSession, entidad: str, id_entidad: int):
+        """Borra la entidad o encola su borrado.
+
+        Devuelve ``None`` si se borró en el acto, o el trabajo (nuevo o el que ya
+        estaba en curso para la misma entidad) si hay que hacerlo en segundo plano.
+        """
+        modelo, pk = _ENTIDADES[entidad]
+        dependientes = [
+            exists().where(p.condicion)
+            for p in _pasos(entidad, id_entidad)
+            if p.nombre in _DEPENDIENTES
+        ]
+        if not (await db.execute(select(or_(*dependientes)))).scalar():
+            try:
+                await db.execute(delete(modelo).where(pk == id_entidad))
+                await db.commit()
+                return None
+            except IntegrityError:
+                # Apareció un dependiente entre el EXISTS y el DELETE
+                await db.rollback()
+
+        columnas = list(TrabajoEliminacion.__table__.c)
+        result = await db.execute(
+            pg_insert(TrabajoEliminacion)
+            .values(entidad=entidad, id_entidad=id_entidad)
+            .on_conflict_do_nothing(
+                index_elements=["entidad", "id_entidad"],
+                index_where=text("estado IN ('PENDIENTE', 'EN_CURSO')"),
+            )
+            .returning(*columnas)
+        )
+        row = result.mappings().first()
+        if row is None:
+            result = await db.execute(
+                select(*columnas).where(
+                    TrabajoEliminacion.entidad == entidad,
+                    TrabajoEliminacion.id_entidad == id_entidad,
+                    TrabajoEliminacion.estado.in_(
+                        [EstadoTrabajo.PENDIENTE.value, EstadoTrabajo.EN_CURSO.value]
+                    ),
+                )
+            )
+            row = result.mappings().first()
+        await db.commit()
+        return dict(row)
+
+    @staticmethod
+    async def get(db: AsyncSession, id_trabajo: int) -> Optional[TrabajoEliminacion]:
+        return await db.get(TrabajoEliminacion, id_trabajo)
+
+    @staticmethod
+    async def _reclamar():
+        from app.core.database import engine
+
+        T = TrabajoEliminacion
+        candidato = (
+            select(T.id_trabajo)
+            .where(
+                or_(
+                    T.estado == EstadoTrabajo.PENDIENTE.value,
+                    and_(
+                        T.estado == EstadoTrabajo.EN_CURSO.value,
+                        T.fecha_actualizacion < func.now() - TRABAJO_ABANDONADO,
+                    ),
+                )
+            )
+            .order_by(T.id_trabajo)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                update(T)
+                .where(T.id_trabajo == candidato)
+                .values(
+                    estado=EstadoTrabajo.EN_CURSO.value, fecha_actualizacion=func.now()
+                )
+                .returning(*T.__table__.c)
+            )
+            return result.mappings().first()
+
+    @staticmethod
+    async def run_pending():
+        while (trabajo := await EliminacionService._reclamar()) is not None:
+            try:
+                await EliminacionService._ejecutar(trabajo)
+            except Exception as exc:
+                logger.exception("Falló el trabajo de eliminación %s", trabajo)
+                await EliminacionService._progreso(
+                    trabajo["id_trabajo"],
+                    estado=EstadoTrabajo.FALLIDO.value,
+                    error=str(exc)[:500],
+                    fecha_fin=func.now(),
+                )
+
+    @staticmethod
+    async def _progreso(id_trabajo: int, conn=None, **valores):
+        stmt = (
+            update(TrabajoEliminacion)
+            .where(TrabajoEliminacion.id_trabajo == id_trabajo)
+            .values(fecha_actualizacion=func.now(), **valores)
+        )
+        if conn is not None:
+            await conn.execute(stmt)
+            return
+        from app.core.database import engine
+
+        async with engine.begin() as conn:
+            await conn.execute(stmt)
+
+    @staticmethod
+    async def _ejecutar(trabajo):
+        from app.core.database import engine
+
+        id_trabajo = trabajo["id_trabajo"]
+        pasos = _pasos(trabajo["entidad"], trabajo["id_entidad"])
+        nombres = [p.nombre for p in pasos]
+        inicio = nombres.index(trabajo["paso"]) if trabajo["paso"] in nombres else 0
+
+        if trabajo["total"] is None:
+            async with engine.connect() as conn:
+                conteos = [
+                    (
+                        await conn.execute(
+                            select(func.count()).select_from(
+                                select(p.pk).where(p.condicion).subquery()
+                            )
+                        )
+                    ).scalar_one()
+                    for p in pasos
+                    if p.condicion is not None
+                ]
+            await EliminacionService._progreso(id_trabajo, total=sum(conteos))
+
+        for paso in pasos[inicio:]:
+            await EliminacionService._progreso(id_trabajo, paso=paso.nombre)
+            if paso.nombre == "notificar":
+                await EliminacionService._notificar(trabajo)
+                continue
+            while True:
+                async with engine.begin() as conn:
+                    filas = await EliminacionService._lote(conn, paso)
+                    if filas:
+                        await EliminacionService._progreso(
+                            id_trabajo,
+                            conn,
+                            procesados=TrabajoEliminacion.procesados + filas,
+                        )
+                if filas < settings.eliminacion_lote:
+                    break
+
+        await EliminacionService._progreso(
+            id_trabajo, estado=EstadoTrabajo.COMPLETADO.value, fecha_fin=func.now()
+        )
+
+    @staticmethod
+    async def _lote(conn, paso: _Paso) -> int:
+        lote = (
+            select(paso.pk)
+            .where(paso.condicion)
+            .limit(settings.eliminacion_lote)
+            .scalar_subquery()
+        )
+        tabla = paso.pk.table
+        if paso.valores:
+            result = await conn.execute(
+                update(tabla).where(paso.pk.in_(lote)).values(**paso.valores)
+            )
+            return result.rowcount
+        if not paso.tombstone:
+            result = await conn.execute(delete(tabla).where(paso.pk.in_(lote)))
+            return result.rowcount
+        # Tutorías: el tombstone se inserta en la misma sentencia que el borrado
+        borradas = (
+            delete(Tutoria)
+            .where(Tutoria.id_tutoria.in_(lote))
+            .returning(Tutoria.id_tutoria, Tutoria.id_estudiante, Tutoria.id_profesor)
+            .cte("borradas")
+        )
+        tombstone = (
+            insert(TutoriaEliminada)
+            .from_select(
+                ["id_tutoria", "id_estudiante", "id_profesor"],
+                select(
+                    borradas.c.id_tutoria,
+                    borradas.c.id_estudiante,
+                    borradas.c.id_profesor,
+                ),
+            )
+            .cte("tombstone")
+        )
+        result = await conn.execute(
+            select(func.count()).select_from(borradas).add_cte(tombstone)
+        )
+        return result.scalar_one()
+
+    @staticmethod
+    async def _notificar(trabajo):
+        """Avisa de las tutorías canceladas por el trabajo, en lotes agrupados.
+
+        El cursor (última tutoría avisada) se guarda con el progreso de cada
+        lote, así que un trabajo retomado no repite los avisos ya enviados; como
+        mucho se repite el lote en curso si el proceso cae entre su commit y el
+        del progreso.
+        """
+        from app.core.database import AsyncSessionLocal
+
+        # El usuario que se elimina no recibe avisos
+        excluir = {trabajo["id_entidad"]} if trabajo["entidad"] == "usuario" else set()
+        condiciones = (
+            _tutorias_de(trabajo["entidad"], trabajo["id_entidad"]),
+            Tutoria.estado == EstadoTutoria.CANCELADA.value,
+            Tutoria.fecha_cancelacion >= trabajo["fecha_creacion"],
+        )
+        ultimo = trabajo["ultimo_notificado"] or 0
+        async with AsyncSessionLocal() as db:
+            while True:
+                lote = await TutoriaRepository.find(
+                    db,
+                    *condiciones,
+                    Tutoria.id_tutoria > ultimo,
+                    order_by=Tutoria.id_tutoria,
+                    limit=settings.eliminacion_lote,
+                )
+                if not lote:
+                    break
+                ultimo = lote[-1].id_tutoria
+                filas = await NotificationService.notify(
+                    db,
+                    NotificationEvent.CANCELED,
+                    [asdict(t) for t in lote],
+                    excluir=excluir,
+                )
+                await EliminacionService._progreso(
+                    trabajo["id_trabajo"],
+                    notificados=TrabajoEliminacion.notificados + len(filas),
+                    ultimo_notificado=ultimo,
+                )
@@ -0,0 +1,96 @@
+import asyncio
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+class HealthService:
+    # Resultado cacheado del último chequeo: (instante monotónico, ok, detalle)
+    _cached: tuple[float, bool, dict] | None = None
+    _lock = asyncio.Lock()
+    _heads: set[str] | None = None
+
+    @staticmethod
+    def alembic_heads() -> set[str]:
+        # Los heads sólo cambian con un despliegue, se calculan una vez por proceso
+        if HealthService._heads is None:
+            from alembic.config import Config
+            from alembic.script import ScriptDirectory
+
+            config = Config(str(ALEMBIC_INI))
+            config.set_main_option(
+                "script_location", str(ALEMBIC_INI.parent / "alembic")
+            )
+            HealthService._heads = set(ScriptDirectory.from_config(config).get_heads())
+        return HealthService._heads
+
+    @staticmethod
+    async def _check_database() -> tuple[bool, dict]:
+        from app.core.database import engine
+
+        async def probe():
+            # Toma una conexión del pool (falla si el pool está agotado) y lee la revisión
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                    text("SELECT version_num FROM alembic_version")
+                )
+                return set(result.scalars().all())
+
+        started = time.perf_counter()
+        try:
+            current = await asyncio.wait_for(probe(), settings.readiness_db_timeout)
+        except asyncio.TimeoutError:
+            return False, {"database": "timeout", "migrations": "unknown"}
+        except Exception as exc:
+            return False, {"database": f"error: {exc.__class__.__name__}"}
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        heads = HealthService.alembic_heads()
+        migrations_ok = current == heads
+        return migrations_ok, {
+            "database": "ok",
+            "database_latency_ms": latency_ms,
+            "migrations": "ok" if migrations_ok else "pending",
+            "alembic_current": sorted(current),
+            "alembic_head": sorted(heads),
+        }
+
+    @staticmethod
+    def _check_websockets() -> tuple[bool, dict]:
+        from app.core.ws_manager import manager
+
+        connections = manager.connection_count()
+        ok = connections < settings.ws_max_connections
+        return ok, {
+            "websockets": "ok" if ok else "saturated",
+            "websocket_connections": connections,
+            "websocket_capacity": settings.ws_max_connections,
+        }
+
+    @staticmethod
+    async def readiness() -> tuple[bool, dict]:
+        cached = HealthService._cached
+        now = time.monotonic()
+        if cached and now - cached[0] < settings.readiness_cache_ttl:
+            return cached[1], cached[2]
+        async with HealthService._lock:
+            # Otro probe pudo refrescar el resultado mientras esperábamos el lock
+            cached = HealthService._cached
+            now = time.monotonic()
+            if cached and now - cached[0] < settings.readiness_cache_ttl:
+                return cached[1], cached[2]
+            db_ok, db_detail = await HealthService._check_database()
+            ws_ok, ws_detail = HealthService._check_websockets()
+            ok = db_ok and ws_ok
+            detail = {
+                "status": "ready" if ok else "unavailable",
+                **db_detail,
+                **ws_detail,
+            }
+            HealthService._cached = (time.monotonic(), ok, detail)
+            return ok, detail
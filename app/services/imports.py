@@ -0,0 +1,388 @@
+import asyncio
+import codecs
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable
+
+from pydantic import ValidationError
+from sqlalchemy import or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.security import hash_password
+from app.models.asignaturas import Asignatura
+from app.models.disponibilidad import DisponibilidadDocente
+from app.models.profesor_asignatura import ProfesorAsignatura
+from app.models.roles import Role
+from app.models.users import User
+from app.schemas.asignaturas import AsignaturaCreate
+from app.schemas.imports import (
+    AsignacionImport,
+    DisponibilidadImport,
+    ImportReport,
+    ImportRowError,
+)
+from app.schemas.users import UserCreate
+from app.services.chatbot import availability_cache
+from app.services.slots import SlotService
+from app.utils.date_utils import DIAS_SEMANA, weekday_de_dia
+
+BATCH_SIZE = 1000
+# Tope de errores devueltos para que un archivo corrupto no infle la respuesta
+MAX_ERRORES = 1000
+
+# bcrypt libera el GIL mientras calcula el hash, así que un pool de hilos
+# reparte el trabajo entre todos los núcleos sin bloquear el event loop
+_hash_pool = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 4, thread_name_prefix="bcrypt"
+)
+
+
+def _es_utf8(texto: str) -> bool:
+    # Los bytes inválidos llegan como sustitutos sueltos (surrogateescape), que no
+    # se pueden volver a codificar en UTF-8 estricto
+    try:
+        texto.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+async def _lineas(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Líneas de texto del cuerpo. El decodificador incremental conserva entre
+    chunks los bytes de un carácter partido; los bytes inválidos no cortan la
+    lectura, se marcan para informarlos como error de la fila."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="surrogateescape")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *complete, buffer = buffer.split("\n")
+        for line in complete:
+            yield line.removesuffix("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.removesuffix("\r")
+
+
+async def _registros_csv(lines: AsyncIterator[str]) -> AsyncIterator[list[str]]:
+    """Agrupa las líneas de cada registro CSV: un campo entrecomillado puede
+    contener saltos de línea, y el registro sigue abierto mientras el número de
+    comillas sea impar (las comillas escapadas van dobles)."""
+    pendiente: list[str] = []
+    comillas = 0
+    async for line in lines:
+        if not pendiente and not line.strip():
+            continue
+        pendiente.append(line + "\n")
+        comillas += line.count('"')
+        if comillas % 2 == 0:
+            yield pendiente
+            pendiente, comillas = [], 0
+    if pendiente:
+        # Comilla sin cerrar al final del archivo: csv.reader lo informa
+        yield pendiente
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes], content_type: str
+) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Lee CSV (con cabecera) o NDJSON en streaming: produce (fila, registro, error)."""
+    es_csv = "csv" in (content_type or "")
+    header: list[str] | None = None
+    fila = 0
+
+    def parse(texto):
+        nonlocal header
+        if es_csv:
+            values = next(csv.reader(texto, strict=True))
+            if header is None:
+                header = [h.strip() for h in values]
+                return None
+            # Celdas vacías se tratan como ausentes
+            return {k: (v if v != "" else None) for k, v in zip(header, values)}
+        return json.loads(texto)
+
+    if es_csv:
+        items = _registros_csv(_lineas(chunks))
+    else:
+        items = (line async for line in _lineas(chunks) if line.strip())
+
+    async for item in items:
+        if not _es_utf8("".join(item)):
+            fila += 1
+            yield fila, None, "Texto no válido en UTF-8"
+            continue
+        try:
+            record = parse(item)
+        except (ValueError, csv.Error) as exc:
+            fila += 1
+            yield fila, None, f"Línea inválida: {exc}"
+            continue
+        if record is None:
+            continue
+        fila += 1
+        if not isinstance(record, dict):
+            yield fila, None, "Se esperaba un objeto JSON por línea"
+            continue
+        yield fila, record, None
+
+
+def _error(report: ImportReport, fila: int, error: str):
+    if len(report.errores) < MAX_ERRORES:
+        report.errores.append(ImportRowError(fila=fila, error=error))
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors()
+    )
+
+
+class ImportService:
+    @staticmethod
+    async def _run(
+        records,
+        schema,
+        flush: Callable,
+        db: AsyncSession,
+    ) -> ImportReport:
+        report = ImportReport()
+        batch: list[tuple[int, object]] = []
+        async for fila, record, error in records:
+            report.procesadas += 1
+            if error:
+                _error(report, fila, error)
+                continue
+            try:
+                batch.append((fila, schema(**record)))
+            except ValidationError as exc:
+                _error(report, fila, _validation_message(exc))
+                continue
+            if len(batch) >= BATCH_SIZE:
+                await flush(db, batch, report)
+                batch = []
+        if batch:
+            await flush(db, batch, report)
+        return report
+
+    @staticmethod
+    async def _flush_usuarios(db: AsyncSession, batch, report: ImportReport):
+        loop = asyncio.get_running_loop()
+        hashes = await asyncio.gather(
+            *(
+                loop.run_in_executor(_hash_pool, hash_password, u.contrasena)
+                for _, u in batch
+            )
+        )
+        values = [
+            {
+                "nombre": u.nombre,
+                "apellido": u.apellido,
+                "email": str(u.email),
+                "contrasena": h,
+                "id_rol": u.id_rol,
+            }
+            for (_, u), h in zip(batch, hashes)
+        ]
+        stmt = (
+            pg_insert(User)
+            .values(values)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.email)
+        )
+        insertados = set((await db.execute(stmt)).scalars().all())
+        await db.commit()
+        ImportService._count(report, batch, lambda u: str(u.email), insertados)
+
+    @staticmethod
+    async def _flush_asignaturas(db: AsyncSession, batch, report: ImportReport):
+        stmt = (
+            pg_insert(Asignatura)
+            .values([{"nombre_asignatura": a.nombre_asignatura} for _, a in batch])
+            .on_conflict_do_nothing(index_elements=[Asignatura.nombre_asignatura])
+            .returning(Asignatura.nombre_asignatura)
+        )
+        insertadas = set((await db.execute(stmt)).scalars().all())
+        await db.commit()
+        ImportService._count(report, batch, lambda a: a.nombre_asignatura, insertadas)
+
+    @staticmethod
+    def _count(report: ImportReport, batch, key: Callable, insertados: set):
+        # Cada clave devuelta por RETURNING corresponde a una sola fila del lote;
+        # los duplicados dentro del mismo archivo cuentan como omitidos
+        for _, item in batch:
+            k = key(item)
+            if k in insertados:
+                report.insertadas += 1
+                insertados.discard(k)
+            else:
+                report.omitidas += 1
+
+    @staticmethod
+    async def _resolve(db: AsyncSession, batch, report: ImportReport):
+        """Resuelve profesores y asignaturas del lote con dos consultas en total.
+
+        Devuelve [(fila, item, id_profesor, id_asignatura)] sólo para filas válidas.
+        """
+        ids_prof = {i.id_profesor for _, i in batch if i.id_profesor}
+        emails = {i.email_profesor for _, i in batch if i.email_profesor}
+        ids_asig = {i.id_asignatura for _, i in batch if i.id_asignatura}
+        nombres = {i.nombre_asignatura for _, i in batch if i.nombre_asignatura}
+
+        profesores_por_id: dict[int, int] = {}
+        profesores_por_email: dict[str, int] = {}
+        if ids_prof or emails:
+            result = await db.execute(
+                select(User.id_usuario, User.email)
+                .join(Role, Role.id_rol == User.id_rol)
+                .where(
+                    Role.nombre_rol == "PROFESOR",
+                    or_(User.id_usuario.in_(ids_prof), User.email.in_(emails)),
+                )
+            )
+            for id_usuario, email in result.all():
+                profesores_por_id[id_usuario] = id_usuario
+                profesores_por_email[email] = id_usuario
+
+        asig_por_id: dict[int, int] = {}
+        asig_por_nombre: dict[str, int] = {}
+        if ids_asig or nombres:
+            result = await db.execute(
+                select(Asignatura.id_asignatura, Asignatura.nombre_asignatura).where(
+                    or_(
+                        Asignatura.id_asignatura.in_(ids_asig),
+                        Asignatura.nombre_asignatura.in_(nombres),
+                    )
+                )
+            )
+            for id_asignatura, nombre in result.all():
+                asig_por_id[id_asignatura] = id_asignatura
+                asig_por_nombre[nombre] = id_asignatura
+
+        resueltos = []
+        for fila, item in batch:
+            id_profesor = (
+                profesores_por_id.get(item.id_profesor)
+                if item.id_profesor
+                else profesores_por_email.get(item.email_profesor)
+            )
+            id_asignatura = (
+                asig_por_id.get(item.id_asignatura)
+                if item.id_asignatura
+                else asig_por_nombre.get(item.nombre_asignatura)
+            )
+            if id_profesor is None:
+                _error(report, fila, "Profesor no encontrado o sin rol PROFESOR")
+            elif id_asignatura is None:
+                _error(report, fila, "Asignatura no encontrada")
+            else:
+                resueltos.append((fila, item, id_profesor, id_asignatura))
+        return resueltos
+
+    @staticmethod
+    async def _flush_asignaciones(db: AsyncSession, batch, report: ImportReport):
+        resueltos = await ImportService._resolve(db, batch, report)
+        if not resueltos:
+            return
+        pares = [(p, a) for _, _, p, a in resueltos]
+        stmt = (
+            pg_insert(ProfesorAsignatura)
+            .values([{"id_profesor": p, "id_asignatura": a} for p, a in pares])
+            .on_conflict_do_nothing(constraint="_profesor_asignatura_uc")
+            .returning(ProfesorAsignatura.id_profesor, ProfesorAsignatura.id_asignatura)
+        )
+        insertados = set(tuple(r) for r in (await db.execute(stmt)).all())
+        await db.commit()
+        ImportService._count(
+            report,
+            [(f, (p, a)) for f, _, p, a in resueltos],
+            lambda par: par,
+            insertados,
+        )
+
+    @staticmethod
+    async def _flush_disponibilidad(db: AsyncSession, batch, report: ImportReport):
+        validos = []
+        for fila, item in batch:
+            wd = weekday_de_dia(item.dia_semana)
+            if wd is None:
+                _error(report, fila, f"dia_semana inválido: {item.dia_semana}")
+            elif item.hora_inicio >= item.hora_fin:
+                _error(report, fila, "hora_inicio debe ser menor que hora_fin")
+            else:
+                item.dia_semana = DIAS_SEMANA[wd]
+                validos.append((fila, item))
+        resueltos = await ImportService._resolve(db, validos, report)
+        if not resueltos:
+            return
+        # La franja sólo es reservable si el profesor dicta la asignatura
+        pares = {(p, a) for _, _, p, a in resueltos}
+        result = await db.execute(
+            select(
+                ProfesorAsignatura.id_profesor, ProfesorAsignatura.id_asignatura
+            ).where(
+                tuple_(
+                    ProfesorAsignatura.id_profesor, ProfesorAsignatura.id_asignatura
+                ).in_(list(pares))
+            )
+        )
+        asignados = set(tuple(r) for r in result.all())
+        values = {}
+        for fila, item, p, a in resueltos:
+            if (p, a) not in asignados:
+                _error(report, fila, "El profesor no está asignado a la asignatura")
+                continue
+            clave = (p, a, item.dia_semana, item.hora_inicio, item.hora_fin)
+            if clave in values:
+                # Repetida dentro del mismo archivo
+                report.omitidas += 1
+                continue
+            values[clave] = {
+                "id_profesor": p,
+                "id_asignatura": a,
+                "dia_semana": item.dia_semana,
+                "hora_inicio": item.hora_inicio,
+                "hora_fin": item.hora_fin,
+            }
+        if values:
+            result = await db.execute(
+                pg_insert(DisponibilidadDocente)
+                .values(list(values.values()))
+                .on_conflict_do_nothing(constraint="uq_disponibilidad_franja")
+                .returning(DisponibilidadDocente.id_disponibilidad)
+            )
+            insertadas = result.scalars().all()
+            # Los slots de las franjas nuevas se generan en la misma transacción
+            if insertadas:
+                await SlotService.sync(db, *insertadas)
+            await db.commit()
+            availability_cache.invalidate()
+            report.insertadas += len(insertadas)
+            report.omitidas += len(values) - len(insertadas)
+
+    @staticmethod
+    async def import_usuarios(db: AsyncSession, records) -> ImportReport:
+        return await ImportService._run(
+            records, UserCreate, ImportService._flush_usuarios, db
+        )
+
+    @staticmethod
+    async def import_asignaturas(db: AsyncSession, records) -> ImportReport:
+        return await ImportService._run(
+            records, AsignaturaCreate, ImportService._flush_asignaturas, db
+        )
+
+    @staticmethod
+    async def import_asignaciones(db: AsyncSession, records) -> ImportReport:
+        return await ImportService._run(
+            records, AsignacionImport, ImportService._flush_asignaciones, db
+        )
+
+    @staticmethod
+    async def import_disponibilidad(db: AsyncSession, records) -> ImportReport:
+        return await ImportService._run(
+            records, DisponibilidadImport, ImportService._flush_disponibilidad, db
+        )
@@ -0,0 +1,162 @@
+"""Lista de espera por profesor, asignatura y ventana de fechas.
+
+En lugar de consultar una y otra vez los horarios libres, el estudiante se anota
+en la lista. Cuando una cancelación o reprogramación libera un horario, la misma
+transacción agenda al primero de la cola cuya ventana lo cubra (ver
+``TutoriaService._promover``) y tras el commit se le notifica por WebSocket.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.lista_espera import EstadoEspera, ListaEspera
+from app.models.profesor_asignatura import ProfesorAsignatura
+from app.models.tutorias import Tutoria
+from app.utils.date_utils import a_hora_local
+
+
+class ListaEsperaService:
+    @staticmethod
+    async def create(db: AsyncSession, espera_in):
+        if espera_in.fecha_hasta < espera_in.fecha_desde:
+            raise ValueError("fecha_hasta debe ser >= fecha_desde")
+        asignado = await db.execute(
+            select(
+                exists().where(
+                    ProfesorAsignatura.id_profesor == espera_in.id_profesor,
+                    ProfesorAsignatura.id_asignatura == espera_in.id_asignatura,
+                )
+            )
+        )
+        if not asignado.scalar():
+            raise ValueError(
+                "El profesor no está asignado a la asignatura seleccionada"
+            )
+        result = await db.execute(
+            insert(ListaEspera).values(**espera_in.dict()).returning(ListaEspera)
+        )
+        espera = result.scalar_one()
+        await db.commit()
+        return espera
+
+    @staticmethod
+    async def get_by_estudiante(db: AsyncSession, id_estudiante: int):
+        result = await db.execute(
+            select(ListaEspera)
+            .where(ListaEspera.id_estudiante == id_estudiante)
+            .order_by(ListaEspera.fecha_creacion.desc())
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def delete(db: AsyncSession, id_espera: int) -> bool:
+        """Retira una entrada que sigue esperando."""
+        result = await db.execute(
+            delete(ListaEspera)
+            .where(
+                ListaEspera.id_espera == id_espera,
+                ListaEspera.estado == EstadoEspera.ESPERANDO.value,
+            )
+            .returning(ListaEspera.id_espera)
+        )
+        borrada = result.scalar_one_or_none()
+        await db.commit()
+        return borrada is not None
+
+    @staticmethod
+    def promover_stmt(
+        id_profesor: int,
+        id_asignatura: int,
+        inicio: datetime,
+        fin: datetime,
+        id_estudiante_anterior: int,
+    ):
+        """INSERT de la tutoría para el primero de la cola que puede tomar el horario.
+
+        La entrada se reclama con ``FOR UPDATE SKIP LOCKED``: dos liberaciones
+        simultáneas promueven a estudiantes distintos en lugar de esperarse. La
+        entrada pasa a PROMOVIDA con el id de la tutoría tomado de la secuencia y
+        la tutoría se inserta desde su RETURNING. Devuelve None si el horario ya
+        pasó.
+        """
+        if inicio <= datetime.now(timezone.utc):
+            return None
+        dia = a_hora_local(inicio).date()
+        cola = aliased(ListaEspera)
+        otra = aliased(Tutoria)
+        ocupado = exists().where(
+            or_(
+                otra.id_estudiante == cola.id_estudiante,
+                otra.id_profesor == id_profesor,
+            ),
+            otra.estado.in_(
+                [literal_column("'SOLICITADA'"), literal_column("'CONFIRMADA'")]
+            ),
+            otra.fecha_hora_inicio < fin,
+            otra.fecha_hora_fin > inicio,
+        )
+        siguiente = (
+            select(cola.id_espera)
+            .where(
+                cola.id_profesor == id_profesor,
+                cola.id_asignatura == id_asignatura,
+                cola.estado == literal_column("'ESPERANDO'"),
+                cola.fecha_desde <= dia,
+                cola.fecha_hasta >= dia,
+                cola.id_estudiante != id_estudiante_anterior,
+                ~ocupado,
+            )
+            .order_by(cola.fecha_creacion, cola.id_espera)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        secuencia = func.pg_get_serial_sequence('"Tutorias"', "id_tutoria")
+        promovida = (
+            update(ListaEspera)
+            .where(ListaEspera.id_espera == siguiente)
+            .values(
+                estado=EstadoEspera.PROMOVIDA.value,
+                id_tutoria=func.nextval(secuencia),
+                fecha_promocion=func.now(),
+            )
+            .returning(
+                ListaEspera.id_tutoria,
+                ListaEspera.id_estudiante,
+                ListaEspera.modalidad,
+            )
+            .cte("promovida")
+        )
+        return insert(Tutoria).from_select(
+            [
+                "id_tutoria",
+                "id_estudiante",
+                "id_profesor",
+                "id_asignatura",
+                "fecha_hora_inicio",
+                "fecha_hora_fin",
+                "modalidad",
+            ],
+            select(
+                promovida.c.id_tutoria,
+                promovida.c.id_estudiante,
+                literal(id_profesor),
+                literal(id_asignatura),
+                literal(inicio, Tutoria.fecha_hora_inicio.type),
+                literal(fin, Tutoria.fecha_hora_fin.type),
+                promovida.c.modalidad,
+            ),
+        )
@@ -0,0 +1,360 @@
+import asyncio
+import gzip
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from enum import Enum
+from typing import Callable, Collection, Sequence
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.ws_manager import manager
+from app.models.notificacion import Notificacion
+
+logger = logging.getLogger(__name__)
+
+_PARTICION = re.compile(r"^Notificaciones_p(\d{4})(\d{2})$")
+
+
+def _mes_siguiente(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+class NotificationRetentionService:
+    """Mantiene las particiones mensuales de ``Notificaciones``.
+
+    Crea por adelantado las particiones de los próximos meses y, cuando una
+    partición queda completamente fuera de la ventana de retención, la archiva
+    (NDJSON comprimido con gzip, si hay directorio configurado) y la elimina.
+    """
+
+    # Id arbitrario del advisory lock: sólo un worker hace el mantenimiento
+    LOCK_ID = 7_401_034
+
+    @staticmethod
+    async def create_partition(conn, mes: date):
+        nombre = f"Notificaciones_p{mes:%Y%m}"
+        await conn.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS "{nombre}" PARTITION OF "Notificaciones" '
+                f"FOR VALUES FROM ('{mes.isoformat()}') "
+                f"TO ('{_mes_siguiente(mes).isoformat()}')"
+            )
+        )
+
+    @staticmethod
+    async def list_partitions(conn) -> list[tuple[str, date]]:
+        result = await conn.execute(text("""
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                JOIN pg_class p ON p.oid = i.inhparent
+                WHERE p.relname = 'Notificaciones'
+                """))
+        particiones = []
+        for (nombre,) in result.all():
+            m = _PARTICION.match(nombre)
+            if m:
+                particiones.append((nombre, date(int(m[1]), int(m[2]), 1)))
+        return sorted(particiones, key=lambda p: p[1])
+
+    @staticmethod
+    async def archive_partition(conn, nombre: str, mes: date) -> str:
+        os.makedirs(settings.notificaciones_archivo_dir, exist_ok=True)
+        path = os.path.join(
+            settings.notificaciones_archivo_dir, f"notificaciones_{mes:%Y%m}.ndjson.gz"
+        )
+        tmp = f"{path}.tmp"
+        fh = await asyncio.to_thread(gzip.open, tmp, "wt", encoding="utf-8")
+        try:
+            result = await conn.stream(
+                text(f'SELECT row_to_json(n)::text FROM "{nombre}" n')
+            )
+            async for partition in result.partitions(1000):
+                data = "".join(f"{row[0]}\n" for row in partition)
+                await asyncio.to_thread(fh.write, data)
+        finally:
+            await asyncio.to_thread(fh.close)
+        os.replace(tmp, path)
+        return path
+
+    @staticmethod
+    async def run():
+        from app.core.database import engine
+
+        hoy = datetime.now(timezone.utc).date()
+        limite = hoy - timedelta(days=settings.notificaciones_retencion_dias)
+        async with engine.connect() as conn:
+            locked = (
+                await conn.execute(
+                    text("SELECT pg_try_advisory_lock(:id)"),
+                    {"id": NotificationRetentionService.LOCK_ID},
+                )
+            ).scalar_one()
+            await conn.commit()
+            if not locked:
+                return
+            try:
+                mes = hoy.replace(day=1)
+                for _ in range(settings.notificaciones_particiones_futuras + 1):
+                    await NotificationRetentionService.create_partition(conn, mes)
+                    mes = _mes_siguiente(mes)
+                await conn.commit()
+
+                for (
+                    nombre,
+                    inicio,
+                ) in await NotificationRetentionService.list_partitions(conn):
+                    # Sólo se elimina cuando todo el mes quedó fuera de la retención
+                    if _mes_siguiente(inicio) > limite:
+                        continue
+                    if settings.notificaciones_archivo_dir:
+                        path = await NotificationRetentionService.archive_partition(
+                            conn, nombre, inicio
+                        )
+                        logger.info("Partición %s archivada en %s", nombre, path)
+                    await conn.execute(
+                        text(
+                            f'ALTER TABLE "Notificaciones" DETACH PARTITION "{nombre}"'
+                        )
+                    )
+                    await conn.execute(text(f'DROP TABLE "{nombre}"'))
+                    await conn.commit()
+                    logger.info("Partición %s eliminada", nombre)
+            finally:
+                # Si un paso falló la transacción quedó abortada: se descarta antes
+                # de liberar el lock, que es de sesión y sobrevive al rollback
+                await conn.rollback()
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:id)"),
+                    {"id": NotificationRetentionService.LOCK_ID},
+                )
+                await conn.commit()
+
+
+class NotificationEvent(str, Enum):
+    CREATED = "CREATED"
+    RESCHEDULED = "RESCHEDULED"
+    CANCELED = "CANCELED"
+    # Tutoría agendada automáticamente desde la lista de espera
+    PROMOTED = "PROMOTED"
+
+
+@dataclass(frozen=True)
+class _Plantilla:
+    titulo: str
+    # Se usa la descripción completa sólo si están todos los campos de `requiere`
+    completa: Callable[..., str]
+    respaldo: Callable[..., str]
+    requiere: tuple[str, ...]
+
+
+def _plantilla(titulo: str, completa: str, respaldo: str, requiere: tuple[str, ...]):
+    return _Plantilla(titulo, completa.format, respaldo.format, requiere)
+
+
+_ESTUDIANTE = ("asig", "profesor")
+_PROFESOR = ("estudiante", "asig")
+
+# (evento, rol, serie) -> plantilla; "serie" agrupa varias sesiones recurrentes
+_PLANTILLAS = {
+    (NotificationEvent.CREATED, "estudiante", False): _plantilla(
+        "Tutoría agendada",
+        "Has agendado {asig} con {profesor} el {inicio}",
+        "Has agendado una tutoría el {inicio}",
+        _ESTUDIANTE,
+    ),
+    (NotificationEvent.CREATED, "profesor", False): _plantilla(
+        "Nueva tutoría agendada",
+        "{estudiante} agendó {asig} para el {inicio}",
+        "Se agendó una tutoría para el {inicio}",
+        _PROFESOR,
+    ),
+    (NotificationEvent.CREATED, "estudiante", True): _plantilla(
+        "Tutorías agendadas",
+        "Has agendado {n} sesiones de {asig} con {profesor} desde el {inicio}",
+        "Has agendado {n} sesiones desde el {inicio}",
+        _ESTUDIANTE,
+    ),
+    (NotificationEvent.CREATED, "profesor", True): _plantilla(
+        "Nuevas tutorías agendadas",
+        "{estudiante} agendó {n} sesiones de {asig} desde el {inicio}",
+        "Se agendaron {n} sesiones desde el {inicio}",
+        _PROFESOR,
+    ),
+    (NotificationEvent.RESCHEDULED, "estudiante", False): _plantilla(
+        "Tutoría reprogramada",
+        "Reprogramaste {asig} con {profesor} para {inicio}",
+        "Reprogramaste una tutoría",
+        _ESTUDIANTE,
+    ),
+    (NotificationEvent.RESCHEDULED, "profesor", False): _plantilla(
+        "Tutoría reprogramada",
+        "{estudiante} reprogramó {asig} para {inicio}",
+        "Una tutoría fue reprogramada",
+        _PROFESOR,
+    ),
+    (NotificationEvent.CANCELED, "estudiante", False): _plantilla(
+        "Tutoría cancelada",
+        "Se canceló {asig} con {profesor} prevista para {inicio}",
+        "Una tutoría fue cancelada",
+        _ESTUDIANTE,
+    ),
+    (NotificationEvent.CANCELED, "profesor", False): _plantilla(
+        "Tutoría cancelada",
+        "{estudiante} canceló {asig} prevista para {inicio}",
+        "Una tutoría fue cancelada",
+        _PROFESOR,
+    ),
+    (NotificationEvent.PROMOTED, "estudiante", False): _plantilla(
+        "Se liberó un horario",
+        "Quedaste agendado en {asig} con {profesor} el {inicio}",
+        "Quedaste agendado en una tutoría el {inicio}",
+        _ESTUDIANTE,
+    ),
+    (NotificationEvent.PROMOTED, "profesor", False): _plantilla(
+        "Tutoría agendada desde la lista de espera",
+        "{estudiante} tomó el horario liberado de {asig} el {inicio}",
+        "Se agendó una tutoría desde la lista de espera para el {inicio}",
+        _PROFESOR,
+    ),
+}
+
+_RETURNING = (
+    Notificacion.id_notificacion,
+    Notificacion.id_destinatario,
+    Notificacion.titulo,
+    Notificacion.descripcion,
+    Notificacion.leida,
+    Notificacion.fecha_creacion,
+    Notificacion.tipo,
+)
+
+
+class NotificationService:
+    @staticmethod
+    def render(
+        event: NotificationEvent, tutoria: dict, sesiones: int = 1
+    ) -> list[dict]:
+        """Filas de ``Notificaciones`` (estudiante y profesor) para un evento."""
+        campos = {
+            "asig": tutoria.get("titulo"),
+            "profesor": tutoria.get("profesor"),
+            "estudiante": tutoria.get("estudiante"),
+            "inicio": tutoria.get("fecha_hora_inicio"),
+            "n": sesiones,
+        }
+        filas = []
+        for rol, columna in (
+            ("estudiante", "id_estudiante"),
+            ("profesor", "id_profesor"),
+        ):
+            plantilla = _PLANTILLAS[(event, rol, sesiones > 1)]
+            if all(campos[c] for c in plantilla.requiere):
+                descripcion = plantilla.completa(**campos)
+            else:
+                descripcion = plantilla.respaldo(**campos)
+            filas.append(
+                {
+                    "id_destinatario": tutoria[columna],
+                    "id_estudiante": tutoria[columna] if rol == "estudiante" else None,
+                    "id_profesor": tutoria[columna] if rol == "profesor" else None,
+                    "titulo": plantilla.titulo,
+                    "descripcion": descripcion,
+                    "tipo": event.value,
+                    "leida": False,
+                }
+            )
+        return filas
+
+    @staticmethod
+    def payload(row) -> dict:
+        return {
+            "type": "notification",
+            "id": row.id_notificacion,
+            "titulo": row.titulo,
+            "descripcion": row.descripcion,
+            "leida": row.leida,
+            "fecha_creacion": str(row.fecha_creacion),
+            "tipo": row.tipo,
+        }
+
+    @staticmethod
+    async def notify(
+        db: AsyncSession,
+        event: NotificationEvent,
+        tutorias: Sequence[dict],
+        sesiones: int = 1,
+        excluir: Collection[int] = (),
+    ) -> list:
+        """Guarda las notificaciones de todos los destinatarios y las envía.
+
+        Un único INSERT multi-fila con RETURNING (sin refresh por fila); el envío
+        por WebSocket se hace después del commit en una sola llamada agrupada.
+        Los usuarios de ``excluir`` no reciben notificación.
+        """
+        filas = [
+            fila
+            for tutoria in tutorias
+            for fila in NotificationService.render(event, tutoria, sesiones)
+            if fila["id_destinatario"] not in excluir
+        ]
+        if not filas:
+            return []
+        result = await db.execute(
+            insert(Notificacion).values(filas).returning(*_RETURNING)
+        )
+        rows = result.all()
+        await db.commit()
+        await manager.send_batch(
+            [(row.id_destinatario, NotificationService.payload(row)) for row in rows]
+        )
+        return rows
+
+    @staticmethod
+    async def list_since(
+        db: AsyncSession, user_id: int, since: int, limit: int
+    ) -> list:
+        """Notificaciones posteriores al cursor ``since`` en orden de creación."""
+        result = await db.execute(
+            select(*_RETURNING)
+            .where(
+                Notificacion.id_destinatario == user_id,
+                Notificacion.id_notificacion > since,
+            )
+            .order_by(Notificacion.id_notificacion)
+            .limit(limit)
+        )
+        return result.all()
+
+    @staticmethod
+    async def replay(client, since: int):
+        """Reenvía a un cliente recién conectado lo posterior a ``since``.
+
+        Lo usan el WebSocket (``?since=``) y SSE (``Last-Event-ID``). El cliente
+        debe haberse registrado con ``replay=True``.
+        """
+        from app.core.database import AsyncSessionLocal
+
+        limit = settings.ws_replay_limit
+        # La sesión se cierra antes de enviar para no retener la conexión del pool
+        async with AsyncSessionLocal() as session:
+            rows = await NotificationService.list_since(
+                session, client.user_id, since, limit + 1
+            )
+        truncated = len(rows) > limit
+        rows = rows[:limit]
+        # Si hay más de las que caben, el cliente debe recargar la bandeja completa
+        summary = {
+            "type": "replay",
+            "count": len(rows),
+            "truncated": truncated,
+            "last_id": rows[-1].id_notificacion if rows else since,
+        }
+        await manager.finish_replay(
+            client, [NotificationService.payload(row) for row in rows], summary
+        )
@@ -1,3 +1,4 @@
+from sqlalchemy import lambda_stmt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -12,9 +13,19 @@ class RoleService:
 
     @staticmethod
     async def get_by_id(db: AsyncSession, role_id: int):
-        result = await db.execute(select(Role).where(Role.id_rol == role_id))
+        # lambda_stmt: la construcción y la clave de caché se calculan una sola vez
+        result = await db.execute(
+            lambda_stmt(lambda: select(Role).where(Role.id_rol == role_id))
+        )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_by_nombre(db: AsyncSession, nombre: str):
+        result = await db.execute(
+            lambda_stmt(lambda: select(Role).where(Role.nombre_rol == nombre))
+        )
+        return result.scalars().first()
+
     @staticmethod
     async def create(db: AsyncSession, nombre_rol: str):
         db_role = Role(nombre_rol=nombre_rol)
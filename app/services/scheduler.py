@@ -0,0 +1,49 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Tareas periódicas en segundo plano ligadas al ciclo de vida de la app.
+
+    Cada worker ejecuta sus propias tareas; las que no deben correr en paralelo
+    entre workers se coordinan con un advisory lock de Postgres.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: list[tuple[str, float, Callable[[], Awaitable[None]]]] = []
+        self._tasks: list[asyncio.Task] = []
+
+    def every(self, seconds: float, fn: Callable[[], Awaitable[None]], name: str):
+        self._jobs.append((name, seconds, fn))
+
+    def start(self):
+        for name, seconds, fn in self._jobs:
+            self._tasks.append(
+                asyncio.create_task(self._loop(name, seconds, fn), name=name)
+            )
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+        self._jobs.clear()
+
+    @staticmethod
+    async def _loop(name: str, seconds: float, fn):
+        while True:
+            await asyncio.sleep(seconds)
+            try:
+                await fn()
+            except Exception:
+                # Un fallo puntual no debe matar la tarea periódica
+                logger.exception("Fallo en la tarea programada %s", name)
+
+
+scheduler = Scheduler()
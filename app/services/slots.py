@@ -0,0 +1,252 @@
+"""Inventario de slots reservables.
+
+Las franjas semanales de ``DisponibilidadDocente`` se expanden en filas de
+``SlotsDisponibles`` (una por horario concreto de ``slot_duracion_minutos``) para
+las próximas ``slots_horizonte_semanas`` semanas, en la zona horaria
+``zona_horaria``. Así:
+
+- reservar es un único UPDATE condicional sobre el slot (``id_tutoria IS NULL``)
+  que inserta la tutoría en la misma sentencia;
+- listar horarios libres es un escaneo de rango sobre un índice parcial.
+
+El inventario se resincroniza al cambiar una franja y ``refresh`` (tarea del
+scheduler) borra los slots pasados y extiende el horizonte.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import (
+    ARRAY,
+    Integer,
+    any_,
+    bindparam,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.models.slots import SlotDisponible
+from app.models.tutorias import Tutoria
+from app.utils.date_utils import DIAS_SEMANA
+
+_DIAS = "ARRAY[" + ", ".join(f"'{d}'" for d in DIAS_SEMANA) + "]"
+
+# Expande franjas en slots futuros. Un slot que ya se solapa con una tutoría activa
+# del profesor nace ocupado por ella.
+_GENERAR = text(f"""
+    INSERT INTO "SlotsDisponibles"
+        (id_disponibilidad, id_profesor, id_asignatura, inicio, fin, id_tutoria)
+    SELECT d.id_disponibilidad, d.id_profesor, d.id_asignatura, s.inicio,
+           s.inicio + make_interval(mins => :duracion),
+           (SELECT t.id_tutoria FROM "Tutorias" t
+             WHERE t.id_profesor = d.id_profesor
+               AND t.estado IN ('SOLICITADA', 'CONFIRMADA')
+               AND t.fecha_hora_inicio < s.inicio + make_interval(mins => :duracion)
+               AND t.fecha_hora_fin > s.inicio
+             LIMIT 1)
+    FROM "DisponibilidadDocente" d
+    CROSS JOIN generate_series(
+        (now() AT TIME ZONE :tz)::date::timestamp,
+        (now() AT TIME ZONE :tz)::date::timestamp + make_interval(days => :dias),
+        interval '1 day'
+    ) AS f(dia)
+    CROSS JOIN LATERAL generate_series(
+        (f.dia + d.hora_inicio) AT TIME ZONE :tz,
+        (f.dia + d.hora_fin - make_interval(mins => :duracion)) AT TIME ZONE :tz,
+        make_interval(mins => :duracion)
+    ) AS s(inicio)
+    WHERE array_position(
+            {_DIAS}, translate(lower(trim(d.dia_semana)), 'áéíóú', 'aeiou')
+          ) = extract(isodow FROM f.dia)
+      AND s.inicio > now()
+      AND (CAST(:ids AS integer[]) IS NULL
+           OR d.id_disponibilidad = ANY(CAST(:ids AS integer[])))
+    ON CONFLICT (id_disponibilidad, inicio) DO NOTHING
+    """)
+
+
+def _parametros(ids: list[int] | None) -> dict:
+    return {
+        "duracion": settings.slot_duracion_minutos,
+        "tz": settings.zona_horaria,
+        "dias": settings.slots_horizonte_semanas * 7,
+        "ids": ids,
+    }
+
+
+class SlotService:
+    LOCK_ID = 7_401_048
+
+    @staticmethod
+    async def sync(db: AsyncSession, *ids_disponibilidad: int):
+        """Regenera los slots libres de las franjas tras crearlas o modificarlas.
+
+        Los slots ya reservados se conservan; se confirma con la transacción del
+        llamador.
+        """
+        ids = list(ids_disponibilidad)
+        await db.execute(
+            delete(SlotDisponible).where(
+                SlotDisponible.id_disponibilidad.in_(ids),
+                SlotDisponible.id_tutoria.is_(None),
+            )
+        )
+        await db.execute(_GENERAR, _parametros(ids))
+
+    @staticmethod
+    async def refresh():
+        from app.core.database import engine
+
+        async with engine.connect() as conn:
+            locked = (
+                await conn.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:id)"),
+                    {"id": SlotService.LOCK_ID},
+                )
+            ).scalar_one()
+            if not locked:
+                await conn.rollback()
+                return
+            await conn.execute(
+                delete(SlotDisponible).where(SlotDisponible.fin < func.now())
+            )
+            await conn.execute(_GENERAR, _parametros(None))
+            await conn.commit()
+
+    @staticmethod
+    async def libres(
+        db: AsyncSession,
+        id_asignatura: int,
+        desde: datetime,
+        hasta: datetime,
+        id_profesor: int | None = None,
+        limit: int = 100,
+    ):
+        stmt = select(
+            SlotDisponible.id_slot,
+            SlotDisponible.id_profesor,
+            SlotDisponible.id_asignatura,
+            SlotDisponible.inicio,
+            SlotDisponible.fin,
+        ).where(
+            SlotDisponible.id_asignatura == id_asignatura,
+            SlotDisponible.id_tutoria.is_(None),
+            SlotDisponible.inicio >= desde,
+            SlotDisponible.inicio < hasta,
+            SlotDisponible.inicio > func.now(),
+        )
+        if id_profesor is not None:
+            stmt = stmt.where(SlotDisponible.id_profesor == id_profesor)
+        result = await db.execute(
+            stmt.order_by(SlotDisponible.inicio, SlotDisponible.id_profesor).limit(
+                limit
+            )
+        )
+        return result.mappings().all()
+
+    @staticmethod
+    def reservar_stmt(id_slot: int, id_estudiante: int, modalidad: str):
+        """INSERT de la tutoría alimentado por el UPDATE condicional del slot.
+
+        El slot toma el id de la tutoría con ``nextval`` y la tutoría se inserta
+        desde el RETURNING del UPDATE; si el slot ya no está libre (o el estudiante
+        tiene otra tutoría a esa hora) no se inserta nada.
+        """
+        otra = aliased(Tutoria)
+        secuencia = func.pg_get_serial_sequence('"Tutorias"', "id_tutoria")
+        reservado = (
+            update(SlotDisponible)
+            .where(
+                SlotDisponible.id_slot == id_slot,
+                SlotDisponible.id_tutoria.is_(None),
+                SlotDisponible.inicio > func.now(),
+                ~exists().where(
+                    otra.id_estudiante == id_estudiante,
+                    otra.estado.in_(
+                        [literal_column("'SOLICITADA'"), literal_column("'CONFIRMADA'")]
+                    ),
+                    otra.fecha_hora_inicio < SlotDisponible.fin,
+                    otra.fecha_hora_fin > SlotDisponible.inicio,
+                ),
+            )
+            .values(id_tutoria=func.nextval(secuencia))
+            .returning(
+                SlotDisponible.id_tutoria,
+                SlotDisponible.id_profesor,
+                SlotDisponible.id_asignatura,
+                SlotDisponible.inicio,
+                SlotDisponible.fin,
+            )
+            .cte("reservado")
+        )
+        return insert(Tutoria).from_select(
+            [
+                "id_tutoria",
+                "id_estudiante",
+                "id_profesor",
+                "id_asignatura",
+                "fecha_hora_inicio",
+                "fecha_hora_fin",
+                "modalidad",
+            ],
+            select(
+                reservado.c.id_tutoria,
+                literal(id_estudiante),
+                reservado.c.id_profesor,
+                reservado.c.id_asignatura,
+                reservado.c.inicio,
+                reservado.c.fin,
+                literal(modalidad),
+            ),
+        )
+
+    @staticmethod
+    async def ocupar(
+        db: AsyncSession, id_tutoria: int, id_profesor: int, inicio, fin
+    ) -> None:
+        """Marca como ocupados los slots libres del profesor que se solapan."""
+        await db.execute(
+            update(SlotDisponible)
+            .where(
+                SlotDisponible.id_profesor == id_profesor,
+                SlotDisponible.id_tutoria.is_(None),
+                SlotDisponible.inicio < fin,
+                SlotDisponible.fin > inicio,
+            )
+            .values(id_tutoria=id_tutoria)
+        )
+
+    @staticmethod
+    async def ocupar_tutorias(db: AsyncSession, ids_tutoria: list[int]) -> None:
+        """Como ``ocupar`` para varias tutorías ya insertadas, en un solo UPDATE."""
+        if not ids_tutoria:
+            return
+        await db.execute(
+            update(SlotDisponible)
+            .where(
+                Tutoria.id_tutoria
+                == any_(bindparam("ids", ids_tutoria, type_=ARRAY(Integer))),
+                SlotDisponible.id_profesor == Tutoria.id_profesor,
+                SlotDisponible.id_tutoria.is_(None),
+                SlotDisponible.inicio < Tutoria.fecha_hora_fin,
+                SlotDisponible.fin > Tutoria.fecha_hora_inicio,
+            )
+            .values(id_tutoria=Tutoria.id_tutoria)
+        )
+
+    @staticmethod
+    async def liberar(db: AsyncSession, id_tutoria: int) -> None:
+        await db.execute(
+            update(SlotDisponible)
+            .where(SlotDisponible.id_tutoria == id_tutoria)
+            .values(id_tutoria=None)
+        )
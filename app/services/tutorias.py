@@ -1,199 +1,408 @@
-from datetime import datetime, timezone
+import base64
+import hashlib
+import hmac
+import json
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import and_, or_
+from sqlalchemy import BigInteger, Text, and_, func, insert, lambda_stmt, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import aliased
 
+from app.core.config import settings
 from app.models.asignaturas import Asignatura
 from app.models.profesor_asignatura import ProfesorAsignatura
 from app.models.disponibilidad import DisponibilidadDocente
-from app.models.tutorias import Tutoria
+from app.models.tutorias import ACTIVA, VIGENTE, EstadoTutoria, Tutoria
+from app.models.tutorias_eliminadas import TutoriaEliminada
 from app.models.users import User
+from app.repositories.tutorias import TutoriaRepository
+from app.services.lista_espera import ListaEsperaService
+from app.services.slots import SlotService
+from app.utils.date_utils import a_hora_local, weekday_de_dia
+
+# Marca de sincronización: xmin del snapshot actual. Toda transacción que no se ve
+# en una consulta posterior tiene xid >= esta marca (seguía en curso o empezó
+# después), así que ``cambio_xid >= marca`` no pierde cambios que confirman tarde.
+# Las que confirmaron entre xmin y la consulta se re-entregan (el cliente hace upsert).
+SYNC_MARCA = (
+    func.pg_snapshot_xmin(func.pg_current_snapshot()).cast(Text).cast(BigInteger)
+)
+
+# Columnas devueltas por las mutaciones (UPDATE/DELETE ... RETURNING)
+_COLUMNAS = (
+    "id_tutoria",
+    "id_estudiante",
+    "id_profesor",
+    "id_asignatura",
+    "fecha_hora_inicio",
+    "fecha_hora_fin",
+    "modalidad",
+    "updated_at",
+    "version",
+    "estado",
+)
+
+
+class VersionConflictError(Exception):
+    """La tutoría fue modificada por otra petición (versión distinta a la esperada)."""
+
+    def __init__(self, version_actual: int):
+        super().__init__(f"La tutoría cambió (versión actual {version_actual})")
+        self.version_actual = version_actual
 
 
 class TutoriaService:
     @staticmethod
     async def get_all(db: AsyncSession):
-        # Fetch tutorias with profesor, estudiante and asignatura names in a single query
+        return await TutoriaRepository.find(db, VIGENTE)
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, tutoria_id: int):
+        return await TutoriaRepository.get_by_id(db, tutoria_id)
+
+    @staticmethod
+    def _enriched_dml(dml):
+        """Envuelve un INSERT/UPDATE/DELETE ... RETURNING en un SELECT que enriquece la fila.
+
+        El DML va en un CTE y se une con profesor, estudiante y asignatura, así una
+        mutación cuesta un único viaje a la base de datos.
+        """
+        cambio = dml.returning(*[getattr(Tutoria, c) for c in _COLUMNAS]).cte("cambio")
         P = aliased(User)  # Profesor
         E = aliased(User)  # Estudiante
         stmt = (
             select(
-                Tutoria,
-                P.nombre.label("p_nombre"),
-                P.apellido.label("p_apellido"),
-                E.nombre.label("e_nombre"),
-                E.apellido.label("e_apellido"),
-                Asignatura.nombre_asignatura.label("asig_nombre"),
+                cambio,
+                (P.nombre + " " + P.apellido).label("profesor"),
+                (E.nombre + " " + E.apellido).label("estudiante"),
+                Asignatura.nombre_asignatura.label("titulo"),
             )
-            .join(P, Tutoria.id_profesor == P.id_usuario)
-            .join(E, Tutoria.id_estudiante == E.id_usuario)
-            .join(Asignatura, Tutoria.id_asignatura == Asignatura.id_asignatura)
+            .outerjoin(P, cambio.c.id_profesor == P.id_usuario)
+            .outerjoin(E, cambio.c.id_estudiante == E.id_usuario)
+            .outerjoin(Asignatura, cambio.c.id_asignatura == Asignatura.id_asignatura)
         )
-        result = await db.execute(stmt)
-        rows = result.all()
-        tutorias = []
-        for tutoria, p_nombre, p_apellido, e_nombre, e_apellido, asig_nombre in rows:
-            tutorias.append(
-                {
-                    "id_tutoria": tutoria.id_tutoria,
-                    "id_estudiante": tutoria.id_estudiante,
-                    "id_profesor": tutoria.id_profesor,
-                    "id_asignatura": tutoria.id_asignatura,
-                    "fecha_hora_inicio": tutoria.fecha_hora_inicio,
-                    "fecha_hora_fin": tutoria.fecha_hora_fin,
-                    "modalidad": tutoria.modalidad,
-                    "titulo": asig_nombre,
-                    "profesor": f"{p_nombre} {p_apellido}",
-                    "estudiante": f"{e_nombre} {e_apellido}",
-                }
-            )
-        return tutorias
+        return stmt, cambio
 
     @staticmethod
-    async def get_by_id(db: AsyncSession, tutoria_id: int):
+    async def _explicar_fallo(db: AsyncSession, tutoria_id: int, version):
+        """Tras un CAS sin filas, distingue 'no existe' de 'otra versión'."""
         result = await db.execute(
-            select(Tutoria).where(Tutoria.id_tutoria == tutoria_id)
+            select(Tutoria.version).where(Tutoria.id_tutoria == tutoria_id)
         )
-        tutoria = result.scalar_one_or_none()
-        if tutoria:
-            return await TutoriaService.enriched_tutoria(db, tutoria)
-        return None
+        actual = result.scalar_one_or_none()
+        if actual is not None and version is not None and actual != version:
+            raise VersionConflictError(actual)
 
     @staticmethod
-    async def create(db: AsyncSession, tutoria_in):
-        # Validate professor is assigned to asignatura
+    async def _validar_asignacion(
+        db: AsyncSession, id_profesor: int, id_asignatura: int
+    ):
         rel_result = await db.execute(
-            select(ProfesorAsignatura).where(
+            select(ProfesorAsignatura.id).where(
                 and_(
-                    ProfesorAsignatura.id_profesor == tutoria_in.id_profesor,
-                    ProfesorAsignatura.id_asignatura == tutoria_in.id_asignatura,
+                    ProfesorAsignatura.id_profesor == id_profesor,
+                    ProfesorAsignatura.id_asignatura == id_asignatura,
                 )
             )
         )
-        relation = rel_result.scalar_one_or_none()
-        if not relation:
+        if rel_result.scalar_one_or_none() is None:
             raise ValueError(
                 "El profesor no está asignado a la asignatura seleccionada"
             )
 
-        # Validate availability: find any disponibilidad record for weekday matching time window
-        inicio = tutoria_in.fecha_hora_inicio
-        fin = tutoria_in.fecha_hora_fin
-        # Ensure timezone aware comparisons simplified (convert to naive for weekday/time extraction)
-        local_inicio = inicio
-        local_fin = fin
-        dia_semana = local_inicio.strftime("%A").lower()  # e.g., monday
-        # Map English to Spanish stored maybe; handle both
-        traducciones = {
-            "monday": "lunes",
-            "tuesday": "martes",
-            "wednesday": "miercoles",
-            "thursday": "jueves",
-            "friday": "viernes",
-            "saturday": "sabado",
-            "sunday": "domingo",
-        }
-        dia_semana_es = traducciones.get(dia_semana, dia_semana)
-
-        disp_stmt = select(DisponibilidadDocente).where(
-            and_(
-                DisponibilidadDocente.id_profesor == tutoria_in.id_profesor,
-                DisponibilidadDocente.id_asignatura == tutoria_in.id_asignatura,
-                DisponibilidadDocente.dia_semana.ilike(dia_semana_es),
-                DisponibilidadDocente.hora_inicio <= local_inicio.time(),
-                DisponibilidadDocente.hora_fin >= local_fin.time(),
+    @staticmethod
+    async def _franjas(db: AsyncSession, id_profesor: int, id_asignatura: int):
+        result = await db.execute(
+            select(
+                DisponibilidadDocente.dia_semana,
+                DisponibilidadDocente.hora_inicio,
+                DisponibilidadDocente.hora_fin,
+            ).where(
+                DisponibilidadDocente.id_profesor == id_profesor,
+                DisponibilidadDocente.id_asignatura == id_asignatura,
             )
         )
-        disp_result = await db.execute(disp_stmt)
-        disponibilidad = disp_result.scalar_one_or_none()
-        if not disponibilidad:
-            raise ValueError("El profesor no tiene disponibilidad para ese horario")
+        return [
+            (weekday_de_dia(dia), hora_inicio, hora_fin)
+            for dia, hora_inicio, hora_fin in result.all()
+        ]
 
-        # Validate no overlapping tutoria for professor or student
-        overlap_stmt = select(Tutoria).where(
-            and_(
+    @staticmethod
+    def _cabe_en_franja(franjas, inicio: datetime, fin: datetime) -> bool:
+        # Las franjas son horas locales de la institución, igual que los slots
+        inicio, fin = a_hora_local(inicio), a_hora_local(fin)
+        return any(
+            wd == inicio.weekday()
+            and hora_inicio <= inicio.time()
+            and hora_fin >= fin.time()
+            for wd, hora_inicio, hora_fin in franjas
+        )
+
+    @staticmethod
+    def overlap_stmt(id_profesor: int, id_estudiante: int, inicio, fin):
+        """Primera tutoría activa del profesor o del estudiante que se solapa.
+
+        Es la consulta más frecuente al agendar: con ``lambda_stmt`` se construye y
+        compila una vez y los argumentos viajan como parámetros.
+        """
+        return lambda_stmt(
+            lambda: select(Tutoria.id_tutoria)
+            .where(
                 or_(
-                    Tutoria.id_profesor == tutoria_in.id_profesor,
-                    Tutoria.id_estudiante == tutoria_in.id_estudiante,
+                    Tutoria.id_profesor == id_profesor,
+                    Tutoria.id_estudiante == id_estudiante,
                 ),
                 Tutoria.fecha_hora_inicio < fin,
                 Tutoria.fecha_hora_fin > inicio,
+                ACTIVA,
+            )
+            .limit(1)
+        )
+
+    @staticmethod
+    async def create(db: AsyncSession, tutoria_in):
+        await TutoriaService._validar_asignacion(
+            db, tutoria_in.id_profesor, tutoria_in.id_asignatura
+        )
+
+        inicio = tutoria_in.fecha_hora_inicio
+        fin = tutoria_in.fecha_hora_fin
+        franjas = await TutoriaService._franjas(
+            db, tutoria_in.id_profesor, tutoria_in.id_asignatura
+        )
+        if not TutoriaService._cabe_en_franja(franjas, inicio, fin):
+            raise ValueError("El profesor no tiene disponibilidad para ese horario")
+
+        # Validate no overlapping tutoria for professor or student
+        overlap_result = await db.execute(
+            TutoriaService.overlap_stmt(
+                tutoria_in.id_profesor, tutoria_in.id_estudiante, inicio, fin
             )
         )
-        overlap_result = await db.execute(overlap_stmt)
         if overlap_result.scalar_one_or_none():
             raise ValueError(
                 "Existe una tutoría que se sobrepone en el horario indicado"
             )
 
-        db_tutoria = Tutoria(**tutoria_in.dict())
-        db.add(db_tutoria)
+        # INSERT ... RETURNING enriquecido: tras el commit no queda ninguna consulta
+        # pendiente que vuelva a tomar una conexión
+        stmt, _ = TutoriaService._enriched_dml(
+            insert(Tutoria).values(**tutoria_in.dict())
+        )
+        row = (await db.execute(stmt)).mappings().one()
+        await SlotService.ocupar(db, row["id_tutoria"], row["id_profesor"], inicio, fin)
         await db.commit()
-        await db.refresh(db_tutoria)
-        return await TutoriaService.enriched_tutoria(db, db_tutoria)
+        return dict(row)
 
     @staticmethod
-    async def delete(db: AsyncSession, tutoria_id: int):
-        tutoria = await TutoriaService.get_by_id(db, tutoria_id)
-        if tutoria:
-            # get_by_id returns enriched dict, need to fetch the actual model instance
-            result = await db.execute(
-                select(Tutoria).where(Tutoria.id_tutoria == tutoria_id)
+    async def create_batch(db: AsyncSession, recurrente_in):
+        """Agenda una serie de ocurrencias con las mismas reglas que `create`.
+
+        Valida todas las ocurrencias contra una única carga de franjas y de
+        tutorías existentes en la ventana, e inserta las válidas en una sola
+        transacción. Devuelve (tutorias_creadas, conflictos por ocurrencia).
+        """
+        await TutoriaService._validar_asignacion(
+            db, recurrente_in.id_profesor, recurrente_in.id_asignatura
+        )
+        paso = timedelta(days=recurrente_in.intervalo_dias)
+        ocurrencias = [
+            (
+                recurrente_in.fecha_hora_inicio + paso * k,
+                recurrente_in.fecha_hora_fin + paso * k,
             )
-            tutoria_obj = result.scalar_one_or_none()
-            if tutoria_obj:
-                await db.delete(tutoria_obj)
-                await db.commit()
-        return tutoria
+            for k in range(recurrente_in.repeticiones)
+        ]
+        franjas = await TutoriaService._franjas(
+            db, recurrente_in.id_profesor, recurrente_in.id_asignatura
+        )
+        result = await db.execute(
+            select(Tutoria.fecha_hora_inicio, Tutoria.fecha_hora_fin).where(
+                or_(
+                    Tutoria.id_profesor == recurrente_in.id_profesor,
+                    Tutoria.id_estudiante == recurrente_in.id_estudiante,
+                ),
+                Tutoria.fecha_hora_inicio < ocurrencias[-1][1],
+                Tutoria.fecha_hora_fin > ocurrencias[0][0],
+                ACTIVA,
+            )
+        )
+        ocupados = list(result.all())
+
+        aceptadas = []
+        conflictos = []
+        for inicio, fin in ocurrencias:
+            if not TutoriaService._cabe_en_franja(franjas, inicio, fin):
+                motivo = "El profesor no tiene disponibilidad para ese horario"
+            elif any(o_ini < fin and o_fin > inicio for o_ini, o_fin in ocupados):
+                motivo = "Existe una tutoría que se sobrepone en el horario indicado"
+            else:
+                aceptadas.append((inicio, fin))
+                ocupados.append((inicio, fin))
+                continue
+            conflictos.append(
+                {"fecha_hora_inicio": inicio, "fecha_hora_fin": fin, "motivo": motivo}
+            )
+
+        if not aceptadas:
+            return [], conflictos
+
+        base = recurrente_in.dict(
+            include={"id_estudiante", "id_profesor", "id_asignatura", "modalidad"}
+        )
+        # Un solo INSERT multi-fila enriquecido: vuelve con los nombres, sin re-leer
+        stmt, cambio = TutoriaService._enriched_dml(
+            insert(Tutoria).values(
+                [
+                    {**base, "fecha_hora_inicio": inicio, "fecha_hora_fin": fin}
+                    for inicio, fin in aceptadas
+                ]
+            )
+        )
+        result = await db.execute(stmt.order_by(cambio.c.fecha_hora_inicio))
+        creadas = [dict(row) for row in result.mappings().all()]
+        await SlotService.ocupar_tutorias(db, [t["id_tutoria"] for t in creadas])
+        await db.commit()
+        return creadas, conflictos
 
     @staticmethod
-    async def get_by_estudiante(db: AsyncSession, id_estudiante: int):
-        result = await db.execute(
-            select(Tutoria).where(Tutoria.id_estudiante == id_estudiante)
+    async def cancel(db: AsyncSession, tutoria_id: int, version: int | None = None):
+        """Cancela una tutoría activa con un único UPDATE ... RETURNING enriquecido.
+
+        La fila se conserva para el historial; las consultas de agenda la ignoran
+        y los índices parciales sobre tutorías activas dejan de incluirla. El
+        horario liberado se ofrece a la lista de espera en la misma transacción.
+        Devuelve (tutoría cancelada, tutoría promovida o None).
+        """
+        conds = [Tutoria.id_tutoria == tutoria_id, ACTIVA]
+        if version is not None:
+            conds.append(Tutoria.version == version)
+        stmt, _ = TutoriaService._enriched_dml(
+            update(Tutoria)
+            .where(*conds)
+            .values(
+                estado=EstadoTutoria.CANCELADA.value,
+                fecha_cancelacion=func.now(),
+                version=Tutoria.version + 1,
+                updated_at=func.now(),
+            )
+        )
+        result = await db.execute(stmt)
+        row = result.mappings().first()
+        if row is None:
+            await db.rollback()
+            await TutoriaService._explicar_fallo(db, tutoria_id, version)
+            return None, None
+        await SlotService.liberar(db, tutoria_id)
+        promovida = await TutoriaService._promover(
+            db,
+            row["id_profesor"],
+            row["id_asignatura"],
+            row["fecha_hora_inicio"],
+            row["fecha_hora_fin"],
+            row["id_estudiante"],
         )
-        tutorias = result.scalars().all()
-        return [await TutoriaService.enriched_tutoria(db, t) for t in tutorias]
+        await db.commit()
+        return dict(row), promovida
 
     @staticmethod
-    async def get_by_profesor(db: AsyncSession, id_profesor: int):
-        result = await db.execute(
-            select(Tutoria).where(Tutoria.id_profesor == id_profesor)
+    async def _promover(
+        db: AsyncSession,
+        id_profesor: int,
+        id_asignatura: int,
+        inicio: datetime,
+        fin: datetime,
+        id_estudiante_anterior: int,
+    ):
+        """Agenda al primero de la lista de espera en un horario recién liberado.
+
+        Se ejecuta dentro de la transacción que libera el horario; el llamador
+        confirma y notifica.
+        """
+        dml = ListaEsperaService.promover_stmt(
+            id_profesor, id_asignatura, inicio, fin, id_estudiante_anterior
         )
-        tutorias = result.scalars().all()
-        return [await TutoriaService.enriched_tutoria(db, t) for t in tutorias]
+        if dml is None:
+            return None
+        stmt, _ = TutoriaService._enriched_dml(dml)
+        row = (await db.execute(stmt)).mappings().first()
+        if row is None:
+            return None
+        await SlotService.ocupar(db, row["id_tutoria"], id_profesor, inicio, fin)
+        return dict(row)
 
     @staticmethod
-    async def enriched_tutoria(db: AsyncSession, tutoria: Tutoria):
-        # Busca nombres de profesor y estudiante, y nombre de la asignatura
-        result = await db.execute(
-            select(User).where(User.id_usuario == tutoria.id_profesor)
+    async def reservar_slot(
+        db: AsyncSession, id_slot: int, id_estudiante: int, modalidad: str
+    ):
+        """Reserva un slot del inventario en un solo viaje a la base de datos.
+
+        No hace falta validar franja ni solapes del profesor: el slot sólo existe
+        si cae en una franja y sólo está libre si nadie lo ocupa. Devuelve None si
+        el slot ya no está disponible.
+        """
+        stmt, _ = TutoriaService._enriched_dml(
+            SlotService.reservar_stmt(id_slot, id_estudiante, modalidad)
         )
-        profesor = result.scalar_one_or_none()
-        result = await db.execute(
-            select(User).where(User.id_usuario == tutoria.id_estudiante)
+        row = (await db.execute(stmt)).mappings().first()
+        if row is None:
+            await db.rollback()
+            return None
+        # Otros slots del profesor que se solapan (franjas de otras asignaturas)
+        await SlotService.ocupar(
+            db,
+            row["id_tutoria"],
+            row["id_profesor"],
+            row["fecha_hora_inicio"],
+            row["fecha_hora_fin"],
         )
-        estudiante = result.scalar_one_or_none()
-        result = await db.execute(
-            select(Asignatura).where(Asignatura.id_asignatura == tutoria.id_asignatura)
+        await db.commit()
+        return dict(row)
+
+    @staticmethod
+    async def completar_vencidas():
+        """Marca como completadas las tutorías confirmadas que ya terminaron."""
+        from app.core.database import engine
+
+        async with engine.begin() as conn:
+            await conn.execute(
+                update(Tutoria)
+                .where(
+                    Tutoria.estado == EstadoTutoria.CONFIRMADA.value,
+                    Tutoria.fecha_hora_fin < func.now(),
+                )
+                .values(estado=EstadoTutoria.COMPLETADA.value, updated_at=func.now())
+            )
+
+    @staticmethod
+    async def get_by_estudiante(db: AsyncSession, id_estudiante: int):
+        return await TutoriaRepository.find(
+            db, Tutoria.id_estudiante == id_estudiante, VIGENTE
         )
-        asignatura = result.scalar_one_or_none()
 
-        return {
-            "id_tutoria": tutoria.id_tutoria,
-            "id_estudiante": tutoria.id_estudiante,
-            "id_profesor": tutoria.id_profesor,
-            "id_asignatura": tutoria.id_asignatura,
-            "fecha_hora_inicio": tutoria.fecha_hora_inicio,
-            "fecha_hora_fin": tutoria.fecha_hora_fin,
-            "modalidad": tutoria.modalidad,
-            "titulo": asignatura.nombre_asignatura if asignatura else None,
-            "profesor": f"{profesor.nombre} {profesor.apellido}" if profesor else None,
-            "estudiante": (
-                f"{estudiante.nombre} {estudiante.apellido}" if estudiante else None
+    @staticmethod
+    async def get_by_profesor(db: AsyncSession, id_profesor: int):
+        return await TutoriaRepository.find(
+            db, Tutoria.id_profesor == id_profesor, VIGENTE
+        )
+
+    @staticmethod
+    def _range_filter(usuario_id: int, from_dt: datetime, to_dt: datetime):
+        # Un OR de dos rangos indexados: Postgres lo resuelve con un BitmapOr sobre
+        # ix_tutorias_estudiante_inicio / ix_tutorias_profesor_inicio
+        return or_(
+            and_(
+                Tutoria.id_estudiante == usuario_id,
+                Tutoria.fecha_hora_inicio >= from_dt,
+                Tutoria.fecha_hora_inicio < to_dt,
             ),
-        }
+            and_(
+                Tutoria.id_profesor == usuario_id,
+                Tutoria.fecha_hora_inicio >= from_dt,
+                Tutoria.fecha_hora_inicio < to_dt,
+            ),
+        )
 
     @staticmethod
     async def get_by_user_and_range(
@@ -203,38 +412,157 @@ class TutoriaService:
         from_dt = datetime.fromisoformat(from_date)
         to_dt = datetime.fromisoformat(to_date)
 
-        stmt = select(Tutoria).where(
-            and_(
+        return await TutoriaRepository.find(
+            db,
+            TutoriaService._range_filter(usuario_id, from_dt, to_dt),
+            Tutoria.fecha_hora_fin <= to_dt,
+            VIGENTE,
+            order_by=Tutoria.fecha_hora_inicio,
+        )
+
+    @staticmethod
+    def _firma_sync(raw: bytes) -> bytes:
+        return hmac.new(settings.secret_key.encode(), raw, hashlib.sha256).digest()
+
+    @staticmethod
+    def encode_sync_token(usuario_id: int, marca: int) -> str:
+        """Token opaco ``datos.firma`` firmado con SECRET_KEY (HMAC-SHA256)."""
+        raw = json.dumps({"u": usuario_id, "x": marca}, separators=(",", ":")).encode()
+        return ".".join(
+            base64.urlsafe_b64encode(parte).decode().rstrip("=")
+            for parte in (raw, TutoriaService._firma_sync(raw))
+        )
+
+    @staticmethod
+    def decode_sync_token(usuario_id: int, token: str) -> int:
+        try:
+            raw, firma = (
+                base64.urlsafe_b64decode(parte + "=" * (-len(parte) % 4))
+                for parte in token.split(".")
+            )
+        except ValueError:
+            raise ValueError("sync_token inválido")
+        if not hmac.compare_digest(firma, TutoriaService._firma_sync(raw)):
+            raise ValueError("sync_token inválido")
+        data = json.loads(raw)
+        if data.get("u") != usuario_id:
+            raise ValueError("sync_token no corresponde al usuario")
+        return data["x"]
+
+    @staticmethod
+    async def get_calendar_changes(
+        db: AsyncSession,
+        usuario_id: int,
+        from_date: str,
+        to_date: str,
+        sync_token: str | None = None,
+    ):
+        """Calendario con sincronización incremental.
+
+        Sin token devuelve el rango completo; con token devuelve sólo las tutorías
+        creadas o modificadas y los ids cancelados o borrados desde la respuesta
+        anterior. En modo
+        incremental los cambios no se filtran por rango, para que el cliente también
+        se entere de tutorías reprogramadas fuera del rango que tiene en pantalla.
+        """
+        # La marca se toma antes de leer: lo que la lectura no vea queda por encima
+        marca = (await db.execute(select(SYNC_MARCA))).scalar_one()
+        nuevo_token = TutoriaService.encode_sync_token(usuario_id, marca)
+
+        if not sync_token:
+            tutorias = await TutoriaService.get_by_user_and_range(
+                db, usuario_id, from_date, to_date
+            )
+            return {
+                "tutorias": tutorias,
+                "eliminadas": [],
+                "sync_token": nuevo_token,
+                "completo": True,
+            }
+
+        desde = TutoriaService.decode_sync_token(usuario_id, sync_token)
+        participa = or_(
+            Tutoria.id_estudiante == usuario_id, Tutoria.id_profesor == usuario_id
+        )
+        cambios = await TutoriaRepository.find(
+            db, participa, Tutoria.cambio_xid >= desde, order_by=Tutoria.updated_at
+        )
+        # Para el cliente una tutoría cancelada desaparece del calendario
+        tutorias = [t for t in cambios if t.estado != EstadoTutoria.CANCELADA]
+        canceladas = [
+            t.id_tutoria for t in cambios if t.estado == EstadoTutoria.CANCELADA
+        ]
+        result = await db.execute(
+            select(TutoriaEliminada.id_tutoria).where(
                 or_(
-                    Tutoria.id_estudiante == usuario_id,
-                    Tutoria.id_profesor == usuario_id,
+                    TutoriaEliminada.id_estudiante == usuario_id,
+                    TutoriaEliminada.id_profesor == usuario_id,
                 ),
-                Tutoria.fecha_hora_inicio >= from_dt,
-                Tutoria.fecha_hora_fin <= to_dt,
+                TutoriaEliminada.cambio_xid >= desde,
             )
         )
-        result = await db.execute(stmt)
-        tutorias = result.scalars().all()
-        return [await TutoriaService.enriched_tutoria(db, t) for t in tutorias]
+        return {
+            "tutorias": tutorias,
+            "eliminadas": canceladas + list(result.scalars().all()),
+            "sync_token": nuevo_token,
+            "completo": False,
+        }
 
     @staticmethod
     async def reschedule(db: AsyncSession, tutoria_id: int, reschedule_in):
-        result = await db.execute(
-            select(Tutoria).where(Tutoria.id_tutoria == tutoria_id)
+        """Devuelve (tutoría reprogramada, tutoría promovida al horario anterior o None)."""
+        # Compare-and-swap: sólo se actualiza si la tutoría sigue a más de 24h
+        # y, si el cliente envía la versión que leyó, si nadie la cambió entretanto
+        limite = datetime.now(timezone.utc) + timedelta(hours=24)
+        conds = [
+            Tutoria.id_tutoria == tutoria_id,
+            Tutoria.fecha_hora_inicio >= limite,
+            ACTIVA,
+        ]
+        version = getattr(reschedule_in, "version", None)
+        if version is not None:
+            conds.append(Tutoria.version == version)
+        # Autounión: RETURNING de `anterior` devuelve el horario previo al UPDATE,
+        # que es el que queda libre para la lista de espera
+        anterior = aliased(Tutoria)
+        stmt, _ = TutoriaService._enriched_dml(
+            update(Tutoria)
+            .where(*conds, anterior.id_tutoria == Tutoria.id_tutoria)
+            .values(
+                fecha_hora_inicio=reschedule_in.fecha_hora_inicio,
+                fecha_hora_fin=reschedule_in.fecha_hora_fin,
+                version=Tutoria.version + 1,
+                updated_at=func.now(),
+            )
+            .returning(
+                anterior.fecha_hora_inicio.label("inicio_anterior"),
+                anterior.fecha_hora_fin.label("fin_anterior"),
+            ),
+        )
+        result = await db.execute(stmt)
+        row = result.mappings().first()
+        if row is None:
+            await db.rollback()
+            await TutoriaService._explicar_fallo(db, tutoria_id, version)
+            return None, None
+        tutoria = dict(row)
+        inicio_anterior = tutoria.pop("inicio_anterior")
+        fin_anterior = tutoria.pop("fin_anterior")
+        await SlotService.liberar(db, tutoria_id)
+        await SlotService.ocupar(
+            db,
+            tutoria_id,
+            row["id_profesor"],
+            row["fecha_hora_inicio"],
+            row["fecha_hora_fin"],
+        )
+        promovida = await TutoriaService._promover(
+            db,
+            row["id_profesor"],
+            row["id_asignatura"],
+            inicio_anterior,
+            fin_anterior,
+            row["id_estudiante"],
         )
-        tutoria = result.scalar_one_or_none()
-        if not tutoria:
-            return None
-        now = datetime.now(timezone.utc)
-        tutoria_fecha_inicio = tutoria.fecha_hora_inicio
-        if tutoria_fecha_inicio.tzinfo is None:
-            tutoria_fecha_inicio = tutoria_fecha_inicio.replace(tzinfo=timezone.utc)
-        # Only allow reschedule if tutoria is more than 24h away
-        if (tutoria_fecha_inicio - now).total_seconds() < 24 * 3600:
-            # Not allowed to reschedule if tutoria is less than 24h away
-            return None
-        tutoria.fecha_hora_inicio = reschedule_in.fecha_hora_inicio
-        tutoria.fecha_hora_fin = reschedule_in.fecha_hora_fin
         await db.commit()
-        await db.refresh(tutoria)
-        return await TutoriaService.enriched_tutoria(db, tutoria)
+        return tutoria, promovida
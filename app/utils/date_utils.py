@@ -0,0 +1,44 @@
+import unicodedata
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+
+# Nombres de día tal como se guardan en DisponibilidadDocente.dia_semana (0=lunes)
+DIAS_SEMANA = ["lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo"]
+
+
+def normaliza_dia(d: str) -> str:
+    return (
+        unicodedata.normalize("NFKD", d)
+        .encode("ascii", "ignore")
+        .decode("ascii")
+        .lower()
+        .strip()
+    )
+
+
+def dia_semana_es(fecha: date | datetime) -> str:
+    return DIAS_SEMANA[fecha.weekday()]
+
+
+def weekday_de_dia(dia: str) -> int | None:
+    """Número de día (0=lunes) para un nombre en español, tolerando tildes y mayúsculas."""
+    try:
+        return DIAS_SEMANA.index(normaliza_dia(dia))
+    except ValueError:
+        return None
+
+
+def zona_local() -> ZoneInfo:
+    return ZoneInfo(settings.zona_horaria)
+
+
+def a_hora_local(instante: datetime) -> datetime:
+    """Convierte a la zona horaria de la institución, en la que se definen las franjas.
+
+    Una fecha sin zona se interpreta como hora local de la institución.
+    """
+    if instante.tzinfo is None:
+        return instante.replace(tzinfo=zona_local())
+    return instante.astimezone(zona_local())
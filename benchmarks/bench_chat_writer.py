@@ -0,0 +1,92 @@
+"""Throughput del chat: ``ChatWriter`` en lote frente a un INSERT por mensaje.
+
+Envía ``-n`` mensajes con ``-c`` remitentes concurrentes contra ``DATABASE_URL``
+(con las migraciones aplicadas) en una tutoría existente, de dos formas:
+
+- ``directo``: cada mensaje abre su sesión, inserta y confirma;
+- ``lote``: cada mensaje pasa por ``chat_writer.submit``.
+
+Reporta mensajes por segundo y latencia p50/p95 por mensaje. Los mensajes de
+prueba se borran al terminar.
+
+    python benchmarks/bench_chat_writer.py --tutoria 1 --remitente 2 [-n 5000] [-c 200]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.models.chat import MensajeChat  # noqa: E402
+from app.services.chat import chat_writer  # noqa: E402
+
+
+async def _directo(mensaje: dict):
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(MensajeChat).values(**mensaje))
+        await session.commit()
+
+
+async def _lote(mensaje: dict):
+    # Sin destinatarios conectados el reparto por WebSocket no cuesta nada
+    await chat_writer.submit(mensaje, ())
+
+
+async def _correr(nombre, enviar, args, marca: str):
+    pendientes = iter(range(args.n))
+    latencias = []
+
+    async def remitente():
+        for i in pendientes:
+            mensaje = {
+                "id_tutoria": args.tutoria,
+                "id_remitente": args.remitente,
+                "contenido": f"{marca} {i}",
+            }
+            inicio = time.perf_counter()
+            await enviar(mensaje)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(remitente() for _ in range(args.c)))
+    total = time.perf_counter() - inicio
+    latencias.sort()
+    p95 = latencias[int(len(latencias) * 0.95) - 1]
+    print(
+        f"{nombre:8} {args.n / total:10.0f} msg/s"
+        f"  p50 {statistics.median(latencias):7.2f} ms  p95 {p95:7.2f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tutoria", type=int, required=True)
+    parser.add_argument("--remitente", type=int, required=True)
+    parser.add_argument("-n", type=int, default=5000, help="mensajes por modo")
+    parser.add_argument("-c", type=int, default=200, help="remitentes concurrentes")
+    args = parser.parse_args()
+
+    marca = f"bench-{uuid.uuid4()}"
+    try:
+        await _correr("directo", _directo, args, marca)
+        await _correr("lote", _lote, args, marca)
+    finally:
+        await chat_writer.stop()
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                delete(MensajeChat).where(MensajeChat.contenido.startswith(marca))
+            )
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
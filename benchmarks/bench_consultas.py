@@ -0,0 +1,159 @@
+"""Microbenchmark por consulta de las sentencias con ``lambda_stmt``.
+
+Para cada consulta mide, por llamada:
+
+- ``construir``: armar la sentencia y obtener su clave de caché (lo que se paga en
+  cada petición);
+- ``compilar``: compilar a SQL de PostgreSQL con la caché de compilación del
+  engine, como hace ``execute``;
+- ``sin_lambda``: construir y compilar la misma consulta como ``select`` normal,
+  sin caché, que es el costo que ``lambda_stmt`` evita.
+
+Con ``--db`` además ejecuta cada consulta contra ``DATABASE_URL`` y reporta la
+latencia p50/p95 de ida y vuelta.
+
+    python benchmarks/bench_consultas.py [-n 20000] [--db]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import false, func, or_, select  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+
+from app.models.notificacion import Notificacion  # noqa: E402
+from app.models.tutorias import Tutoria  # noqa: E402
+from app.repositories.notificaciones import NotificacionRepository  # noqa: E402
+from app.services.tutorias import ACTIVA, TutoriaService  # noqa: E402
+
+INICIO = datetime(2026, 11, 2, 15, tzinfo=timezone.utc)
+
+
+def _overlap(i):
+    inicio = INICIO + timedelta(hours=i % 500)
+    return TutoriaService.overlap_stmt(
+        i % 300, i % 5000, inicio, inicio + timedelta(hours=1)
+    )
+
+
+def _overlap_select(i):
+    inicio = INICIO + timedelta(hours=i % 500)
+    fin = inicio + timedelta(hours=1)
+    return (
+        select(Tutoria.id_tutoria)
+        .where(
+            or_(Tutoria.id_profesor == i % 300, Tutoria.id_estudiante == i % 5000),
+            Tutoria.fecha_hora_inicio < fin,
+            Tutoria.fecha_hora_fin > inicio,
+            ACTIVA,
+        )
+        .limit(1)
+    )
+
+
+def _inbox(i):
+    return NotificacionRepository.inbox_stmt(i % 5000, 20, (i % 5) * 20, i % 2 == 0)
+
+
+def _inbox_select(i):
+    stmt = select(
+        Notificacion.id_notificacion,
+        Notificacion.id_destinatario,
+        Notificacion.id_estudiante,
+        Notificacion.id_profesor,
+        Notificacion.titulo,
+        Notificacion.descripcion,
+        Notificacion.tipo,
+        Notificacion.leida,
+        Notificacion.fecha_creacion,
+    ).where(Notificacion.id_destinatario == i % 5000)
+    if i % 2 == 0:
+        stmt = stmt.where(Notificacion.leida == false())
+    return (
+        stmt.order_by(Notificacion.fecha_creacion.desc()).limit(20).offset((i % 5) * 20)
+    )
+
+
+def _unread(i):
+    return NotificacionRepository.unread_count_stmt(i % 5000)
+
+
+def _unread_select(i):
+    return select(func.count()).where(
+        Notificacion.id_destinatario == i % 5000, Notificacion.leida == false()
+    )
+
+
+CONSULTAS = {
+    "tutorias.overlap": (_overlap, _overlap_select),
+    "notificaciones.inbox": (_inbox, _inbox_select),
+    "notificaciones.unread_count": (_unread, _unread_select),
+}
+
+
+def _por_llamada(fn, n: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - inicio) / n * 1e6
+
+
+def bench_compilacion(n: int) -> None:
+    dialect = postgresql.asyncpg.dialect()
+    print(
+        f"{'consulta':30} {'construir':>10} {'compilar':>10} {'sin_lambda':>11}  (µs)"
+    )
+    for nombre, (lambda_fn, select_fn) in CONSULTAS.items():
+        cache: dict = {}
+
+        def compilar(i):
+            # Mismo camino que Connection.execute: clave de caché y, si ya está,
+            # se reutiliza la compilación
+            lambda_fn(i)._compile_w_cache(dialect, compiled_cache=cache, column_keys=[])
+
+        construir = _por_llamada(lambda i: lambda_fn(i)._generate_cache_key(), n)
+        compilado = _por_llamada(compilar, n)
+        sin_lambda = _por_llamada(lambda i: select_fn(i).compile(dialect=dialect), n)
+        print(f"{nombre:30} {construir:10.1f} {compilado:10.1f} {sin_lambda:11.1f}")
+
+
+async def bench_db(n: int) -> None:
+    from app.core.database import engine
+
+    print(f"\n{'consulta':30} {'p50':>8} {'p95':>8}  (ms, ida y vuelta)")
+    async with engine.connect() as conn:
+        for nombre, (lambda_fn, _) in CONSULTAS.items():
+            tiempos = []
+            for _ in range(n):
+                stmt = lambda_fn(random.randrange(100_000))
+                inicio = time.perf_counter()
+                (await conn.execute(stmt)).all()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            tiempos.sort()
+            p95 = tiempos[int(len(tiempos) * 0.95) - 1]
+            print(f"{nombre:30} {statistics.median(tiempos):8.2f} {p95:8.2f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=20000, help="llamadas por consulta")
+    parser.add_argument(
+        "--db", action="store_true", help="ejecutar también contra DATABASE_URL"
+    )
+    args = parser.parse_args()
+    bench_compilacion(args.n)
+    if args.db:
+        asyncio.run(bench_db(min(args.n, 2000)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Entidades ORM frente a proyecciones de columnas al listar tutorías.
+
+Compara, sobre ``-n`` filas (50 000 por defecto):
+
+- ``orm``: la consulta anterior a ``TutoriaRepository`` (entidad ``Tutoria`` más
+  nombres etiquetados) convertida a dict fila por fila;
+- ``proyeccion``: ``TutoriaRepository.select()`` a ``TutoriaDTO``.
+
+Para cada una reporta la latencia de consulta + materialización (mediana de
+``-r`` repeticiones), el pico de memoria asignada durante la carga y lo que
+queda retenido mientras la sesión sigue abierta (la identity map conserva las
+entidades hasta cerrarla), medidos con ``tracemalloc``.
+
+Por defecto usa SQLite en memoria con datos sintéticos: ambas consultas hacen
+los mismos joins, así que la diferencia está en el lado de Python. Con ``--db``
+lee las tutorías existentes de ``DATABASE_URL`` (hasta ``-n``) sin escribir nada.
+
+    python benchmarks/bench_proyecciones.py [-n 50000] [-r 5] [--db]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import MetaData, create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session, aliased  # noqa: E402
+
+from app.models.asignaturas import Asignatura  # noqa: E402
+from app.models.tutorias import Tutoria  # noqa: E402
+from app.models.users import User  # noqa: E402
+from app.repositories.tutorias import TutoriaDTO, TutoriaRepository  # noqa: E402
+
+
+def _orm_select():
+    P = aliased(User)  # Profesor
+    E = aliased(User)  # Estudiante
+    return (
+        select(
+            Tutoria,
+            P.nombre.label("p_nombre"),
+            P.apellido.label("p_apellido"),
+            E.nombre.label("e_nombre"),
+            E.apellido.label("e_apellido"),
+            Asignatura.nombre_asignatura.label("asig_nombre"),
+        )
+        .join(P, Tutoria.id_profesor == P.id_usuario)
+        .join(E, Tutoria.id_estudiante == E.id_usuario)
+        .join(Asignatura, Tutoria.id_asignatura == Asignatura.id_asignatura)
+    )
+
+
+def _orm_row(row) -> dict:
+    tutoria, p_nombre, p_apellido, e_nombre, e_apellido, asig_nombre = row
+    return {
+        "id_tutoria": tutoria.id_tutoria,
+        "id_estudiante": tutoria.id_estudiante,
+        "id_profesor": tutoria.id_profesor,
+        "id_asignatura": tutoria.id_asignatura,
+        "fecha_hora_inicio": tutoria.fecha_hora_inicio,
+        "fecha_hora_fin": tutoria.fecha_hora_fin,
+        "modalidad": tutoria.modalidad,
+        "updated_at": tutoria.updated_at,
+        "version": tutoria.version,
+        "estado": tutoria.estado,
+        "titulo": asig_nombre,
+        "profesor": f"{p_nombre} {p_apellido}",
+        "estudiante": f"{e_nombre} {e_apellido}",
+    }
+
+
+VARIANTES = {
+    "orm": (_orm_select, _orm_row),
+    "proyeccion": (TutoriaRepository.select, lambda row: TutoriaDTO(*row)),
+}
+
+
+def _sembrar(engine, n: int) -> None:
+    # Copia sin defaults de servidor: algunos son expresiones de PostgreSQL y aquí
+    # todas las columnas se rellenan explícitamente
+    metadata = MetaData()
+    for modelo in (User, Asignatura, Tutoria):
+        tabla = modelo.__table__.to_metadata(metadata)
+        for columna in tabla.columns:
+            columna.server_default = None
+    metadata.create_all(engine)
+    ahora = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {
+                    "id_usuario": i,
+                    "nombre": f"Nombre{i}",
+                    "apellido": f"Apellido{i}",
+                    "email": f"u{i}@ufps.edu.co",
+                    "contrasena": "x" * 60,
+                    "id_rol": 1 if i <= 50 else 2,
+                }
+                for i in range(1, 1001)
+            ],
+        )
+        conn.execute(
+            insert(Asignatura),
+            [
+                {"id_asignatura": i, "nombre_asignatura": f"Asignatura {i}"}
+                for i in range(1, 41)
+            ],
+        )
+        conn.execute(
+            insert(Tutoria),
+            [
+                {
+                    "id_tutoria": i,
+                    "id_profesor": 1 + i % 50,
+                    "id_estudiante": 51 + i % 950,
+                    "id_asignatura": 1 + i % 40,
+                    "fecha_hora_inicio": ahora + timedelta(hours=i),
+                    "fecha_hora_fin": ahora + timedelta(hours=i + 1),
+                    "modalidad": "presencial",
+                    "fecha_solicitud": ahora,
+                    "updated_at": ahora,
+                    "version": 1,
+                    "estado": "CONFIRMADA",
+                    "cambio_xid": i,
+                }
+                for i in range(1, n + 1)
+            ],
+        )
+
+
+def _medir(cargar, repeticiones: int):
+    tiempos = []
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        filas, cerrar = cargar()
+        tiempos.append(time.perf_counter() - inicio)
+        del filas
+        cerrar()
+    gc.collect()
+    tracemalloc.start()
+    filas, cerrar = cargar()
+    retenido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cantidad = len(filas)
+    del filas
+    cerrar()
+    return cantidad, statistics.median(tiempos), pico, retenido
+
+
+def _reportar(nombre, cantidad, latencia, pico, retenido) -> None:
+    mb = 1024 * 1024
+    print(
+        f"{nombre:11} {cantidad:7d} filas  {latencia * 1000:8.1f} ms"
+        f"  pico {pico / mb:7.1f} MB  retenido {retenido / mb:7.1f} MB"
+    )
+
+
+def bench_sqlite(n: int, repeticiones: int) -> None:
+    engine = create_engine("sqlite://")
+    _sembrar(engine, n)
+    for nombre, (stmt, convertir) in VARIANTES.items():
+
+        def cargar():
+            session = Session(engine)
+            filas = [convertir(row) for row in session.execute(stmt().limit(n))]
+            return filas, session.close
+
+        _reportar(nombre, *_medir(cargar, repeticiones))
+
+
+async def bench_db(n: int, repeticiones: int) -> None:
+    from app.core.database import AsyncSessionLocal, engine
+
+    for nombre, (stmt, convertir) in VARIANTES.items():
+        tiempos = []
+        for intento in range(repeticiones + 1):
+            gc.collect()
+            medir_memoria = intento == repeticiones
+            if medir_memoria:
+                tracemalloc.start()
+            inicio = time.perf_counter()
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(stmt().limit(n))
+                filas = [convertir(row) for row in result.all()]
+                if medir_memoria:
+                    retenido, pico = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+            if not medir_memoria:
+                tiempos.append(time.perf_counter() - inicio)
+        _reportar(nombre, len(filas), statistics.median(tiempos), pico, retenido)
+        del filas
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=50_000, help="filas a cargar")
+    parser.add_argument("-r", type=int, default=5, help="repeticiones de latencia")
+    parser.add_argument(
+        "--db", action="store_true", help="leer de DATABASE_URL en lugar de SQLite"
+    )
+    args = parser.parse_args()
+    if args.db:
+        asyncio.run(bench_db(args.n, args.r))
+    else:
+        bench_sqlite(args.n, args.r)
+
+
+if __name__ == "__main__":
+    main()
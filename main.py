@@ -3,20 +3,40 @@ from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
 from app.controllers.asignaturas import router as asignaturas_router
 from app.controllers.auth import router as auth
+from app.controllers.chat import router as chat_router
+from app.controllers.chatbot import router as chatbot_router
 from app.controllers.disponibilidad import router as disponibilidad
+from app.controllers.health import router as health_router
+from app.controllers.imports import router as imports_router
+from app.controllers.lista_espera import router as lista_espera_router
 from app.controllers.roles import router as roles_router
+from app.controllers.trabajos import router as trabajos_router
 from app.controllers.tutorias import router as tutorias_router
 from app.controllers.users import router as users_router
 from app.controllers.notifications import router as notifications_router
 from app.models.roles import Role
-from app.core.ws_manager import manager
-from jose import jwt, JWTError
-from app.core import security
+from app.core.ws_manager import ENCODINGS, manager
+from app.core.tokens import verifier
+from app.core import metrics
+from app.core.idempotency import IdempotencyMiddleware, purgar_caducadas
+from app.core.middleware import AdmissionControlMiddleware, RateLimitMiddleware
+from app.core.config import settings
+from app.services.notifications import (
+    NotificationRetentionService,
+    NotificationService,
+)
+from app.services.chat import chat_writer
+from app.services.chatbot import interaction_logger
+from app.services.eliminacion import EliminacionService
+from app.services.roles import RoleService
+from app.services.scheduler import scheduler
+from app.services.slots import SlotService
+from app.services.tutorias import TutoriaService
 
 
 @asynccontextmanager
@@ -25,7 +45,39 @@ async def lifespan(app: FastAPI):
 
     async with AsyncSessionLocal() as session:
         await seed_roles(session)
+    # Extiende el inventario de slots al arrancar (idempotente; un solo worker a la vez)
+    await SlotService.refresh()
+    if settings.metrics_dir:
+        scheduler.every(settings.metrics_flush_interval, _flush_metrics, "metrics")
+    scheduler.every(
+        settings.notificaciones_mantenimiento_intervalo,
+        NotificationRetentionService.run,
+        "notificaciones-retencion",
+    )
+    scheduler.every(
+        settings.tutorias_completar_intervalo,
+        TutoriaService.completar_vencidas,
+        "tutorias-completar",
+    )
+    scheduler.every(
+        settings.eliminacion_intervalo, EliminacionService.run_pending, "eliminacion"
+    )
+    scheduler.every(
+        settings.slots_refresco_intervalo, SlotService.refresh, "slots-refresco"
+    )
+    scheduler.every(
+        settings.idempotency_cleanup_interval, purgar_caducadas, "idempotency-limpieza"
+    )
+    scheduler.start()
     yield
+    await scheduler.stop()
+    await chat_writer.stop()
+    await interaction_logger.stop()
+    metrics.remove_snapshot()
+
+
+async def _flush_metrics():
+    metrics.flush()
 
 
 app = FastAPI(title="UFPSTutor API", lifespan=lifespan)
@@ -41,6 +93,14 @@ app.include_router(
 app.include_router(
     notifications_router, prefix="/notifications", tags=["Notificaciones"]
 )
+app.include_router(chat_router, prefix="/chat", tags=["Chat"])
+app.include_router(chatbot_router, prefix="/chatbot", tags=["Chatbot"])
+app.include_router(trabajos_router, prefix="/trabajos", tags=["Trabajos"])
+app.include_router(
+    lista_espera_router, prefix="/lista-espera", tags=["Lista de espera"]
+)
+app.include_router(imports_router, prefix="/importar", tags=["Importación"])
+app.include_router(health_router, prefix="/health", tags=["General"])
 
 origins = [
     "http://localhost:3000",
@@ -49,6 +109,12 @@ origins = [
     "https://ufpstutorv2.vercel.app",
 ]
 
+# El último middleware añadido es el más externo: CORS envuelve todo para que
+# también las respuestas 429/503 lleven sus cabeceras
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -60,30 +126,45 @@ app.add_middleware(
 
 @app.websocket("/ws/notifications")
 async def websocket_notifications(
-    websocket: WebSocket, token: str = Query(..., description="JWT access token")
+    websocket: WebSocket,
+    token: str = Query(..., description="JWT access token"),
+    since: int | None = Query(
+        None, description="Última notificación recibida; se reenvían las posteriores"
+    ),
+    encoding: str = Query("json", description="json | compact | msgpack"),
+    batch_ms: int = Query(
+        0, ge=0, le=1000, description="Ventana para agrupar mensajes en un frame"
+    ),
 ):
     # Authenticate via token (query param for simplicity)
-    try:
-        secret = security.SECRET_KEY or ""
-        algorithm = security.ALGORITHM or "HS256"
-        payload = jwt.decode(token, secret, algorithms=[algorithm])
-        user_id = payload.get("sub")
-        if not user_id:
-            await websocket.close(code=4401)
-            return
-    except JWTError:
+    user_id = verifier.subject(token)
+    if not user_id:
         await websocket.close(code=4401)
         return
+    if encoding not in ENCODINGS:
+        await websocket.close(code=4400)
+        return
 
-    await manager.connect(int(user_id), websocket)
+    user_id = int(user_id)
+    # Se registra antes de consultar para no perder lo que llegue entre medias;
+    # el manager retiene esos mensajes hasta terminar el reenvío
+    client = await manager.connect(
+        user_id,
+        websocket,
+        encoding=encoding,
+        batch_window=batch_ms / 1000,
+        replay=since is not None,
+    )
     try:
+        if since is not None:
+            await NotificationService.replay(client, since)
         while True:
             # Keep-alive / ignore incoming messages
             await websocket.receive_text()
     except WebSocketDisconnect:
-        await manager.disconnect(int(user_id), websocket)
+        await manager.disconnect(client)
     except Exception:
-        await manager.disconnect(int(user_id), websocket)
+        await manager.disconnect(client)
 
 
 @app.get("/health", tags=["General"])
@@ -91,11 +172,17 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["General"], include_in_schema=False)
+async def metrics_endpoint():
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 async def seed_roles(db: AsyncSession):
     roles = ["ADMINISTRADOR", "PROFESOR", "ESTUDIANTE"]
     for nombre in roles:
-        result = await db.execute(select(Role).where(Role.nombre_rol == nombre))
-        rol = result.scalars().first()
+        rol = await RoleService.get_by_nombre(db, nombre)
         if not rol:
             db.add(Role(nombre_rol=nombre))
     await db.commit()
@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import chat
+from app.services.chat import ChatWriter
+
+
+@pytest.fixture
+def envios(monkeypatch):
+    enviados = []
+
+    async def send_batch(mensajes):
+        enviados.append(list(mensajes))
+
+    monkeypatch.setattr(chat.manager, "send_batch", send_batch)
+    return enviados
+
+
+def _insert_falla_con(contenido_invalido: str, lotes: list):
+    async def _insert(batch):
+        lotes.append(len(batch))
+        if any(m["contenido"] == contenido_invalido for m, _, _ in batch):
+            raise ValueError("fila inválida")
+        return [
+            SimpleNamespace(
+                id_mensaje=i,
+                id_tutoria=m["id_tutoria"],
+                id_remitente=m["id_remitente"],
+                contenido=m["contenido"],
+                fecha_envio="2026-10-19",
+            )
+            for i, (m, _, _) in enumerate(batch, start=1)
+        ]
+
+    return _insert
+
+
+def _mensaje(contenido: str) -> dict:
+    return {"id_tutoria": 1, "id_remitente": 10, "contenido": contenido}
+
+
+async def test_lote_fallido_se_reintenta_por_mensaje(monkeypatch, envios):
+    lotes = []
+    writer = ChatWriter()
+    monkeypatch.setattr(writer, "_insert", _insert_falla_con("mala", lotes))
+    resultados = await asyncio.gather(
+        writer.submit(_mensaje("hola"), [10, 20]),
+        writer.submit(_mensaje("mala"), [10, 20]),
+        writer.submit(_mensaje("chao"), [10, 20]),
+        return_exceptions=True,
+    )
+    await writer.stop()
+    assert lotes == [3, 1, 1, 1]
+    assert resultados[0].contenido == "hola"
+    assert isinstance(resultados[1], ValueError)
+    assert resultados[2].contenido == "chao"
+    # Un único reparto con los dos mensajes guardados, a ambos participantes
+    assert len(envios) == 1
+    assert sorted(p["contenido"] for _, p in envios[0]) == ["chao"] * 2 + ["hola"] * 2
+
+
+async def test_cola_llena_rechaza(monkeypatch, envios):
+    writer = ChatWriter(maxsize=1)
+    liberar = asyncio.Event()
+
+    async def _insert_lento(batch):
+        await liberar.wait()
+        return await _insert_falla_con("", [])(batch)
+
+    monkeypatch.setattr(writer, "_insert", _insert_lento)
+    primero = asyncio.create_task(writer.submit(_mensaje("1"), [10]))
+    await asyncio.sleep(0)  # el escritor toma el primero y espera a la base
+    segundo = asyncio.create_task(writer.submit(_mensaje("2"), [10]))
+    await asyncio.sleep(0)
+    with pytest.raises(asyncio.QueueFull):
+        await writer.submit(_mensaje("3"), [10])
+    liberar.set()
+    await asyncio.gather(primero, segundo)
+    await writer.stop()
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from datetime import date, datetime, time as hora, timedelta, timezone
+
+from app.services import chatbot
+from app.services.chatbot import (
+    AvailabilityCache,
+    ChatbotService,
+    Franja,
+    InteractionLogger,
+    LocalAnswerEngine,
+)
+
+LUNES = date(2026, 10, 19)
+HORA = timedelta(hours=1)
+
+FRANJAS = [
+    Franja(1, "Ana Pérez", 10, "Cálculo", "lunes", hora(9), hora(11), LUNES),
+    Franja(
+        1,
+        "Ana Pérez",
+        10,
+        "Cálculo",
+        "miercoles",
+        hora(15),
+        hora(16),
+        LUNES + timedelta(days=2),
+    ),
+    Franja(2, "Luis Gómez", 20, "Física", "lunes", hora(12), hora(13), LUNES),
+]
+
+
+async def test_responde_por_asignatura_profesor_y_dia():
+    motor = LocalAnswerEngine()
+
+    r = await motor.answer("¿Cuándo atiende Pérez Cálculo el miércoles?", FRANJAS)
+    assert r.intencion == "disponibilidad"
+    assert r.franjas == [FRANJAS[1]]
+    assert "Ana Pérez atiende Cálculo el miercoles 21/10 de 15:00 a 16:00" in r.texto
+
+    r = await motor.answer("horarios de física", FRANJAS)
+    assert [f.id_profesor for f in r.franjas] == [2]
+
+
+async def test_sin_coincidencias_o_pregunta_desconocida():
+    motor = LocalAnswerEngine()
+
+    r = await motor.answer("¿Está Gómez el viernes?", FRANJAS)
+    assert (r.intencion, r.franjas) == ("disponibilidad", [])
+
+    r = await motor.answer("hola", FRANJAS)
+    assert r.intencion == "desconocida"
+    assert r.texto == LocalAnswerEngine.AYUDA
+
+
+def test_agrupa_slots_libres_consecutivos_y_respeta_los_huecos(monkeypatch):
+    monkeypatch.setattr(chatbot.settings, "zona_horaria", "UTC")
+
+    def slot(id_disp, h):
+        inicio = datetime(2026, 10, 19, h, tzinfo=timezone.utc)
+        return (id_disp, 1, "Ana", "Pérez", 10, "Cálculo", inicio, inicio + HORA)
+
+    # Franja 7 de 9 a 13 con el slot de las 11 reservado (no viene en la consulta)
+    rows = [slot(7, 9), slot(7, 10), slot(7, 12), slot(8, 13)]
+
+    franjas = AvailabilityCache._agrupar(rows)
+
+    assert [(f.hora_inicio, f.hora_fin) for f in franjas] == [
+        (hora(9), hora(11)),
+        (hora(12), hora(13)),
+        (hora(13), hora(14)),
+    ]
+    assert {(f.dia_semana, f.fecha) for f in franjas} == {("lunes", LUNES)}
+
+
+async def test_el_registro_se_vuelca_en_lotes(monkeypatch):
+    lotes = []
+
+    async def flush(lote):
+        lotes.append(len(lote))
+
+    registro = InteractionLogger(batch_size=3, flush_interval=0.05, maxsize=100)
+    monkeypatch.setattr(registro, "_flush", flush)
+    for i in range(7):
+        registro.log({"pregunta": str(i)})
+    await registro.stop()
+
+    assert lotes == [3, 3, 1]
+
+
+async def test_un_fallo_de_la_base_no_retrasa_la_respuesta(monkeypatch):
+    lotes = []
+
+    async def flush(lote):
+        await asyncio.sleep(0.5)
+        lotes.append(lote)
+        if len(lotes) == 1:
+            raise ConnectionError("base caída")
+
+    registro = InteractionLogger(batch_size=1, flush_interval=0.01, maxsize=100)
+    monkeypatch.setattr(registro, "_flush", flush)
+    monkeypatch.setattr(chatbot, "interaction_logger", registro)
+
+    async def franjas():
+        return FRANJAS
+
+    monkeypatch.setattr(chatbot.availability_cache, "get", franjas)
+
+    inicio = time.perf_counter()
+    for _ in range(2):
+        respuesta = await ChatbotService.responder("Cálculo", 1)
+        assert respuesta.intencion == "disponibilidad"
+    assert time.perf_counter() - inicio < 0.2
+
+    # El lote que falló se registra en el log y la tarea sigue con el siguiente
+    await asyncio.wait_for(registro.stop(), 2)
+    assert len(lotes) == 2
+    assert lotes[1][0]["pregunta"] == "Cálculo"
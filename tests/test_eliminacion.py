@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import pytest
+
+import app.core.database as database
+from app.core.config import settings
+from app.repositories.tutorias import TutoriaRepository
+from app.services.eliminacion import EliminacionService
+from app.services.notifications import NotificationService
+
+
+@dataclass
+class _Tutoria:
+    id_tutoria: int
+
+
+class _SesionStub:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def entorno(monkeypatch):
+    """Cinco tutorías canceladas, lotes de dos y un notify que falla a demanda."""
+    monkeypatch.setattr(settings, "eliminacion_lote", 2)
+    monkeypatch.setattr(database, "AsyncSessionLocal", _SesionStub)
+    estado = {"ids": [3, 5, 8, 13, 21], "avisadas": [], "progreso": [], "fallo": None}
+
+    async def find(db, *where, order_by=None, limit=None):
+        # El último filtro es Tutoria.id_tutoria > ultimo
+        ultimo = where[-1].right.value
+        return [_Tutoria(i) for i in estado["ids"] if i > ultimo][:limit]
+
+    async def notify(db, event, tutorias, excluir=()):
+        ids = [t["id_tutoria"] for t in tutorias]
+        if estado["fallo"] in ids:
+            raise RuntimeError("caída")
+        estado["avisadas"] += ids
+        return ids
+
+    async def progreso(id_trabajo, conn=None, **valores):
+        estado["progreso"].append(valores)
+
+    monkeypatch.setattr(TutoriaRepository, "find", staticmethod(find))
+    monkeypatch.setattr(NotificationService, "notify", staticmethod(notify))
+    monkeypatch.setattr(EliminacionService, "_progreso", staticmethod(progreso))
+    return estado
+
+
+def _trabajo(ultimo_notificado=None):
+    return {
+        "id_trabajo": 1,
+        "entidad": "asignatura",
+        "id_entidad": 7,
+        "fecha_creacion": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "ultimo_notificado": ultimo_notificado,
+    }
+
+
+async def test_el_cursor_se_guarda_con_el_progreso_de_cada_lote(entorno):
+    await EliminacionService._notificar(_trabajo())
+    assert entorno["avisadas"] == [3, 5, 8, 13, 21]
+    assert [p["ultimo_notificado"] for p in entorno["progreso"]] == [5, 13, 21]
+
+
+async def test_un_trabajo_retomado_no_repite_avisos(entorno):
+    entorno["fallo"] = 13
+    with pytest.raises(RuntimeError):
+        await EliminacionService._notificar(_trabajo())
+    guardado = entorno["progreso"][-1]["ultimo_notificado"]
+    assert guardado == 5
+
+    entorno["fallo"] = None
+    await EliminacionService._notificar(_trabajo(guardado))
+    assert entorno["avisadas"] == [3, 5, 8, 13, 21]
@@ -0,0 +1,72 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.controllers.imports import router
+from app.core.deps import get_db
+from app.core.security import create_access_token
+
+
+class _SesionStub:
+    """Devuelve un rol fijo para la consulta de require_admin."""
+
+    def __init__(self, rol):
+        self.rol = rol
+        self.consultas = 0
+
+    async def scalar(self, stmt):
+        self.consultas += 1
+        return self.rol
+
+
+def _cliente(rol):
+    sesion = _SesionStub(rol)
+    app = FastAPI()
+    app.include_router(router, prefix="/importar")
+    app.dependency_overrides[get_db] = lambda: sesion
+    return TestClient(app), sesion
+
+
+def _auth(user_id=1):
+    token = create_access_token({"sub": str(user_id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_sin_token_responde_401():
+    cliente, sesion = _cliente("ADMINISTRADOR")
+    resp = cliente.post("/importar/usuarios", content=b"", headers={})
+    assert resp.status_code == 401
+    assert sesion.consultas == 0
+
+
+def test_rol_no_administrador_responde_403():
+    for rol in ("ESTUDIANTE", "PROFESOR", None):
+        cliente, _ = _cliente(rol)
+        for ruta in ("usuarios", "asignaturas", "asignaciones", "disponibilidad"):
+            resp = cliente.post(
+                f"/importar/{ruta}",
+                content=b"nombre_asignatura\nX\n",
+                headers={**_auth(), "Content-Type": "text/csv"},
+            )
+            assert resp.status_code == 403, (rol, ruta)
+
+
+def test_administrador_llega_al_servicio(monkeypatch):
+    from app.schemas.imports import ImportReport
+    from app.services.imports import ImportService
+
+    llamadas = []
+
+    async def import_usuarios(db, records):
+        llamadas.append(db)
+        return ImportReport()
+
+    monkeypatch.setattr(ImportService, "import_usuarios", import_usuarios)
+    cliente, sesion = _cliente("ADMINISTRADOR")
+    resp = cliente.post(
+        "/importar/usuarios",
+        content=b"",
+        headers={**_auth(), "Content-Type": "text/csv"},
+    )
+    assert resp.status_code == 200
+    # La ruta recibe la misma sesión que usó la comprobación del rol
+    assert llamadas == [sesion]
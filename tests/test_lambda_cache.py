@@ -0,0 +1,52 @@
+"""Las consultas con ``lambda_stmt`` deben compartir clave de caché entre llamadas.
+
+Si un valor quedara incrustado en el SQL en lugar de ir como parámetro, cada
+llamada generaría una clave nueva y la caché de compilación crecería sin aportar.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.repositories.notificaciones import NotificacionRepository
+from app.services.tutorias import TutoriaService
+
+INICIO = datetime(2026, 11, 2, 15, tzinfo=timezone.utc)
+
+
+def _clave(stmt):
+    return stmt._generate_cache_key()
+
+
+def _valores(stmt):
+    return sorted(str(p.effective_value) for p in _clave(stmt).bindparams)
+
+
+def test_overlap_stmt_misma_clave_con_otros_parametros():
+    a = TutoriaService.overlap_stmt(1, 2, INICIO, INICIO + timedelta(hours=1))
+    b = TutoriaService.overlap_stmt(
+        7, 9, INICIO + timedelta(days=3), INICIO + timedelta(days=3, hours=2)
+    )
+    assert _clave(a) == _clave(b)
+    assert _valores(a) != _valores(b)
+
+
+def test_inbox_stmt_misma_clave_con_otros_parametros():
+    a = NotificacionRepository.inbox_stmt(1, 20, 0)
+    b = NotificacionRepository.inbox_stmt(42, 50, 100)
+    assert _clave(a) == _clave(b)
+    assert _valores(a) != _valores(b)
+
+
+def test_inbox_stmt_una_clave_por_variante():
+    todas = NotificacionRepository.inbox_stmt(1, 20)
+    no_leidas = NotificacionRepository.inbox_stmt(1, 20, solo_no_leidas=True)
+    assert _clave(todas) != _clave(no_leidas)
+    assert _clave(no_leidas) == _clave(
+        NotificacionRepository.inbox_stmt(5, 10, 30, solo_no_leidas=True)
+    )
+
+
+def test_unread_count_stmt_misma_clave_con_otros_parametros():
+    a = NotificacionRepository.unread_count_stmt(1)
+    b = NotificacionRepository.unread_count_stmt(99)
+    assert _clave(a) == _clave(b)
+    assert _valores(a) != _valores(b)
@@ -0,0 +1,43 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services.lista_espera import ListaEsperaService
+
+
+def _compilar(stmt):
+    return stmt.compile(dialect=postgresql.asyncpg.dialect())
+
+
+def test_horario_pasado_no_promueve():
+    inicio = datetime.now(timezone.utc) - timedelta(minutes=1)
+    assert (
+        ListaEsperaService.promover_stmt(1, 2, inicio, inicio + timedelta(hours=1), 3)
+        is None
+    )
+
+
+def test_promocion_reclama_la_entrada_sin_esperar():
+    inicio = datetime.now(timezone.utc) + timedelta(days=1)
+    sql = str(
+        _compilar(
+            ListaEsperaService.promover_stmt(
+                1, 2, inicio, inicio + timedelta(hours=1), 3
+            )
+        )
+    )
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "nextval(pg_get_serial_sequence" in sql
+    assert 'INSERT INTO "Tutorias"' in sql
+
+
+def test_ventana_usa_la_fecha_local(monkeypatch):
+    monkeypatch.setattr(settings, "zona_horaria", "America/Bogota")
+    # 03:00 UTC del martes es todavía lunes en America/Bogota
+    inicio = datetime(2099, 11, 3, 3, tzinfo=timezone.utc)
+    params = _compilar(
+        ListaEsperaService.promover_stmt(1, 2, inicio, inicio + timedelta(hours=1), 3)
+    ).params
+    fechas = {v for v in params.values() if type(v) is date}
+    assert fechas == {date(2099, 11, 2)}
@@ -0,0 +1,133 @@
+"""Ventana de read-your-writes entre el primario y la réplica.
+
+Tras un commit por ``get_db`` las lecturas del mismo cliente van al primario
+durante ``read_your_writes_seconds``: en este worker por el mapa en memoria y en
+cualquier otro por la cookie ``ryw_until``.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core import deps
+from app.core.config import settings
+
+TOKEN = b"Bearer token-de-prueba"
+
+
+def _request(cookie: str | None = None, token: bytes | None = TOKEN) -> Request:
+    headers = []
+    if token:
+        headers.append((b"authorization", token))
+    if cookie:
+        headers.append((b"cookie", cookie.encode()))
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/tutorias/",
+            "headers": headers,
+            "query_string": b"",
+            "client": ("127.0.0.1", 5000),
+        }
+    )
+
+
+def _cookie(response: Response) -> str:
+    valor = response.headers["set-cookie"].split(";")[0]
+    assert valor.startswith(f"{deps.READ_YOUR_WRITES_COOKIE}=")
+    return valor
+
+
+@pytest.fixture(autouse=True)
+def _sin_escrituras(monkeypatch):
+    monkeypatch.setattr(deps, "_recent_writes", {})
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = SimpleNamespace(t=1_000_000.0)
+    monkeypatch.setattr(deps.time, "time", lambda: ahora.t)
+    return ahora
+
+
+def test_ventana_en_memoria(reloj):
+    deps._mark_write(deps._client_key(_request()), Response())
+    assert deps._recently_wrote(_request())
+    # Otro cliente no hereda la ventana
+    assert not deps._recently_wrote(_request(token=b"Bearer otro"))
+    reloj.t += settings.read_your_writes_seconds + 0.01
+    assert not deps._recently_wrote(_request())
+
+
+def test_ventana_por_cookie_en_otro_worker(reloj, monkeypatch):
+    response = Response()
+    deps._mark_write(deps._client_key(_request()), response)
+    cookie = _cookie(response)
+    # Otro worker: su mapa no conoce la escritura, sólo llega la cookie
+    monkeypatch.setattr(deps, "_recent_writes", {})
+    assert not deps._recently_wrote(_request())
+    assert deps._recently_wrote(_request(cookie=cookie))
+    reloj.t += settings.read_your_writes_seconds + 0.01
+    assert not deps._recently_wrote(_request(cookie=cookie))
+
+
+def test_cookie_invalida_se_ignora():
+    cookie = f"{deps.READ_YOUR_WRITES_COOKIE}=no-es-un-numero"
+    assert not deps._recently_wrote(_request(cookie=cookie))
+
+
+@pytest.fixture
+def dos_bases(monkeypatch, primary_engine, replica_engine):
+    """Enruta deps al primario y la réplica de prueba."""
+
+    def factory(engine):
+        return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    monkeypatch.setattr(deps, "AsyncSessionLocal", factory(primary_engine))
+    monkeypatch.setattr(deps, "ReplicaSessionLocal", factory(replica_engine))
+    monkeypatch.setattr(deps, "replica_engine", replica_engine)
+
+
+async def _base_de_lectura(request: Request) -> str:
+    gen = deps.get_read_db(request)
+    session = await gen.__anext__()
+    try:
+        return (await session.execute(text("SELECT current_database()"))).scalar_one()
+    finally:
+        await gen.aclose()
+
+
+async def _escribir(request: Request) -> Response:
+    response = Response()
+    gen = deps.get_db(request, response)
+    session = await gen.__anext__()
+    await session.execute(text("SELECT 1"))
+    await session.commit()
+    await gen.aclose()
+    return response
+
+
+async def test_lecturas_tras_escribir(dos_bases, primary_engine, replica_engine, reloj):
+    async with primary_engine.connect() as conn:
+        primario = (await conn.execute(text("SELECT current_database()"))).scalar()
+    async with replica_engine.connect() as conn:
+        replica = (await conn.execute(text("SELECT current_database()"))).scalar()
+    assert primario != replica, "primario y réplica deben ser bases distintas"
+
+    assert await _base_de_lectura(_request()) == replica
+    response = await _escribir(_request())
+    # Mismo worker: el mapa en memoria
+    assert await _base_de_lectura(_request()) == primario
+    # Otro worker: sólo la cookie
+    deps._recent_writes.clear()
+    assert await _base_de_lectura(_request()) == replica
+    assert await _base_de_lectura(_request(cookie=_cookie(response))) == primario
+    # Vencida la ventana vuelve a la réplica
+    reloj.t += settings.read_your_writes_seconds + 0.01
+    assert await _base_de_lectura(_request(cookie=_cookie(response))) == replica
@@ -0,0 +1,26 @@
+from sqlalchemy.dialects import postgresql
+
+from app.services.slots import SlotService
+
+
+class _Registro:
+    def __init__(self):
+        self.sentencias = []
+
+    async def execute(self, stmt, params=None):
+        self.sentencias.append(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+
+
+async def test_ocupar_tutorias_es_un_solo_update():
+    db = _Registro()
+    await SlotService.ocupar_tutorias(db, [4, 5, 6])
+    (sentencia,) = db.sentencias
+    assert str(sentencia).startswith('UPDATE "SlotsDisponibles"')
+    assert "ANY ($1::INTEGER[])" in str(sentencia)
+    assert sentencia.params["ids"] == [4, 5, 6]
+
+
+async def test_ocupar_tutorias_sin_ids_no_consulta():
+    db = _Registro()
+    await SlotService.ocupar_tutorias(db, [])
+    assert db.sentencias == []
@@ -0,0 +1,53 @@
+import base64
+import json
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services.tutorias import SYNC_MARCA, TutoriaService
+
+
+def test_token_ida_y_vuelta():
+    token = TutoriaService.encode_sync_token(7, 123456789)
+    assert TutoriaService.decode_sync_token(7, token) == 123456789
+
+
+def test_token_de_otro_usuario():
+    token = TutoriaService.encode_sync_token(7, 10)
+    with pytest.raises(ValueError, match="usuario"):
+        TutoriaService.decode_sync_token(8, token)
+
+
+def test_token_alterado():
+    _, firma = TutoriaService.encode_sync_token(7, 10).split(".")
+    raw = json.dumps({"u": 7, "x": 0}, separators=(",", ":")).encode()
+    datos = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    with pytest.raises(ValueError, match="inválido"):
+        TutoriaService.decode_sync_token(7, f"{datos}.{firma}")
+
+
+def test_token_firmado_con_otra_clave(monkeypatch):
+    token = TutoriaService.encode_sync_token(7, 10)
+    monkeypatch.setattr(settings, "secret_key", "otra")
+    with pytest.raises(ValueError, match="inválido"):
+        TutoriaService.decode_sync_token(7, token)
+
+
+@pytest.mark.parametrize("token", ["", "abc", "a.b.c", "no base64!.x"])
+def test_token_mal_formado(token):
+    with pytest.raises(ValueError, match="inválido"):
+        TutoriaService.decode_sync_token(7, token)
+
+
+def test_token_anterior_sin_firma():
+    raw = json.dumps({"u": 7, "ts": "2026-10-19T00:00:00+00:00"}).encode()
+    token = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    with pytest.raises(ValueError, match="inválido"):
+        TutoriaService.decode_sync_token(7, token)
+
+
+def test_marca_es_xmin_del_snapshot():
+    sql = str(select(SYNC_MARCA).compile(dialect=postgresql.asyncpg.dialect()))
+    assert "pg_snapshot_xmin(pg_current_snapshot())" in sql
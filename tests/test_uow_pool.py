@@ -0,0 +1,156 @@
+"""Ocupación del pool con ``UnitOfWork`` y ``get_uow``.
+
+Se comprueba con un pool de prueba que reproduce el comportamiento de
+``AsyncSession`` (toma la conexión en la primera sentencia y la devuelve al
+terminar la transacción) y, si hay TEST_DATABASE_URL, con el pool real:
+
+- no se toma conexión antes de la primera sentencia;
+- ``commit()`` y ``release()`` la devuelven;
+- ``NotificationService.notify`` no retiene conexión mientras envía por WebSocket.
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core import deps
+from app.core.uow import UnitOfWork
+from app.services import notifications
+from app.services.notifications import NotificationEvent, NotificationService
+
+
+class _PoolStub:
+    def __init__(self):
+        self.checkedout = 0
+        self.filas = []
+
+    def __call__(self):
+        return _SesionStub(self)
+
+
+class _SesionStub:
+    def __init__(self, pool: _PoolStub):
+        self._pool = pool
+        self._conexion = False
+        self.info = {}
+
+    async def execute(self, stmt, params=None):
+        if not self._conexion:
+            self._conexion = True
+            self._pool.checkedout += 1
+        return SimpleNamespace(all=lambda: list(self._pool.filas))
+
+    def in_transaction(self) -> bool:
+        return self._conexion
+
+    def _devolver(self):
+        if self._conexion:
+            self._conexion = False
+            self._pool.checkedout -= 1
+
+    async def commit(self):
+        self._devolver()
+
+    async def rollback(self):
+        self._devolver()
+
+    async def close(self):
+        self._devolver()
+
+
+def _request():
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/tutorias/",
+            "headers": [],
+            "query_string": b"",
+            "client": ("127.0.0.1", 5000),
+        }
+    )
+
+
+async def _ciclo_uow(uow: UnitOfWork, checkedout):
+    uow.session  # crear la sesión no toma conexión
+    assert checkedout() == 0
+    await uow.session.execute(text("SELECT 1"))
+    assert checkedout() == 1
+    await uow.commit()
+    assert checkedout() == 0
+    await uow.session.execute(text("SELECT 1"))
+    assert checkedout() == 1
+    await uow.release()
+    assert checkedout() == 0
+
+
+async def _ciclo_get_uow(monkeypatch, factory, checkedout):
+    monkeypatch.setattr(deps, "AsyncSessionLocal", factory)
+    gen = deps.get_uow(_request(), Response())
+    uow = await gen.__anext__()
+    assert checkedout() == 0
+    await uow.session.execute(text("SELECT 1"))
+    assert checkedout() == 1
+    await uow.commit()
+    assert checkedout() == 0
+    # Una transacción sin confirmar la cierra el cierre de la dependencia
+    await uow.session.execute(text("SELECT 1"))
+    await gen.aclose()
+    assert checkedout() == 0
+
+
+async def test_uow_pool_stub():
+    pool = _PoolStub()
+    await _ciclo_uow(UnitOfWork(pool), lambda: pool.checkedout)
+
+
+async def test_get_uow_pool_stub(monkeypatch):
+    pool = _PoolStub()
+    await _ciclo_get_uow(monkeypatch, pool, lambda: pool.checkedout)
+
+
+async def test_notify_envia_sin_conexion(monkeypatch):
+    pool = _PoolStub()
+    pool.filas = [
+        SimpleNamespace(
+            id_notificacion=1,
+            id_destinatario=destinatario,
+            titulo="Nueva tutoría",
+            descripcion=None,
+            leida=False,
+            fecha_creacion=datetime.now(timezone.utc),
+            tipo=NotificationEvent.CREATED.value,
+        )
+        for destinatario in (10, 20)
+    ]
+    durante_envio = []
+
+    async def send_batch(mensajes):
+        durante_envio.append((pool.checkedout, len(mensajes)))
+
+    monkeypatch.setattr(notifications.manager, "send_batch", send_batch)
+    uow = UnitOfWork(pool)
+    tutoria = {"id_estudiante": 10, "id_profesor": 20, "titulo": "Cálculo"}
+    await NotificationService.notify(uow.session, NotificationEvent.CREATED, [tutoria])
+    assert durante_envio == [(0, 2)]
+
+
+@pytest.fixture
+def factory(primary_engine):
+    return sessionmaker(
+        bind=primary_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+
+async def test_uow_pool_real(primary_engine, factory):
+    await _ciclo_uow(UnitOfWork(factory), primary_engine.pool.checkedout)
+
+
+async def test_get_uow_pool_real(monkeypatch, primary_engine, factory):
+    await _ciclo_get_uow(monkeypatch, factory, primary_engine.pool.checkedout)
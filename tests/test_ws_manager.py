@@ -0,0 +1,63 @@
+import pytest
+
+from app.core.config import settings
+from app.core.ws_manager import ConnectionManager, QueuedClient, SseClient
+
+
+def test_queued_client_exige_close():
+    class SinClose(QueuedClient):
+        pass
+
+    with pytest.raises(TypeError):
+        SinClose(1)
+
+
+async def test_finish_replay_desconecta_si_la_cola_se_llena(monkeypatch):
+    monkeypatch.setattr(settings, "ws_client_queue_size", 2)
+    manager = ConnectionManager()
+    client = SseClient(7)
+    await manager.register(client, replay=True)
+    mensajes = [{"type": "notification", "id": i} for i in range(1, 4)]
+    await manager.finish_replay(
+        client, mensajes, {"type": "replay", "count": 3, "last_id": 3}
+    )
+    assert manager.connection_count() == 0
+    # close() deja sólo la marca de fin que corta el stream SSE
+    assert client.queue.get_nowait() == (None, None)
+    assert client.queue.empty()
+
+
+async def test_finish_replay_entrega_reenvio_y_retenidos():
+    manager = ConnectionManager()
+    client = SseClient(7)
+    await manager.register(client, replay=True)
+    client.put((2, "repetido"))
+    client.put((5, "nuevo"))
+    await manager.finish_replay(
+        client,
+        [{"type": "notification", "id": 2}],
+        {"type": "replay", "count": 1, "last_id": 2},
+    )
+    ids = [client.queue.get_nowait()[0] for _ in range(client.queue.qsize())]
+    assert ids == [2, None, 5]
+    assert manager.connection_count() == 1
+
+
+@pytest.mark.parametrize("encoding", ["xml", "msgpack"])
+def test_encoding_no_disponible_cierra_con_4400(monkeypatch, encoding):
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+
+    import main
+    from app.core.security import create_access_token
+
+    # Como si msgpack no estuviera instalado
+    monkeypatch.setattr(main, "ENCODINGS", ("json", "compact"))
+    token = create_access_token({"sub": "1"})
+    cliente = TestClient(main.app)
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with cliente.websocket_connect(
+            f"/ws/notifications?token={token}&encoding={encoding}"
+        ) as ws:
+            ws.receive_text()
+    assert exc.value.code == 4400
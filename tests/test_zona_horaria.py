@@ -0,0 +1,51 @@
+from datetime import datetime, time, timedelta, timezone
+
+from app.core.middleware import _match_rule
+from app.schemas.tutorias import TutoriaCreate
+from app.services.tutorias import TutoriaService
+from app.utils.date_utils import a_hora_local, zona_local
+
+
+def test_hora_sin_zona_es_hora_local():
+    local = a_hora_local(datetime(2026, 11, 2, 10))
+    assert local.tzinfo == zona_local()
+    assert local.hour == 10
+
+
+def test_hora_con_zona_se_convierte():
+    local = a_hora_local(datetime(2026, 11, 2, 15, tzinfo=timezone.utc))
+    assert local == datetime(2026, 11, 2, 15, tzinfo=timezone.utc)
+    assert local.tzinfo == zona_local()
+
+
+def test_schema_localiza_las_horas():
+    tutoria = TutoriaCreate(
+        id_estudiante=1,
+        id_profesor=2,
+        id_asignatura=3,
+        fecha_hora_inicio="2026-11-02T10:00:00",
+        fecha_hora_fin="2026-11-02T11:00:00Z",
+        modalidad="presencial",
+    )
+    assert tutoria.fecha_hora_inicio.tzinfo == zona_local()
+    assert tutoria.fecha_hora_inicio.hour == 10
+    assert tutoria.fecha_hora_fin == datetime(2026, 11, 2, 11, tzinfo=timezone.utc)
+
+
+def test_franja_compara_en_hora_local():
+    # Lunes (0) 08:00-12:00 local; el mismo horario expresado en UTC debe caber
+    franjas = [(0, time(8), time(12))]
+    inicio = a_hora_local(datetime(2026, 11, 2, 9))
+    utc = inicio.astimezone(timezone.utc)
+    assert TutoriaService._cabe_en_franja(franjas, utc, utc + timedelta(hours=1))
+    tarde = inicio.replace(hour=12)
+    assert not TutoriaService._cabe_en_franja(
+        franjas, tarde, tarde + timedelta(hours=1)
+    )
+
+
+def test_reserva_de_slot_tiene_limite():
+    assert _match_rule("POST", "/tutorias/slots/12").name == "booking"
+    assert _match_rule("POST", "/tutorias/slots/12/x") is None
+    assert _match_rule("GET", "/tutorias/slots/12") is None
+    assert _match_rule("POST", "/tutorias/").name == "booking"